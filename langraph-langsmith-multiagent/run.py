@@ -1,14 +1,29 @@
+import asyncio
 import os
+import uuid
 import uvicorn
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from src.config.settings import settings
+from src.core.models.serialization import dumps, to_sse
 from src.core.agents.base_agent import BaseAgent
 from src.core.agents.music_catalog_agent import MusicCatalogAgent
 from src.core.agents.invoice_info_agent import InvoiceInfoAgent
 from src.core.supervisor.supervisor_agent import SupervisorAgent
+from src.core.services.prompt_registry import get_prompt_registry
+from src.core.services.query_router import get_query_router
+from src.core.services.tracing import get_tracer
 
-app = FastAPI(title="Multi-Agent Customer Support System")
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with the same serializer used for prompts."""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+app = FastAPI(title="Multi-Agent Customer Support System", default_response_class=FastJSONResponse)
 
 # Configure CORS
 app.add_middleware(
@@ -19,10 +34,51 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compile prompt templates once, before the first request
+prompt_registry = get_prompt_registry()
+
+# Per-stage spans go to a local file when TRACING_ENABLED is set
+tracer = get_tracer()
+
 # Initialize agents
 music_agent = MusicCatalogAgent()
 invoice_agent = InvoiceInfoAgent()
-supervisor = SupervisorAgent(music_agent, invoice_agent)
+# Route confidently-classified queries locally; the LLM classifier handles the rest
+supervisor = SupervisorAgent(music_agent, invoice_agent, router=get_query_router())
+
+@app.post("/api/v1/verify")
+async def verify_customer(request: dict):
+    """
+    Verify a customer and start a session.
+    
+    Args:
+        request: Dictionary containing customer_id (ID, email or phone number) and/or session_token
+    
+    Returns:
+        Verification result; its session_token lets later support requests skip the customer lookup
+    """
+    try:
+        with tracer.span("request", request_id=request.get("request_id"), endpoint="verify"):
+            return await asyncio.to_thread(
+                supervisor.handle_customer_verification,
+                request.get("customer_id"),
+                request.get("session_token"),
+            )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/v1/logout")
+async def end_session(request: dict):
+    """
+    Revoke a verified session.
+    
+    Args:
+        request: Dictionary containing session_token
+    
+    Returns:
+        Whether a live session was revoked
+    """
+    return {"revoked": supervisor.end_session(request.get("session_token"))}
 
 @app.post("/api/v1/support")
 async def handle_customer_support(request: dict):
@@ -38,15 +94,57 @@ async def handle_customer_support(request: dict):
     try:
         # Get customer_id from request or create new one
         customer_id = request.get("customer_id", None)
+        request_id = request.get("request_id") or uuid.uuid4().hex
         
-        # Process request through supervisor
-        response = supervisor.process_request(request)
-        
-        return response
+        with tracer.span("request", request_id=request_id, endpoint="support", customer_id=customer_id):
+            # Process request through supervisor
+            response = await supervisor.aprocess_request(request)
+            
+            # Return the response object directly to skip FastAPI's jsonable_encoder pass
+            with tracer.span("serialize") as serialize_span:
+                json_response = FastJSONResponse(response, headers={"X-Request-ID": request_id})
+                serialize_span.set(bytes=len(json_response.body))
+        return json_response
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/v1/support/stream")
+async def stream_customer_support(request: dict):
+    """
+    Stream a customer support response as server-sent events.
+    
+    Emits ``routing``, ``tool_call``/``tool_result``, ``token`` and a final
+    ``result`` event; failures are reported as an ``error`` event because the
+    response status has already been sent.
+    
+    Args:
+        request: Dictionary containing customer query and optional customer_id
+    
+    Returns:
+        text/event-stream response
+    """
+    request_id = request.get("request_id") or uuid.uuid4().hex
+    
+    async def events():
+        # Flush headers and a first byte immediately, before classification runs
+        yield b": stream opened\n\n"
+        with tracer.span("request", request_id=request_id, endpoint="support/stream") as span:
+            count = 0
+            try:
+                async for event in supervisor.astream_request(request):
+                    count += 1
+                    yield to_sse(event["event"], event["data"])
+            except Exception as e:
+                yield to_sse("error", {"detail": str(e)})
+            span.set(events=count)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "X-Request-ID": request_id},
+    )
+
 if __name__ == "__main__":
     uvicorn.run(
         "run:app",
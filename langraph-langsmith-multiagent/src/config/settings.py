@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 
@@ -12,7 +13,89 @@ class Settings(BaseSettings):
 
     # Database Configuration
     DB_URL: str = "sqlite:///./chinook.db"
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 5
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_BUSY_TIMEOUT_MS: int = 5000
+    DB_MMAP_SIZE: int = 268435456  # 256 MiB
+    DB_CACHE_SIZE: int = -65536  # Negative values are KiB (64 MiB)
+    DB_MODE: str = "disk"  # 'disk' or 'memory_replica' (catalog reads from an in-memory copy)
+    DB_REPLICA_REFRESH_MODE: str = "mtime"  # 'mtime' or 'interval'
+    DB_REPLICA_REFRESH_INTERVAL: float = 60.0
+
+    # Query Instrumentation Configuration
+    DB_STATS_ENABLED: bool = True
+    DB_SLOW_QUERY_MS: Optional[float] = 100.0  # Unset to disable the slow-query log
+    DB_SLOW_QUERY_LOG_SIZE: int = 100
+    DB_SLOW_QUERY_EXPLAIN: bool = True
+    CUSTOMER_DIRECTORY_CHECK_INTERVAL: float = 5.0  # Seconds between Customer change checks
+
+    # Query Result Cache Configuration
+    RESULT_CACHE_ENABLED: bool = True
+    RESULT_CACHE_MAX_SIZE: int = 2048
+    RESULT_CACHE_CATALOG_TTL: float = 3600.0
+    RESULT_CACHE_CUSTOMER_TTL: float = 30.0
+    RESULT_CACHE_INVOICE_TTL: float = 30.0
+    
+    # LLM Client Configuration
+    LLM_MAX_CONCURRENCY: int = 16  # In-flight LLM calls per process (sync and async paths each)
+    LLM_MAX_CONNECTIONS: int = 32
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 16
+    LLM_KEEPALIVE_EXPIRY: float = 60.0
+    LLM_JSON_MODE: bool = True  # Ask the model for native JSON output (disable for models without it)
+    
+    # LLM Resilience Configuration
+    LLM_TIMEOUT: Optional[float] = 30.0  # Per-call deadline in seconds, across hedged attempts
+    LLM_HEDGE_ENABLED: bool = True
+    LLM_HEDGE_PERCENTILE: float = 95.0  # Fire a duplicate request after this latency percentile
+    LLM_HEDGE_MIN_DELAY: float = 0.5
+    LLM_HEDGE_MIN_SAMPLES: int = 20
+    LLM_BREAKER_FAILURE_RATE: float = 0.5
+    LLM_BREAKER_MIN_CALLS: int = 10
+    LLM_BREAKER_WINDOW: float = 30.0
+    LLM_BREAKER_OPEN_SECONDS: float = 15.0
+    
+    # LLM Response Cache Configuration
+    LLM_CACHE_ENABLED: bool = False
+    LLM_CACHE_MAX_SIZE: int = 1024
+    LLM_CACHE_PATH: Optional[str] = None  # SQLite file for the persistent tier (memory only if unset)
+    LLM_CACHE_MUSIC_TTL: float = 3600.0
+    LLM_CACHE_INVOICE_TTL: float = 300.0
+    LLM_CACHE_SKIP_SENSITIVE: bool = True  # Never cache invoice answers flagged as sensitive
+    
+    # Request Coalescing Configuration
+    SINGLEFLIGHT_ENABLED: bool = True  # Share one LLM call between identical concurrent requests
     
+    # Query Classification Configuration
+    CLASSIFIER_BATCH_SIZE: int = 8  # Queries per batched classification call (1 disables batching)
+    CLASSIFIER_BATCH_WAIT_MS: float = 5.0  # Longest a query waits for its batch to fill
+    PREFETCH_ENABLED: bool = True  # Load the customer's profile and record while the query is classified
+    ROUTER_ENABLED: bool = True  # Classify confidently-routable queries locally, without an LLM call
+    ROUTER_THRESHOLD: float = 0.8  # Minimum local model confidence; below it the LLM decides
+    ROUTER_DATA_PATH: str = "data/router_queries.jsonl"  # Labeled queries used to train the router
+    ROUTER_MODEL_PATH: str = "data/query_router.json"  # Trained model (trained at startup if missing)
+    
+    # Prompt Context Budget Configuration
+    CONTEXT_MUSIC_BUDGET_TOKENS: int = 3000  # Whole prompt: prefix, context, history and query
+    CONTEXT_INVOICE_BUDGET_TOKENS: int = 3000
+    CONTEXT_MAX_LIST_ITEMS: int = 20  # Items kept per list in profile/customer/tool data
+    CONTEXT_SUMMARY_TOKENS: int = 96  # Reserved for the summary of dropped history turns
+
+    # Verified Session Configuration
+    SESSION_ENABLED: bool = True  # Let verified customers skip the customer lookup on later turns
+    SESSION_TTL: float = 1800.0  # Seconds a verification stays valid (not extended by use)
+    SESSION_MAX_SIZE: int = 10000  # Live sessions kept before the least recently used is dropped
+
+    # Tracing Configuration
+    TRACING_ENABLED: bool = False  # Record per-stage spans to a local file
+    TRACE_EXPORT_PATH: str = "traces/spans.jsonl"  # Summarize with: python -m src.core.services.tracing
+    TRACE_BUFFER_SIZE: int = 64  # Spans buffered before each file write
+
+    # Agent Configuration
+    CATALOG_PAGE_SIZE: int = 25  # Rows per page returned by the catalog tools
+    AGENT_MAX_STEPS: int = 5  # Model turns that may request tools before a final answer is forced
+    AGENT_TOOL_WORKERS: int = 8  # Threads running one turn's tool calls in parallel
+
     # Application Configuration
     DEBUG: bool = False
     ENVIRONMENT: str = "production"
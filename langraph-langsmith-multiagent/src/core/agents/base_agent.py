@@ -1,11 +1,12 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
-from langgraph import Agent
+from typing import Any, AsyncIterator, Dict, List, Optional
 from langgraph.checkpoint.memory import MemorySaver
 from langgraph.store.memory import InMemoryStore
 from langchain_core.tools import tool
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.messages import HumanMessage
+from src.core.services.tracing import get_tracer
 
 class BaseAgent(ABC):
     def __init__(
@@ -20,7 +21,8 @@ class BaseAgent(ABC):
         
         Args:
             llm: Language model instance
-            tools: List of tools available to the agent
+            tools: List of tools available to the agent (sent with each LLM call and
+                executed by the LLM service's tool loop)
             memory_saver: Short-term memory checkpointer
             in_memory_store: Long-term memory store
         """
@@ -28,10 +30,7 @@ class BaseAgent(ABC):
         self.tools = tools or []
         self.memory_saver = memory_saver or MemorySaver()
         self.in_memory_store = in_memory_store or InMemoryStore()
-        
-        # Initialize the agent with tools
-        if self.tools:
-            self.llm = self.llm.bind_tools(self.tools)
+        self.tracer = get_tracer()
 
     @abstractmethod
     def get_prompt_template(self) -> ChatPromptTemplate:
@@ -43,6 +42,14 @@ class BaseAgent(ABC):
         """Process a request and return a response."""
         pass
 
+    async def aprocess_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Process a request without blocking the event loop (runs process_request in a worker thread)."""
+        return await asyncio.to_thread(self.process_request, request)
+
+    async def astream_request(self, request: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Stream a request as events (agents without a streaming path emit only the final result)."""
+        yield {"event": "result", "data": await self.aprocess_request(request)}
+
     def _get_user_profile(self, customer_id: str) -> Dict[str, Any]:
         """Retrieve user profile from long-term memory."""
         try:
@@ -50,6 +57,16 @@ class BaseAgent(ABC):
         except KeyError:
             return {}
 
+    def _resolve_user_profile(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Use the profile the supervisor prefetched for this request, or load it."""
+        if "user_profile" in request:
+            return request["user_profile"] or {}
+        customer_id = request.get("customer_id")
+        if not customer_id:
+            return {}
+        with self.tracer.span("agent.load_profile"):
+            return self._get_user_profile(customer_id)
+
     def _update_user_profile(self, customer_id: str, profile_data: Dict[str, Any]) -> None:
         """Update user profile in long-term memory."""
         self.in_memory_store.put("user_profiles", customer_id, profile_data)
@@ -1,37 +1,59 @@
-from typing import Any, Dict, List, Optional
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional
 from langchain_core.tools import tool
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.store.memory import InMemoryStore
 from src.core.agents.base_agent import BaseAgent
 from src.core.services.database_service import DatabaseService
+from src.core.services.llm_client import get_llm_client
 from src.core.services.llm_service import LLMService
 
 class InvoiceInfoAgent(BaseAgent):
     def __init__(
         self,
-        llm: Any,
+        llm: Any = None,
         tools: List[Any] = None,
         memory_saver: Optional[MemorySaver] = None,
         in_memory_store: Optional[InMemoryStore] = None,
     ):
+        llm = llm or get_llm_client()
         super().__init__(llm, tools, memory_saver, in_memory_store)
         self.db_service = DatabaseService()
         self.llm_service = LLMService()
-        
-        # Initialize tools if not provided
-        if not tools:
-            self._initialize_tools()
 
-    def _initialize_tools(self):
-        """Initialize the tools for the invoice information agent."""
-        self.tools = [
-            self.get_customer_info,
-            self.get_invoice_details,
-            self.get_purchase_history,
-        ]
-        self.llm = self.llm.bind_tools(self.tools)
+    def _customer_tools(self, customer_id: str) -> List[Any]:
+        """
+        Build the tools for one request, bound to the request's customer.
+        
+        The customer ID is not part of the tool schemas, so the model can
+        only reach the data of the customer making the request.
+        
+        Args:
+            customer_id: Verified ID of the customer making the request
+            
+        Returns:
+            Tools to send with the request's LLM calls (tools passed to the
+            constructor are used as they are)
+        """
+        if self.tools:
+            return self.tools
+        
+        def get_customer_info() -> Dict[str, Any]:
+            """Get the customer's account information."""
+            return self.get_customer_info(customer_id)
+        
+        def get_invoice_details(invoice_id: str) -> Dict[str, Any]:
+            """Get the details of one of the customer's invoices by invoice ID."""
+            return self.get_invoice_details(invoice_id, customer_id)
+        
+        def get_purchase_history() -> Dict[str, Any]:
+            """Get the customer's recent purchases."""
+            return self.get_purchase_history(customer_id)
+        
+        return [tool(get_customer_info), tool(get_invoice_details), tool(get_purchase_history)]
 
-    @tool
     def get_customer_info(self, customer_id: str) -> Dict[str, Any]:
         """
         Get customer information from the database.
@@ -44,20 +66,23 @@ class InvoiceInfoAgent(BaseAgent):
         """
         return self.db_service.get_customer_info(customer_id)
 
-    @tool
-    def get_invoice_details(self, invoice_id: str) -> Dict[str, Any]:
+    def get_invoice_details(self, invoice_id: str, customer_id: str) -> Dict[str, Any]:
         """
-        Get invoice details from the database.
+        Get details of an invoice belonging to a customer.
         
         Args:
             invoice_id: ID of the invoice
+            customer_id: ID of the customer the invoice must belong to
             
         Returns:
-            Dictionary with invoice information
+            Dictionary with invoice information, or an error if the invoice
+            does not exist or belongs to another customer
         """
-        return self.db_service.get_invoice_details(invoice_id)
+        invoice = self.db_service.get_customer_invoice_details(customer_id, invoice_id)
+        if invoice is None:
+            return {"error": f"Invoice {invoice_id} was not found for this customer"}
+        return invoice
 
-    @tool
     def get_purchase_history(self, customer_id: str) -> Dict[str, Any]:
         """
         Get purchase history for a customer.
@@ -101,8 +126,12 @@ class InvoiceInfoAgent(BaseAgent):
         if not customer_id:
             return {"error": "Customer ID is required for invoice information"}
             
-        # Get customer info
-        customer_info = self.get_customer_info(customer_id)
+        # Get customer info (prefetched by the supervisor when available)
+        if "customer_info" in request:
+            customer_info = request["customer_info"]
+        else:
+            with self.tracer.span("agent.customer_info"):
+                customer_info = self.get_customer_info(customer_id)
         if not customer_info:
             return {"error": "Customer not found"}
         
@@ -110,7 +139,76 @@ class InvoiceInfoAgent(BaseAgent):
         response = self.llm_service.process_invoice_query(
             query=query,
             customer_info=customer_info,
-            tools=self.tools
+            tools=self._customer_tools(customer_id),
+            chat_history=request.get("chat_history")
         )
         
         return response
+
+    async def aprocess_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Process an invoice-related request without blocking the event loop.
+        
+        Args:
+            request: Dictionary containing customer query and optional customer_id
+            
+        Returns:
+            Response with invoice information
+        """
+        customer_id = request.get("customer_id")
+        query = request.get("query")
+        
+        if not customer_id:
+            return {"error": "Customer ID is required for invoice information"}
+            
+        if "customer_info" in request:
+            customer_info = request["customer_info"]
+        else:
+            # Database access is synchronous; keep it off the event loop
+            with self.tracer.span("agent.customer_info"):
+                customer_info = await asyncio.to_thread(self.get_customer_info, customer_id)
+        if not customer_info:
+            return {"error": "Customer not found"}
+        
+        return await self.llm_service.aprocess_invoice_query(
+            query=query,
+            customer_info=customer_info,
+            tools=self._customer_tools(customer_id),
+            chat_history=request.get("chat_history")
+        )
+
+    async def astream_request(self, request: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream an invoice-related request as tool, token and result events.
+        
+        Args:
+            request: Dictionary containing customer query and optional customer_id
+            
+        Yields:
+            Event dictionaries with ``event`` and ``data`` keys
+        """
+        customer_id = request.get("customer_id")
+        query = request.get("query")
+        
+        if not customer_id:
+            yield {"event": "result", "data": {"error": "Customer ID is required for invoice information"}}
+            return
+        
+        if "customer_info" in request:
+            customer_info = request["customer_info"]
+        else:
+            yield {"event": "tool_call", "data": {"name": "get_customer_info", "args": {"customer_id": customer_id}}}
+            with self.tracer.span("agent.customer_info"):
+                customer_info = await asyncio.to_thread(self.get_customer_info, customer_id)
+            yield {"event": "tool_result", "data": {"name": "get_customer_info", "found": bool(customer_info)}}
+        if not customer_info:
+            yield {"event": "result", "data": {"error": "Customer not found"}}
+            return
+        
+        async for event in self.llm_service.astream_invoice_query(
+            query=query,
+            customer_info=customer_info,
+            tools=self._customer_tools(customer_id),
+            chat_history=request.get("chat_history")
+        ):
+            yield event
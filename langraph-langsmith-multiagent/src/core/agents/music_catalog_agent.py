@@ -1,20 +1,25 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 from langchain_core.tools import tool
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.store.memory import InMemoryStore
 from langchain_core.tools import Tool
+from src.config.settings import settings
 from src.core.agents.base_agent import BaseAgent
 from src.core.services.database_service import DatabaseService
+from src.core.services.llm_client import get_llm_client
 from src.core.services.llm_service import LLMService
 
 class MusicCatalogAgent(BaseAgent):
     def __init__(
         self,
-        llm: Any,
+        llm: Any = None,
         tools: List[Any] = None,
         memory_saver: Optional[MemorySaver] = None,
         in_memory_store: Optional[InMemoryStore] = None,
     ):
+        llm = llm or get_llm_client()
         super().__init__(llm, tools, memory_saver, in_memory_store)
         self.db_service = DatabaseService()
         self.llm_service = LLMService()
@@ -26,39 +31,39 @@ class MusicCatalogAgent(BaseAgent):
     def _initialize_tools(self):
         """Initialize the tools for the music catalog agent."""
         self.tools = [
-            self.get_albums_by_artist,
-            self.get_artist_by_genre,
-            self.get_top_tracks,
+            tool(self.get_albums_by_artist),
+            tool(self.get_artist_by_genre),
+            tool(self.get_top_tracks),
         ]
-        self.llm = self.llm.bind_tools(self.tools)
 
-    @tool
-    def get_albums_by_artist(self, artist: str) -> Dict[str, Any]:
+    def get_albums_by_artist(self, artist: str, after_id: int = 0, limit: int = settings.CATALOG_PAGE_SIZE) -> Dict[str, Any]:
         """
-        Get albums by artist from the database.
+        Get a page of albums by artist from the database.
         
         Args:
             artist: Name of the artist
+            after_id: Pass the previous page's next_after_id to get the next page
+            limit: Maximum number of albums to return
             
         Returns:
-            Dictionary with album information
+            Dictionary with album information and next_after_id
         """
-        return self.db_service.get_albums_by_artist(artist)
+        return self.db_service.get_albums_by_artist(artist, after_id=after_id, limit=limit)
 
-    @tool
-    def get_artist_by_genre(self, genre: str) -> Dict[str, Any]:
+    def get_artist_by_genre(self, genre: str, after_id: int = 0, limit: int = settings.CATALOG_PAGE_SIZE) -> Dict[str, Any]:
         """
-        Get artists by genre from the database.
+        Get a page of artists by genre from the database.
         
         Args:
             genre: Music genre
+            after_id: Pass the previous page's next_after_id to get the next page
+            limit: Maximum number of artists to return
             
         Returns:
-            Dictionary with artist information
+            Dictionary with artist information and next_after_id
         """
-        return self.db_service.get_artist_by_genre(genre)
+        return self.db_service.get_artist_by_genre(genre, after_id=after_id, limit=limit)
 
-    @tool
     def get_top_tracks(self, artist: str) -> Dict[str, Any]:
         """
         Get top tracks for an artist.
@@ -98,18 +103,72 @@ class MusicCatalogAgent(BaseAgent):
         customer_id = request.get("customer_id")
         query = request.get("query")
         
-        # Get user profile
-        user_profile = self._get_user_profile(customer_id) if customer_id else {}
+        # Get user profile (prefetched by the supervisor when available)
+        user_profile = self._resolve_user_profile(request)
         
         # Process query using LLM
         response = self.llm_service.process_music_query(
             query=query,
             user_profile=user_profile,
-            tools=self.tools
+            tools=self.tools,
+            chat_history=request.get("chat_history")
         )
         
         # Update user profile if new preferences were mentioned
-        if "music_preferences" in response:
+        if customer_id and "music_preferences" in response:
             self._update_user_profile(customer_id, response["music_preferences"])
         
         return response
+
+    async def aprocess_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Process a music-related request without blocking the event loop.
+        
+        Args:
+            request: Dictionary containing customer query and optional customer_id
+            
+        Returns:
+            Response with music information
+        """
+        customer_id = request.get("customer_id")
+        query = request.get("query")
+        
+        user_profile = self._resolve_user_profile(request)
+        
+        response = await self.llm_service.aprocess_music_query(
+            query=query,
+            user_profile=user_profile,
+            tools=self.tools,
+            chat_history=request.get("chat_history")
+        )
+        
+        if customer_id and "music_preferences" in response:
+            self._update_user_profile(customer_id, response["music_preferences"])
+        
+        return response
+
+    async def astream_request(self, request: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a music-related request as LLM token events followed by the result.
+        
+        Args:
+            request: Dictionary containing customer query and optional customer_id
+            
+        Yields:
+            Event dictionaries with ``event`` and ``data`` keys
+        """
+        customer_id = request.get("customer_id")
+        query = request.get("query")
+        
+        user_profile = self._resolve_user_profile(request)
+        
+        async for event in self.llm_service.astream_music_query(
+            query=query,
+            user_profile=user_profile,
+            tools=self.tools,
+            chat_history=request.get("chat_history")
+        ):
+            response = event["data"]
+            if event["event"] == "result" and customer_id and "music_preferences" in response:
+                self._update_user_profile(customer_id, response["music_preferences"])
+            yield event
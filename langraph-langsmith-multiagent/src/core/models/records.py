@@ -0,0 +1,92 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional
+
+
+class Record:
+    """
+    Base class for the compact row types returned by the database services.
+
+    Subclasses are slotted dataclasses (no per-instance ``__dict__``), which
+    orjson serializes natively. They also behave like read-only mappings
+    (``record["title"]``, ``record.get("email")``, ``dict(record)``, equality
+    with plain dicts) so callers written against the old dict rows keep working.
+    """
+
+    __slots__ = ()
+
+    def keys(self) -> tuple:
+        return self.__slots__
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.__slots__
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__slots__)
+
+    def __len__(self) -> int:
+        return len(self.__slots__)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in self.__slots__ else default
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the record to a plain dictionary."""
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Record):
+            return type(self) is type(other) and self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class AlbumRecord(Record):
+    id: int
+    title: str
+    artist: str
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class ArtistRecord(Record):
+    id: int
+    name: str
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class TrackRecord(Record):
+    id: int
+    name: str
+    album: str
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class CustomerRecord(Record):
+    id: int
+    name: str
+    email: Optional[str]
+    phone: Optional[str]
+    company: Optional[str]
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class InvoiceRecord(Record):
+    id: int
+    date: Any
+    address: Optional[str]
+    total: float
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class PurchaseRecord(Record):
+    id: int
+    date: Any
+    total: float
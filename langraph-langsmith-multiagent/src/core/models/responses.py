@@ -0,0 +1,85 @@
+from typing import Any, Dict, List, Optional, Type
+from pydantic import BaseModel, ConfigDict, field_validator
+
+
+class MusicPreferences(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    genres: List[str] = []
+    artists: List[str] = []
+
+    @field_validator("genres", "artists", mode="before")
+    @classmethod
+    def _clean_names(cls, value: Any) -> List[str]:
+        """Accept a single name or a list; drop blanks and duplicates, keeping order."""
+        if value is None:
+            return []
+        if isinstance(value, str):
+            value = [value]
+        cleaned, seen = [], set()
+        for item in value:
+            if not isinstance(item, str):
+                continue
+            name = " ".join(item.split())
+            if name and name.lower() not in seen:
+                seen.add(name.lower())
+                cleaned.append(name)
+        return cleaned
+
+
+class MusicResponse(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    response: str
+    music_preferences: Optional[MusicPreferences] = None
+
+    @field_validator("music_preferences", mode="after")
+    @classmethod
+    def _drop_empty_preferences(cls, value: Optional[MusicPreferences]) -> Optional[MusicPreferences]:
+        """An empty preference object carries no update."""
+        if value is not None and not value.genres and not value.artists:
+            return None
+        return value
+
+
+class InvoiceResponse(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    response: str
+    sensitive: Optional[bool] = None  # Left unset when the model omits it (treated as sensitive)
+
+
+class SynthesisResponse(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    response: str
+
+
+# Output schema per agent; matches the JSON structure requested in each prompt
+RESPONSE_SCHEMAS: Dict[str, Type[BaseModel]] = {
+    "music": MusicResponse,
+    "invoice": InvoiceResponse,
+    "synthesis": SynthesisResponse,
+}
+
+
+def parse_agent_response(agent: str, content: Any) -> Dict[str, Any]:
+    """
+    Parse and validate an agent's JSON answer in a single pass.
+
+    Args:
+        agent: Agent name selecting the schema
+        content: Raw JSON text (or an already decoded mapping)
+
+    Returns:
+        Validated result as a plain dictionary (unset optional fields omitted)
+
+    Raises:
+        pydantic.ValidationError: If the answer is not valid JSON or does not match the schema
+    """
+    schema = RESPONSE_SCHEMAS[agent]
+    if isinstance(content, (str, bytes)):
+        result = schema.model_validate_json(content)
+    else:
+        result = schema.model_validate(content)
+    return result.model_dump(exclude_none=True)
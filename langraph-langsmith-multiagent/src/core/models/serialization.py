@@ -0,0 +1,51 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+from src.core.models.records import Record
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    """Serialize values neither encoder handles natively."""
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value: Any) -> bytes:
+    """
+    Serialize a result to compact JSON bytes.
+
+    Uses orjson when installed (records are slotted dataclasses, which it
+    encodes natively) and falls back to the standard library otherwise.
+    """
+    if orjson is not None:
+        return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, default=_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def to_sse(event: str, data: Any) -> bytes:
+    """Encode one server-sent event with a JSON payload."""
+    return b"event: " + event.encode("utf-8") + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+def to_prompt_text(value: Any) -> str:
+    """Serialize a result for inclusion in an LLM prompt."""
+    if value is None:
+        return "{}"
+    if isinstance(value, str):
+        return value
+    return dumps(value).decode("utf-8")
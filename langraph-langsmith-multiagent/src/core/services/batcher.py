@@ -0,0 +1,110 @@
+import asyncio
+import threading
+import weakref
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+
+class _BatchState:
+    __slots__ = ("items", "timer", "running")
+
+    def __init__(self):
+        self.items: List[Tuple[Any, asyncio.Future]] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.running: Set[asyncio.Task] = set()
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        process_batch: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch_size: int = 8,
+        max_wait: float = 0.005,
+    ):
+        """
+        Collect concurrent submissions for a short window and process them together.
+
+        A batch is dispatched when it reaches ``max_batch_size`` items or when
+        ``max_wait`` seconds have passed since its first item, whichever comes
+        first. Results are handed back to each waiting caller in order.
+
+        Args:
+            process_batch: Coroutine function mapping a list of items to a list of results
+            max_batch_size: Maximum number of items per batch
+            max_wait: Maximum time in seconds an item waits for the batch to fill
+        """
+        self.process_batch = process_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+        # Pending batches are bound to the event loop their callers run on
+        self._states: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Add an item to the current batch and wait for its result.
+
+        Args:
+            item: Item to process
+
+        Returns:
+            The result for this item
+        """
+        loop = asyncio.get_running_loop()
+        state = self._states.get(loop)
+        if state is None:
+            state = self._states[loop] = _BatchState()
+
+        future = loop.create_future()
+        state.items.append((item, future))
+        if len(state.items) >= self.max_batch_size:
+            self._flush(loop, state)
+        elif state.timer is None:
+            state.timer = loop.call_later(self.max_wait, self._flush, loop, state)
+        return await future
+
+    def _flush(self, loop: asyncio.AbstractEventLoop, state: _BatchState) -> None:
+        if state.timer is not None:
+            state.timer.cancel()
+            state.timer = None
+        batch, state.items = state.items, []
+        if not batch:
+            return
+        task = loop.create_task(self._run(batch))
+        state.running.add(task)
+        task.add_done_callback(state.running.discard)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        with self._lock:
+            self._batches += 1
+            self._items += len(batch)
+        try:
+            results = await self.process_batch([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"Batch of {len(batch)} items returned {len(results)} results")
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            # Callers that gave up (cancelled) simply drop their result
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get batching counters.
+
+        Returns:
+            Dictionary with batch and item counts and the mean batch size
+        """
+        with self._lock:
+            return {
+                "batches": self._batches,
+                "items": self._items,
+                "mean_batch_size": self._items / self._batches if self._batches else 0.0,
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+            }
@@ -0,0 +1,205 @@
+import functools
+import inspect
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+# Marker for "not cached"; lets lookups that legitimately return None be cached.
+_MISSING = object()
+
+
+def normalize_cache_args(args: Tuple[Any, ...]) -> Tuple[Hashable, ...]:
+    """
+    Normalize call arguments into a cache key component.
+
+    Strings are stripped and lower-cased (the catalog lookups are
+    case-insensitive) and IDs are compared by their string form, so
+    ``get_customer_info(1)`` and ``get_customer_info(" 1 ")`` share an entry.
+    """
+    normalized = []
+    for arg in args:
+        if arg is None or isinstance(arg, bool):
+            normalized.append(arg)
+        elif isinstance(arg, (list, tuple, set, frozenset)):
+            normalized.append(normalize_cache_args(tuple(sorted(arg, key=str))))
+        else:
+            normalized.append(str(arg).strip().lower())
+    return tuple(normalized)
+
+
+def copy_value(value: Any) -> Any:
+    """
+    Copy the dict and list containers of a cached value.
+
+    Records are frozen and scalars immutable, so they are shared; only the
+    containers around them are copied, which keeps a hit cheap while stopping
+    one caller's edits from reaching the next.
+    """
+    if isinstance(value, dict):
+        return {key: copy_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [copy_value(item) for item in value]
+    return value
+
+
+class ResultCache:
+    def __init__(
+        self,
+        max_size: int = 1024,
+        default_ttl: float = 60.0,
+        ttls: Optional[Dict[str, float]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Size-bounded LRU cache with per-method TTLs.
+
+        Values are copied on the way in and out (see ``copy_value``), so
+        callers may modify what they get back.
+
+        Args:
+            max_size: Maximum number of entries before the least recently used is evicted
+            default_ttl: TTL in seconds for methods without an explicit TTL
+            ttls: TTL in seconds per method name (0 disables caching for that method)
+            clock: Monotonic time source
+        """
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+        self.ttls = dict(ttls or {})
+        self._clock = clock
+        self._entries: "OrderedDict[Tuple[str, Tuple[Hashable, ...]], Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = Counter()
+        self._misses = Counter()
+        self._evictions = 0
+
+    def ttl_for(self, method: str) -> float:
+        """Get the TTL configured for a method."""
+        return self.ttls.get(method, self.default_ttl)
+
+    def get(self, method: str, args: Tuple[Any, ...]) -> Any:
+        """
+        Look up a cached result.
+
+        Returns:
+            The cached value, or the module-level ``_MISSING`` marker
+        """
+        key = (method, normalize_cache_args(args))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > self._clock():
+                    self._entries.move_to_end(key)
+                    self._hits[method] += 1
+                    return copy_value(value)
+                del self._entries[key]
+            self._misses[method] += 1
+            return _MISSING
+
+    def set(self, method: str, args: Tuple[Any, ...], value: Any, expires_at: Optional[float] = None) -> None:
+        """
+        Store a result for a method call, evicting the LRU entry if full.
+
+        Args:
+            method: Method name
+            args: Call arguments
+            value: Result to cache
+            expires_at: Expiry time on the cache clock (defaults to now plus the method TTL)
+        """
+        ttl = self.ttl_for(method)
+        if ttl <= 0 or self.max_size <= 0:
+            return
+        if expires_at is None:
+            expires_at = self._clock() + ttl
+        key = (method, normalize_cache_args(args))
+        with self._lock:
+            self._entries[key] = (expires_at, copy_value(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, method: Optional[str] = None, *args: Any) -> int:
+        """
+        Drop cached entries.
+
+        Args:
+            method: Method name to invalidate (all methods if omitted)
+            *args: Call arguments to invalidate (all calls of the method if omitted)
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            if method is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                return removed
+            if args:
+                return 1 if self._entries.pop((method, normalize_cache_args(args)), None) else 0
+            keys = [key for key in self._entries if key[0] == method]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._hits.clear()
+            self._misses.clear()
+            self._evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache hit/miss counters.
+
+        Returns:
+            Dictionary with totals, hit rate and per-method counters
+        """
+        with self._lock:
+            hits = sum(self._hits.values())
+            misses = sum(self._misses.values())
+            methods = set(self._hits) | set(self._misses)
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": hits,
+                "misses": misses,
+                "evictions": self._evictions,
+                "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+                "methods": {
+                    method: {"hits": self._hits[method], "misses": self._misses[method]}
+                    for method in sorted(methods)
+                },
+            }
+
+
+def cached(method: Callable) -> Callable:
+    """
+    Read-through caching for service methods.
+
+    The decorated method's instance must expose a ``cache`` attribute holding a
+    ``ResultCache`` (or ``None`` to disable caching). Each caller gets its own
+    copy of the cached containers.
+    """
+    name = method.__name__
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        cache = getattr(self, "cache", None)
+        if cache is None:
+            return method(self, *args, **kwargs)
+        # Bind to the signature so positional, keyword and defaulted calls share a key
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        key_args = tuple(bound.arguments.values())[1:]
+        value = cache.get(name, key_args)
+        if value is _MISSING:
+            value = method(self, *args, **kwargs)
+            cache.set(name, key_args, value)
+        return value
+
+    return wrapper
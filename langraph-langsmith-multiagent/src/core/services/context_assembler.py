@@ -0,0 +1,285 @@
+import logging
+import threading
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage, convert_to_messages
+from src.config.settings import settings
+from src.core.models.serialization import to_prompt_text
+from src.core.services.prompt_registry import CompiledPrompt, count_tokens
+
+logger = logging.getLogger(__name__)
+
+# Per-message framing tokens the chat format adds on top of the content
+MESSAGE_OVERHEAD_TOKENS = 4
+TRUNCATION_MARKER = " ...(truncated)"
+SUMMARY_PREFIX = "Summary of earlier conversation: "
+# Words kept from each dropped user turn in the extractive summary
+SUMMARY_WORDS_PER_TURN = 12
+
+
+def cap_lists(value: Any, max_items: int) -> Tuple[Any, int]:
+    """
+    Cap every list in a (nested) tool result.
+
+    Args:
+        value: Dictionary, list or scalar to cap
+        max_items: Maximum number of items kept per list
+
+    Returns:
+        Tuple of the capped value and the number of list items dropped
+    """
+    if isinstance(value, dict):
+        capped, dropped = {}, 0
+        for key, item in value.items():
+            capped[key], item_dropped = cap_lists(item, max_items)
+            dropped += item_dropped
+        return capped, dropped
+    if isinstance(value, (list, tuple)):
+        dropped = max(0, len(value) - max_items)
+        capped = []
+        for item in value[:max_items]:
+            capped_item, item_dropped = cap_lists(item, max_items)
+            capped.append(capped_item)
+            dropped += item_dropped
+        return capped, dropped
+    return value, 0
+
+
+def truncate_to_tokens(text: str, max_tokens: int, counter: Callable[[str], int] = count_tokens) -> str:
+    """Cut text (keeping its start) until it fits in ``max_tokens``."""
+    if max_tokens <= 0:
+        return ""
+    if counter(text) <= max_tokens:
+        return text
+    while text and counter(text + TRUNCATION_MARKER) > max_tokens:
+        text = text[:int(len(text) * 0.8)]
+    return text + TRUNCATION_MARKER if text else ""
+
+
+def message_tokens(message: BaseMessage, counter: Callable[[str], int] = count_tokens) -> int:
+    """Count the tokens a message adds to a prompt."""
+    content = message.content if isinstance(message.content, str) else to_prompt_text(message.content)
+    return counter(content) + MESSAGE_OVERHEAD_TOKENS
+
+
+@dataclass
+class TrimReport:
+    agent: str
+    budget_tokens: int
+    prompt_tokens: int = 0
+    history_messages_dropped: int = 0
+    history_tokens_dropped: int = 0
+    list_items_dropped: int = 0
+    fields_truncated: List[str] = field(default_factory=list)
+    summarized: bool = False
+
+    @property
+    def trimmed(self) -> bool:
+        return bool(self.history_messages_dropped or self.list_items_dropped or self.fields_truncated)
+
+
+@dataclass
+class AssembledPrompt:
+    messages: List[BaseMessage]
+    fields: Dict[str, str]
+    history: List[BaseMessage]
+    report: TrimReport
+
+
+class ContextAssembler:
+    def __init__(
+        self,
+        budgets: Optional[Dict[str, int]] = None,
+        default_budget: int = 4000,
+        max_list_items: int = 20,
+        summary_tokens: int = 96,
+        counter: Callable[[str], int] = count_tokens,
+    ):
+        """
+        Fit prompt context (profile/customer data, chat history) into a per-agent token budget.
+
+        The static prefix and the query are always kept. Context fields come
+        next: their lists are capped, then capped harder, then the text is
+        cut. Chat history gets whatever is left, newest turns first; older
+        turns are replaced by a short extractive summary.
+
+        Args:
+            budgets: Total prompt token budget per agent
+            default_budget: Budget for agents without an explicit one
+            max_list_items: Maximum items kept per list in context fields
+            summary_tokens: Tokens reserved for the summary of dropped turns
+            counter: Token counter
+        """
+        self.budgets = dict(budgets or {})
+        self.default_budget = default_budget
+        self.max_list_items = max_list_items
+        self.summary_tokens = summary_tokens
+        self._count = counter
+        self._lock = threading.Lock()
+        self._requests = Counter()
+        self._totals: Dict[str, Counter] = defaultdict(Counter)
+
+    def budget_for(self, agent: str) -> int:
+        """Get the prompt token budget for an agent."""
+        return self.budgets.get(agent, self.default_budget)
+
+    def cap_tool_result(self, value: Any) -> Any:
+        """Cap list-valued tool results before they are rendered into a prompt."""
+        return cap_lists(value, self.max_list_items)[0]
+
+    def _render_field(self, value: Any, max_items: int) -> Tuple[str, int]:
+        capped, dropped = cap_lists(value, max_items)
+        text = to_prompt_text(capped)
+        if dropped:
+            text += f" ({dropped} more items omitted)"
+        return text, dropped
+
+    def _fit_fields(self, fields: Dict[str, Any], available: int, report: TrimReport) -> Dict[str, str]:
+        max_items = self.max_list_items
+        while True:
+            rendered = {name: self._render_field(value, max_items) for name, value in fields.items()}
+            total = sum(self._count(text) for text, _ in rendered.values())
+            if total <= available or max_items <= 1:
+                break
+            max_items //= 2
+
+        report.list_items_dropped = sum(dropped for _, dropped in rendered.values())
+        texts = {name: text for name, (text, _) in rendered.items()}
+        if total > available and texts:
+            # Still too large with one item per list: cut each field to its share of the budget
+            share = max(available, 0) // len(texts)
+            for name, text in texts.items():
+                if self._count(text) > share:
+                    texts[name] = truncate_to_tokens(text, share, self._count)
+                    report.fields_truncated.append(name)
+        return texts
+
+    def _summarize(self, dropped: Sequence[BaseMessage], max_tokens: int) -> Optional[SystemMessage]:
+        turns = []
+        for message in dropped:
+            if isinstance(message, HumanMessage) and isinstance(message.content, str):
+                words = message.content.split()
+                snippet = " ".join(words[:SUMMARY_WORDS_PER_TURN])
+                turns.append(snippet + ("..." if len(words) > SUMMARY_WORDS_PER_TURN else ""))
+        if not turns:
+            return None
+        content = truncate_to_tokens(
+            f"{SUMMARY_PREFIX}the user previously asked: " + "; ".join(turns),
+            max_tokens - MESSAGE_OVERHEAD_TOKENS,
+            self._count,
+        )
+        return SystemMessage(content=content) if content else None
+
+    def _fit_history(self, history: List[BaseMessage], available: int, report: TrimReport) -> List[BaseMessage]:
+        sizes = [message_tokens(message, self._count) for message in history]
+        if sum(sizes) <= available:
+            return history
+
+        reserve = min(self.summary_tokens, max(available, 0))
+        remaining = available - reserve
+        kept_from = len(history)
+        # Keep the newest turns that fit
+        while kept_from > 0 and sizes[kept_from - 1] <= remaining:
+            kept_from -= 1
+            remaining -= sizes[kept_from]
+
+        dropped = history[:kept_from]
+        report.history_messages_dropped = len(dropped)
+        report.history_tokens_dropped = sum(sizes[:kept_from])
+        summary = self._summarize(dropped, reserve) if reserve > MESSAGE_OVERHEAD_TOKENS else None
+        report.summarized = summary is not None
+        return ([summary] if summary is not None else []) + history[kept_from:]
+
+    def assemble(
+        self,
+        agent: str,
+        prompt: CompiledPrompt,
+        query: str,
+        fields: Dict[str, Any],
+        chat_history: Optional[Sequence[Any]] = None,
+    ) -> AssembledPrompt:
+        """
+        Build the messages for one call within the agent's token budget.
+
+        Args:
+            agent: Agent name (selects the budget)
+            prompt: Compiled prompt to render
+            query: User query
+            fields: Context values for the prompt's template fields
+            chat_history: Earlier messages (message objects or role/content dicts)
+
+        Returns:
+            The rendered messages plus a report of what was trimmed
+        """
+        budget = self.budget_for(agent)
+        report = TrimReport(agent=agent, budget_tokens=budget)
+
+        fixed = prompt.prefix_tokens + self._count(query or "") + 2 * MESSAGE_OVERHEAD_TOKENS
+        texts = self._fit_fields(fields, budget - fixed, report)
+        used = fixed + sum(self._count(text) for text in texts.values())
+
+        history = convert_to_messages(chat_history) if chat_history else []
+        history = self._fit_history(history, budget - used, report)
+        report.prompt_tokens = used + sum(message_tokens(message, self._count) for message in history)
+
+        self._record(report)
+        messages = prompt.format_messages(chat_history=history, query=query, **texts)
+        return AssembledPrompt(messages=messages, fields=texts, history=history, report=report)
+
+    def _record(self, report: TrimReport) -> None:
+        with self._lock:
+            self._requests[report.agent] += 1
+            totals = self._totals[report.agent]
+            totals["prompt_tokens"] += report.prompt_tokens
+            totals["history_messages_dropped"] += report.history_messages_dropped
+            totals["history_tokens_dropped"] += report.history_tokens_dropped
+            totals["list_items_dropped"] += report.list_items_dropped
+            totals["fields_truncated"] += len(report.fields_truncated)
+            totals["trimmed_requests"] += int(report.trimmed)
+        if report.trimmed:
+            logger.debug(
+                "Trimmed %s prompt to %d tokens: %d history messages, %d list items, fields %s",
+                report.agent,
+                report.prompt_tokens,
+                report.history_messages_dropped,
+                report.list_items_dropped,
+                report.fields_truncated,
+            )
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get trimming counters per agent.
+
+        Returns:
+            Dictionary with requests, mean prompt tokens and trimming totals per agent
+        """
+        with self._lock:
+            result = {}
+            for agent, requests in self._requests.items():
+                totals = self._totals[agent]
+                result[agent] = {
+                    "requests": requests,
+                    "budget_tokens": self.budget_for(agent),
+                    "mean_prompt_tokens": totals["prompt_tokens"] / requests,
+                    "trimmed_requests": totals["trimmed_requests"],
+                    "history_messages_dropped": totals["history_messages_dropped"],
+                    "history_tokens_dropped": totals["history_tokens_dropped"],
+                    "list_items_dropped": totals["list_items_dropped"],
+                    "fields_truncated": totals["fields_truncated"],
+                }
+            return result
+
+
+@lru_cache()
+def get_context_assembler() -> ContextAssembler:
+    """Get the process-wide context assembler."""
+    return ContextAssembler(
+        budgets={
+            "music": settings.CONTEXT_MUSIC_BUDGET_TOKENS,
+            "invoice": settings.CONTEXT_INVOICE_BUDGET_TOKENS,
+        },
+        max_list_items=settings.CONTEXT_MAX_LIST_ITEMS,
+        summary_tokens=settings.CONTEXT_SUMMARY_TOKENS,
+    )
@@ -0,0 +1,196 @@
+import re
+import threading
+import time
+from typing import Callable, Dict, Optional, Set, Tuple
+from sqlalchemy import text
+
+CUSTOMER_DIRECTORY_SCHEMA = (
+    "CREATE INDEX IF NOT EXISTS idx_customer_email ON Customer (Email COLLATE NOCASE)",
+    "CREATE INDEX IF NOT EXISTS idx_customer_phone ON Customer (Phone)",
+    """
+    CREATE TABLE IF NOT EXISTS customer_directory_version (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        version INTEGER NOT NULL
+    )
+    """,
+    "INSERT OR IGNORE INTO customer_directory_version (id, version) VALUES (1, 0)",
+    """
+    CREATE TRIGGER IF NOT EXISTS customer_directory_insert AFTER INSERT ON Customer BEGIN
+        UPDATE customer_directory_version SET version = version + 1 WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS customer_directory_update AFTER UPDATE OF CustomerId, Email, Phone ON Customer BEGIN
+        UPDATE customer_directory_version SET version = version + 1 WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS customer_directory_delete AFTER DELETE ON Customer BEGIN
+        UPDATE customer_directory_version SET version = version + 1 WHERE id = 1;
+    END
+    """,
+)
+
+CUSTOMER_DIRECTORY_VERSION_QUERY = text("SELECT version FROM customer_directory_version WHERE id = 1")
+
+CUSTOMER_IDENTIFIERS_QUERY = text("SELECT CustomerId, Email, Phone FROM Customer")
+
+CUSTOMER_BY_EMAIL_QUERY = text("SELECT CustomerId FROM Customer WHERE Email = :email COLLATE NOCASE")
+
+CUSTOMER_BY_PHONE_QUERY = text("SELECT CustomerId FROM Customer WHERE Phone = :phone")
+
+_PHONE_CHARACTERS = re.compile(r"^\+?[\d\s().\-/]+$")
+
+
+def normalize_email(email: Optional[str]) -> Optional[str]:
+    """Normalize an email address for lookups."""
+    return email.strip().lower() if email else None
+
+
+def normalize_phone(phone: Optional[str]) -> Optional[str]:
+    """Normalize a phone number to its digits, keeping a leading '+'."""
+    if not phone:
+        return None
+    phone = phone.strip()
+    digits = "".join(character for character in phone if character.isdigit())
+    if not digits:
+        return None
+    return f"+{digits}" if phone.startswith("+") else digits
+
+
+def phone_key(phone: Optional[str]) -> Optional[str]:
+    """Key for the phone map: the digits only, so numbers typed with or without '+' match."""
+    phone = normalize_phone(phone)
+    return phone.lstrip("+") if phone else None
+
+
+def classify_identifier(identifier: str) -> Tuple[str, Optional[str]]:
+    """
+    Work out what kind of customer identifier was given.
+
+    An all-digit identifier is classified as an ID, but ``resolve`` falls
+    back to the phone map for it (unformatted phone numbers look the same).
+
+    Args:
+        identifier: Customer ID, email address or phone number
+
+    Returns:
+        Tuple of ('id' | 'email' | 'phone' | 'unknown', normalized value)
+    """
+    identifier = str(identifier).strip()
+    if "@" in identifier:
+        return "email", normalize_email(identifier)
+    if identifier.isdigit() and not identifier.startswith("0"):
+        return "id", identifier
+    if _PHONE_CHARACTERS.match(identifier):
+        return "phone", normalize_phone(identifier)
+    return "unknown", None
+
+
+class CustomerDirectory:
+    def __init__(self, session_factory: Callable, check_interval: float = 5.0):
+        """
+        In-process hash maps from normalized email/phone to customer ID.
+
+        The maps are reloaded when the Customer table changes; triggers bump a
+        version row on every insert/update/delete and the version is polled at
+        most once per ``check_interval`` seconds.
+
+        Args:
+            session_factory: Callable returning a database session
+            check_interval: Minimum seconds between change checks
+        """
+        self.Session = session_factory
+        self.check_interval = check_interval
+        self.version: Optional[int] = None
+        self._ids: Set[str] = set()
+        self._emails: Dict[str, int] = {}
+        self._phones: Dict[str, int] = {}
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def ensure_schema(self, session) -> None:
+        """Create the Email/Phone indexes, version table and change triggers if missing."""
+        for statement in CUSTOMER_DIRECTORY_SCHEMA:
+            session.execute(text(statement))
+        session.commit()
+
+    def load(self) -> None:
+        """(Re)load the identifier maps from the Customer table."""
+        with self.Session() as session:
+            if self.version is None:
+                self.ensure_schema(session)
+            version = session.execute(CUSTOMER_DIRECTORY_VERSION_QUERY).scalar()
+            rows = session.execute(CUSTOMER_IDENTIFIERS_QUERY).fetchall()
+
+        ids, emails, phones = set(), {}, {}
+        for customer_id, email, phone in rows:
+            ids.add(str(customer_id))
+            if normalize_email(email):
+                emails[normalize_email(email)] = customer_id
+            if phone_key(phone):
+                phones[phone_key(phone)] = customer_id
+        self._ids, self._emails, self._phones = ids, emails, phones
+        self.version = version
+        self._checked_at = time.monotonic()
+
+    def refresh_if_changed(self, force: bool = False) -> bool:
+        """
+        Reload the maps if the Customer table changed since the last load.
+
+        Args:
+            force: Check the version even if the check interval has not elapsed
+
+        Returns:
+            True if the maps were reloaded
+        """
+        with self._lock:
+            if self.version is None:
+                self.load()
+                return True
+            now = time.monotonic()
+            if not force and now - self._checked_at < self.check_interval:
+                return False
+            self._checked_at = now
+            with self.Session() as session:
+                version = session.execute(CUSTOMER_DIRECTORY_VERSION_QUERY).scalar()
+            if version == self.version:
+                return False
+            self.load()
+            return True
+
+    def resolve(self, identifier: str) -> Optional[int]:
+        """
+        Resolve a customer ID, email or phone number to a customer ID.
+
+        Args:
+            identifier: Customer ID, email address or phone number
+
+        Returns:
+            The CustomerId if found, otherwise None
+        """
+        kind, key = classify_identifier(identifier)
+        if kind == "unknown" or not key:
+            return None
+        self.refresh_if_changed()
+        customer_id = self._lookup(kind, key)
+
+        # Not in the maps: the table may have changed since the last check
+        if customer_id is None and self.refresh_if_changed(force=True):
+            customer_id = self._lookup(kind, key)
+        if customer_id is not None:
+            return customer_id
+
+        # Stored values that normalize differently still match on the indexed columns
+        with self.Session() as session:
+            if kind == "email":
+                return session.execute(CUSTOMER_BY_EMAIL_QUERY, {"email": key}).scalar()
+            return session.execute(CUSTOMER_BY_PHONE_QUERY, {"phone": str(identifier).strip()}).scalar()
+
+    def _lookup(self, kind: str, key: str) -> Optional[int]:
+        if kind == "email":
+            return self._emails.get(key)
+        if kind == "id" and key in self._ids:
+            return int(key)
+        # Phone numbers, and digit-only input that is not a customer ID (an unformatted phone number)
+        return self._phones.get(key.lstrip("+"))
@@ -1,73 +1,695 @@
-from typing import Dict, Any, Optional
-from sqlalchemy import create_engine, text
+import time
+from functools import lru_cache
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Optional
+from sqlalchemy import bindparam, create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import sessionmaker
 from src.config.settings import settings
+from src.core.models.records import (
+    AlbumRecord,
+    ArtistRecord,
+    CustomerRecord,
+    InvoiceRecord,
+    PurchaseRecord,
+    TrackRecord,
+)
+from src.core.services.cache_service import ResultCache, _MISSING, cached
+from src.core.services.customer_directory import CustomerDirectory
+from src.core.services.query_stats import QueryStats, get_query_stats
+from src.core.services.tracing import get_tracer
+from src.core.services.replica_service import get_memory_replica
+from src.core.services.rollup_service import has_rollups
+from src.core.services.search_index import has_search_index
+
+ALBUMS_BY_ARTIST_QUERY = text("""
+    SELECT Album.Title as album_title, Album.AlbumId, Artist.Name as artist_name
+    FROM Album
+    JOIN Artist ON Album.ArtistId = Artist.ArtistId
+    WHERE LOWER(Artist.Name) LIKE LOWER(:artist)
+      AND Album.AlbumId > :after_id
+    ORDER BY Album.AlbumId
+    LIMIT :limit
+""")
+
+ARTISTS_BY_GENRE_QUERY = text("""
+    SELECT DISTINCT Artist.Name as artist_name, Artist.ArtistId
+    FROM Artist
+    JOIN Album ON Artist.ArtistId = Album.ArtistId
+    JOIN Track ON Album.AlbumId = Track.AlbumId
+    JOIN Genre ON Track.GenreId = Genre.GenreId
+    WHERE LOWER(Genre.Name) LIKE LOWER(:genre)
+      AND Artist.ArtistId > :after_id
+    ORDER BY Artist.ArtistId
+    LIMIT :limit
+""")
+
+TOP_TRACKS_QUERY = text("""
+    SELECT Track.Name as track_name, Track.TrackId, Album.Title as album_title
+    FROM Track
+    JOIN Album ON Track.AlbumId = Album.AlbumId
+    JOIN Artist ON Album.ArtistId = Artist.ArtistId
+    WHERE LOWER(Artist.Name) LIKE LOWER(:artist)
+    ORDER BY Track.PlayCount DESC
+    LIMIT 10
+""")
+
+# Variants that resolve artist/genre names through the FTS5 trigram indexes
+# (see search_index.py) first and then join on the foreign key indexes.
+ALBUMS_BY_ARTIST_INDEXED_QUERY = text("""
+    WITH matched_artists AS MATERIALIZED (
+        SELECT rowid AS ArtistId FROM artist_search WHERE Name LIKE :artist
+    )
+    SELECT Album.Title as album_title, Album.AlbumId, Artist.Name as artist_name
+    FROM matched_artists
+    JOIN Artist ON Artist.ArtistId = matched_artists.ArtistId
+    JOIN Album ON Album.ArtistId = Artist.ArtistId
+    WHERE Album.AlbumId > :after_id
+    ORDER BY Album.AlbumId
+    LIMIT :limit
+""")
+
+ARTISTS_BY_GENRE_INDEXED_QUERY = text("""
+    WITH matched_genres AS MATERIALIZED (
+        SELECT rowid AS GenreId FROM genre_search WHERE Name LIKE :genre
+    )
+    SELECT DISTINCT Artist.Name as artist_name, Artist.ArtistId
+    FROM matched_genres
+    JOIN Track ON Track.GenreId = matched_genres.GenreId
+    JOIN Album ON Album.AlbumId = Track.AlbumId
+    JOIN Artist ON Artist.ArtistId = Album.ArtistId
+    WHERE Artist.ArtistId > :after_id
+    ORDER BY Artist.ArtistId
+    LIMIT :limit
+""")
+
+TOP_TRACKS_INDEXED_QUERY = text("""
+    WITH matched_artists AS MATERIALIZED (
+        SELECT rowid AS ArtistId FROM artist_search WHERE Name LIKE :artist
+    )
+    SELECT Track.Name as track_name, Track.TrackId, Album.Title as album_title
+    FROM matched_artists
+    JOIN Album ON Album.ArtistId = matched_artists.ArtistId
+    JOIN Track ON Track.AlbumId = Album.AlbumId
+    ORDER BY Track.PlayCount DESC
+    LIMIT 10
+""")
+
+# Variants that read the precomputed artist_genre / top_tracks rollups (see
+# rollup_service.py), turning both lookups into primary key range scans.
+# Artists queued in rollup_dirty_artists by the change triggers are read with
+# the live joins instead, so results stay current until the next refresh.
+ARTISTS_BY_GENRE_ROLLUP_QUERY = text("""
+    WITH matched_genres AS MATERIALIZED (
+        SELECT GenreId FROM Genre WHERE LOWER(Name) LIKE LOWER(:genre)
+    ),
+    genre_artists AS (
+        SELECT artist_genre.ArtistId
+        FROM matched_genres
+        JOIN artist_genre ON artist_genre.GenreId = matched_genres.GenreId
+        WHERE artist_genre.ArtistId NOT IN (SELECT ArtistId FROM rollup_dirty_artists)
+        UNION
+        SELECT Album.ArtistId
+        FROM rollup_dirty_artists
+        JOIN Album ON Album.ArtistId = rollup_dirty_artists.ArtistId
+        JOIN Track ON Track.AlbumId = Album.AlbumId
+        JOIN matched_genres ON matched_genres.GenreId = Track.GenreId
+    )
+    SELECT Artist.Name as artist_name, Artist.ArtistId
+    FROM genre_artists
+    JOIN Artist ON Artist.ArtistId = genre_artists.ArtistId
+    WHERE Artist.ArtistId > :after_id
+    ORDER BY Artist.ArtistId
+    LIMIT :limit
+""")
+
+ARTISTS_BY_GENRE_ROLLUP_INDEXED_QUERY = text("""
+    WITH matched_genres AS MATERIALIZED (
+        SELECT rowid AS GenreId FROM genre_search WHERE Name LIKE :genre
+    ),
+    genre_artists AS (
+        SELECT artist_genre.ArtistId
+        FROM matched_genres
+        JOIN artist_genre ON artist_genre.GenreId = matched_genres.GenreId
+        WHERE artist_genre.ArtistId NOT IN (SELECT ArtistId FROM rollup_dirty_artists)
+        UNION
+        SELECT Album.ArtistId
+        FROM rollup_dirty_artists
+        JOIN Album ON Album.ArtistId = rollup_dirty_artists.ArtistId
+        JOIN Track ON Track.AlbumId = Album.AlbumId
+        JOIN matched_genres ON matched_genres.GenreId = Track.GenreId
+    )
+    SELECT Artist.Name as artist_name, Artist.ArtistId
+    FROM genre_artists
+    JOIN Artist ON Artist.ArtistId = genre_artists.ArtistId
+    WHERE Artist.ArtistId > :after_id
+    ORDER BY Artist.ArtistId
+    LIMIT :limit
+""")
+
+TOP_TRACKS_ROLLUP_QUERY = text("""
+    WITH matched_artists AS MATERIALIZED (
+        SELECT ArtistId FROM Artist WHERE LOWER(Name) LIKE LOWER(:artist)
+    )
+    SELECT top_tracks.TrackName as track_name, top_tracks.TrackId, top_tracks.AlbumTitle as album_title,
+           top_tracks.PlayCount
+    FROM matched_artists
+    JOIN top_tracks ON top_tracks.ArtistId = matched_artists.ArtistId
+    WHERE matched_artists.ArtistId NOT IN (SELECT ArtistId FROM rollup_dirty_artists)
+    UNION ALL
+    SELECT Track.Name, Track.TrackId, Album.Title, Track.PlayCount
+    FROM matched_artists
+    JOIN rollup_dirty_artists ON rollup_dirty_artists.ArtistId = matched_artists.ArtistId
+    JOIN Album ON Album.ArtistId = matched_artists.ArtistId
+    JOIN Track ON Track.AlbumId = Album.AlbumId
+    ORDER BY PlayCount DESC
+    LIMIT 10
+""")
+
+TOP_TRACKS_ROLLUP_INDEXED_QUERY = text("""
+    WITH matched_artists AS MATERIALIZED (
+        SELECT rowid AS ArtistId FROM artist_search WHERE Name LIKE :artist
+    )
+    SELECT top_tracks.TrackName as track_name, top_tracks.TrackId, top_tracks.AlbumTitle as album_title,
+           top_tracks.PlayCount
+    FROM matched_artists
+    JOIN top_tracks ON top_tracks.ArtistId = matched_artists.ArtistId
+    WHERE matched_artists.ArtistId NOT IN (SELECT ArtistId FROM rollup_dirty_artists)
+    UNION ALL
+    SELECT Track.Name, Track.TrackId, Album.Title, Track.PlayCount
+    FROM matched_artists
+    JOIN rollup_dirty_artists ON rollup_dirty_artists.ArtistId = matched_artists.ArtistId
+    JOIN Album ON Album.ArtistId = matched_artists.ArtistId
+    JOIN Track ON Track.AlbumId = Album.AlbumId
+    ORDER BY PlayCount DESC
+    LIMIT 10
+""")
+
+# Query variants keyed by (rollups built, search index built)
+ARTISTS_BY_GENRE_QUERIES = {
+    (False, False): ARTISTS_BY_GENRE_QUERY,
+    (False, True): ARTISTS_BY_GENRE_INDEXED_QUERY,
+    (True, False): ARTISTS_BY_GENRE_ROLLUP_QUERY,
+    (True, True): ARTISTS_BY_GENRE_ROLLUP_INDEXED_QUERY,
+}
+
+TOP_TRACKS_QUERIES = {
+    (False, False): TOP_TRACKS_QUERY,
+    (False, True): TOP_TRACKS_INDEXED_QUERY,
+    (True, False): TOP_TRACKS_ROLLUP_QUERY,
+    (True, True): TOP_TRACKS_ROLLUP_INDEXED_QUERY,
+}
+
+CUSTOMER_INFO_QUERY = text("""
+    SELECT CustomerId, FirstName, LastName, Email, Phone, Company
+    FROM Customer
+    WHERE CustomerId = :customer_id
+""")
+
+INVOICE_DETAILS_QUERY = text("""
+    SELECT InvoiceId, InvoiceDate, BillingAddress, Total
+    FROM Invoice
+    WHERE InvoiceId = :invoice_id
+""")
+
+CUSTOMER_INVOICE_DETAILS_QUERY = text("""
+    SELECT InvoiceId, InvoiceDate, BillingAddress, Total
+    FROM Invoice
+    WHERE InvoiceId = :invoice_id AND CustomerId = :customer_id
+""")
+
+PURCHASE_HISTORY_QUERY = text("""
+    SELECT Invoice.InvoiceId, Invoice.InvoiceDate, SUM(InvoiceLine.UnitPrice * InvoiceLine.Quantity) as Total
+    FROM Invoice
+    JOIN InvoiceLine ON Invoice.InvoiceId = InvoiceLine.InvoiceId
+    WHERE Invoice.CustomerId = :customer_id
+    GROUP BY Invoice.InvoiceId, Invoice.InvoiceDate
+    ORDER BY InvoiceDate DESC
+    LIMIT 10
+""")
+
+# Set-based variants of the customer/invoice lookups for batches of IDs
+CUSTOMER_INFO_MANY_QUERY = text("""
+    SELECT CustomerId, FirstName, LastName, Email, Phone, Company
+    FROM Customer
+    WHERE CustomerId IN :customer_ids
+""").bindparams(bindparam("customer_ids", expanding=True))
+
+INVOICE_DETAILS_MANY_QUERY = text("""
+    SELECT InvoiceId, InvoiceDate, BillingAddress, Total
+    FROM Invoice
+    WHERE InvoiceId IN :invoice_ids
+""").bindparams(bindparam("invoice_ids", expanding=True))
+
+PURCHASE_HISTORY_MANY_QUERY = text("""
+    SELECT CustomerId, InvoiceId, InvoiceDate, Total
+    FROM (
+        SELECT Invoice.CustomerId, Invoice.InvoiceId, Invoice.InvoiceDate,
+               SUM(InvoiceLine.UnitPrice * InvoiceLine.Quantity) as Total,
+               ROW_NUMBER() OVER (PARTITION BY Invoice.CustomerId ORDER BY Invoice.InvoiceDate DESC) as position
+        FROM Invoice
+        JOIN InvoiceLine ON Invoice.InvoiceId = InvoiceLine.InvoiceId
+        WHERE Invoice.CustomerId IN :customer_ids
+        GROUP BY Invoice.InvoiceId, Invoice.InvoiceDate
+    )
+    WHERE position <= 10
+    ORDER BY CustomerId, InvoiceDate DESC
+""").bindparams(bindparam("customer_ids", expanding=True))
+
+# Maximum IDs bound into one IN list (stays well below SQLite's variable limit)
+BATCH_CHUNK_SIZE = 500
+
+
+def _catalog_params(name: str, term: str, after_id: int, limit: Optional[int]) -> Dict[str, Any]:
+    """Bind parameters for the paginated catalog queries (SQLite treats LIMIT -1 as no limit)."""
+    return {
+        name: f"%{term}%",
+        "after_id": after_id or 0,
+        "limit": -1 if limit is None else limit,
+    }
+
+
+def _paginate(key: str, items: List[Any], limit: Optional[int]) -> Dict[str, Any]:
+    """Wrap a page of rows, adding the keyset cursor for the next page when paginating."""
+    page = {key: items}
+    if limit is not None:
+        page["next_after_id"] = items[-1].id if items and len(items) == limit else None
+    return page
+
+
+def _parse_id(value: Any) -> int:
+    """Convert a customer or invoice ID to the integer stored in the database."""
+    text_value = str(value).strip()
+    if isinstance(value, bool) or not text_value.isdecimal():
+        raise ValueError(f"Invalid ID: {value!r}")
+    return int(text_value)
+
+
+def configure_sqlite_connection(dbapi_connection, connection_record) -> None:
+    """
+    Apply the SQLite tuning pragmas to a freshly opened connection.
+
+    Registered as a ``connect`` listener on the engine so every pooled
+    connection runs in WAL mode with the configured busy timeout and page
+    cache / mmap sizes.
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.DB_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.DB_MMAP_SIZE)}")
+        cursor.execute(f"PRAGMA cache_size={int(settings.DB_CACHE_SIZE)}")
+    finally:
+        cursor.close()
+
+
+def pool_options(db_url: str) -> Dict[str, Any]:
+    """
+    Get the connection pool arguments for a database URL.
+
+    Async callers reach the database through ``asyncio.to_thread``, so the pool
+    bounds how many worker threads hold a connection at once.
+
+    Args:
+        db_url: SQLAlchemy URL
+
+    Returns:
+        Pool size, overflow and timeout from settings (empty for in-memory SQLite,
+        which uses a single shared connection)
+    """
+    url = make_url(db_url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
+
+
+def build_result_cache() -> Optional[ResultCache]:
+    """
+    Build the query result cache from settings.
+
+    Catalog lookups are effectively read-only and get a long TTL; customer and
+    invoice lookups get short TTLs and can be invalidated explicitly.
+
+    Returns:
+        A ResultCache, or None if caching is disabled
+    """
+    if not settings.RESULT_CACHE_ENABLED:
+        return None
+    return ResultCache(
+        max_size=settings.RESULT_CACHE_MAX_SIZE,
+        default_ttl=0,
+        ttls={
+            "get_albums_by_artist": settings.RESULT_CACHE_CATALOG_TTL,
+            "get_artist_by_genre": settings.RESULT_CACHE_CATALOG_TTL,
+            "get_top_tracks": settings.RESULT_CACHE_CATALOG_TTL,
+            "get_customer_info": settings.RESULT_CACHE_CUSTOMER_TTL,
+            "get_invoice_details": settings.RESULT_CACHE_INVOICE_TTL,
+            "get_customer_invoice_details": settings.RESULT_CACHE_INVOICE_TTL,
+            "get_purchase_history": settings.RESULT_CACHE_INVOICE_TTL,
+        },
+    )
+
+
+@lru_cache()
+def get_result_cache(db_url: str) -> Optional[ResultCache]:
+    """
+    Get the process-wide result cache for a database.
+
+    Every DatabaseService on the same database shares it, so invalidating
+    through one instance is seen by all of them.
+
+    Args:
+        db_url: Database URL the cached results come from
+
+    Returns:
+        The shared ResultCache, or None if caching is disabled
+    """
+    return build_result_cache()
+
 
 class DatabaseService:
-    def __init__(self):
-        """Initialize database connection."""
-        self.engine = create_engine(settings.DB_URL)
+    def __init__(self, cache: Optional[ResultCache] = None, stats: Optional[QueryStats] = None):
+        """
+        Initialize database connection.
+
+        Args:
+            cache: Read-through result cache (optional, the process-wide cache for settings.DB_URL by default)
+            stats: Query statistics collector (optional, process-wide collector by default)
+        """
+        self.engine = create_engine(settings.DB_URL, **pool_options(settings.DB_URL))
+        if self.engine.dialect.name == "sqlite":
+            event.listen(self.engine, "connect", configure_sqlite_connection)
         self.Session = sessionmaker(bind=self.engine)
+        self._search_index_available = None
+        self._rollups_available = None
+        self.cache = cache if cache is not None else get_result_cache(settings.DB_URL)
+        self.stats = stats if stats is not None else get_query_stats()
+        self.tracer = get_tracer()
+        self.customer_directory = CustomerDirectory(
+            lambda: self.Session(),
+            check_interval=settings.CUSTOMER_DIRECTORY_CHECK_INTERVAL,
+        )
+
+        # Catalog reads go to the in-memory copy; customer/invoice reads and writes stay on disk
+        self.replica = get_memory_replica() if settings.DB_MODE == "memory_replica" else None
+        if self.replica is not None:
+            self.replica.add_listener(self._on_replica_refresh)
+
+    def close(self) -> None:
+        """Stop receiving replica refreshes and release the connection pool."""
+        if self.replica is not None:
+            self.replica.remove_listener(self._on_replica_refresh)
+        self.engine.dispose()
+
+    def _catalog_session(self):
+        """Open a session for catalog reads (in-memory replica if enabled)."""
+        if self.replica is not None:
+            return self.replica.session()
+        return self.Session()
+
+    def _on_replica_refresh(self) -> None:
+        """Forget catalog feature checks and cached catalog results after a replica refresh."""
+        self._search_index_available = None
+        self._rollups_available = None
+        if self.cache is not None:
+            for method in ("get_albums_by_artist", "get_artist_by_genre", "get_top_tracks"):
+                self.cache.invalidate(method)
+
+    def _use_search_index(self, session) -> bool:
+        """Check once whether the FTS5 name indexes exist."""
+        if self._search_index_available is None:
+            self._search_index_available = has_search_index(session)
+        return self._search_index_available
+
+    def _read_catalog(self, session, run: Callable[[bool, bool], Any], rollups: bool = True) -> Any:
+        """
+        Run a catalog query, falling back to the live variant if the rollup or FTS5 tables are gone.
+
+        The feature checks are cached, so tables dropped or rebuilt while the
+        service is running (``--drop`` on the rollup_service / search_index
+        CLIs) only show up as a failing query. Both checks are then repeated
+        and the query is retried once with the tables that still exist.
+
+        Args:
+            session: Catalog session
+            run: Executes the query; called with (use_rollups, use_index)
+            rollups: Whether the query has a rollup variant
+
+        Returns:
+            Result of ``run``
+        """
+        use_rollups = rollups and self._use_rollups(session)
+        use_index = self._use_search_index(session)
+        try:
+            return run(use_rollups, use_index)
+        except OperationalError:
+            if not (use_rollups or use_index):
+                raise
+            session.rollback()
+            self._rollups_available = None
+            self._search_index_available = None
+            return run(rollups and self._use_rollups(session), self._use_search_index(session))
+
+    def _use_rollups(self, session) -> bool:
+        """Check once whether the artist_genre / top_tracks rollups exist."""
+        if self._rollups_available is None:
+            self._rollups_available = has_rollups(session)
+        return self._rollups_available
+
+    def _fetch_all(self, session, method: str, query, params: Dict[str, Any]) -> List[Any]:
+        """Execute a query and fetch every row, recording its latency and row count."""
+        with self.tracer.span("db.query", method=method) as span:
+            start = time.perf_counter()
+            rows = session.execute(query, params).fetchall()
+            span.set(rows=len(rows))
+        if self.stats is not None:
+            self.stats.record(
+                method,
+                time.perf_counter() - start,
+                len(rows),
+                explain=lambda: self._explain(session, query, params),
+            )
+        return rows
+
+    def _fetch_one(self, session, method: str, query, params: Dict[str, Any]) -> Optional[Any]:
+        """Execute a query and fetch the first row, recording its latency and row count."""
+        with self.tracer.span("db.query", method=method) as span:
+            start = time.perf_counter()
+            row = session.execute(query, params).fetchone()
+            span.set(rows=int(row is not None))
+        if self.stats is not None:
+            self.stats.record(
+                method,
+                time.perf_counter() - start,
+                int(row is not None),
+                explain=lambda: self._explain(session, query, params),
+            )
+        return row
+
+    @staticmethod
+    def _explain(session, query, params: Dict[str, Any]) -> List[str]:
+        """Capture the EXPLAIN QUERY PLAN output of a statement with the same parameters."""
+        explain_query = text(f"EXPLAIN QUERY PLAN {query.text}")
+        expanding = [bindparam(name, expanding=True) for name, value in params.items() if isinstance(value, list)]
+        if expanding:
+            explain_query = explain_query.bindparams(*expanding)
+        return [row[-1] for row in session.execute(explain_query, params).fetchall()]
 
-    def get_albums_by_artist(self, artist: str) -> Dict[str, Any]:
+    def get_query_stats(self) -> Dict[str, Any]:
         """
-        Get albums by artist from the database.
+        Get query instrumentation data.
+
+        Returns:
+            Dictionary with per-method latency histograms/row counts and the slow-query log
+        """
+        if self.stats is None:
+            return {"methods": {}, "slow_queries": []}
+        return {"methods": self.stats.stats(), "slow_queries": self.stats.slow_queries()}
+
+    def invalidate_customer(self, customer_id: str) -> None:
+        """
+        Drop cached customer and purchase history results for a customer.
+
+        Args:
+            customer_id: ID of the customer
+        """
+        if self.cache is not None:
+            self.cache.invalidate("get_customer_info", customer_id)
+            self.cache.invalidate("get_purchase_history", customer_id)
+
+    def invalidate_invoice(self, invoice_id: Optional[str] = None) -> None:
+        """
+        Drop cached invoice details.
+
+        Args:
+            invoice_id: ID of the invoice (all invoices if omitted)
+        """
+        if self.cache is not None:
+            if invoice_id is None:
+                self.cache.invalidate("get_invoice_details")
+            else:
+                self.cache.invalidate("get_invoice_details", invoice_id)
+            # Keyed by (customer, invoice); dropped together
+            self.cache.invalidate("get_customer_invoice_details")
+
+    def _get_many(
+        self,
+        method: str,
+        ids: Iterable[Any],
+        fetch: Callable[[List[int]], Dict[int, Any]],
+        default: Callable[[], Any],
+    ) -> Dict[Any, Any]:
+        """
+        Resolve a batch of IDs from the result cache and fetch the misses.
+
+        Args:
+            method: Name of the single-ID method whose cache entries are shared
+            ids: Requested IDs
+            fetch: Runs one set-based query for a chunk of integer IDs; keys its result by integer ID
+            default: Builds the result for IDs that were not found
+
+        Returns:
+            Dictionary mapping each requested ID to its result
+
+        Raises:
+            ValueError: If an ID is not a non-negative integer (checked before any query runs)
+        """
+        requested = [(requested_id, _parse_id(requested_id)) for requested_id in ids]
+        results = {}
+        pending = {}
+        for requested_id, key in requested:
+            if self.cache is not None:
+                value = self.cache.get(method, (key,))
+                if value is not _MISSING:
+                    results[requested_id] = value
+                    continue
+            pending.setdefault(key, []).append(requested_id)
+
+        keys = list(pending)
+        for start in range(0, len(keys), BATCH_CHUNK_SIZE):
+            chunk = keys[start:start + BATCH_CHUNK_SIZE]
+            fetched = fetch(chunk)
+            for key in chunk:
+                value = fetched.get(key, _MISSING)
+                if value is _MISSING:
+                    value = default()
+                for requested_id in pending[key]:
+                    results[requested_id] = value
+                if self.cache is not None:
+                    self.cache.set(method, (key,), value)
+        return results
+
+    def resolve_customer_id(self, identifier: str) -> Optional[int]:
+        """
+        Resolve a customer ID, email or phone number to a customer ID.
+        
+        Args:
+            identifier: Customer ID, email address or phone number
+            
+        Returns:
+            The CustomerId if found, otherwise None
+        """
+        return self.customer_directory.resolve(identifier)
+
+    @cached
+    def get_albums_by_artist(self, artist: str, after_id: int = 0, limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Get albums by artist from the database, ordered by album ID.
         
         Args:
             artist: Name of the artist
+            after_id: Only return albums with an ID greater than this (keyset pagination)
+            limit: Maximum number of albums to return (all if omitted)
             
         Returns:
-            Dictionary with album information
+            Dictionary with album information, plus ``next_after_id`` when a limit is given
         """
-        with self.Session() as session:
-            query = text("""
-                SELECT Album.Title as album_title, Album.AlbumId, Artist.Name as artist_name
-                FROM Album
-                JOIN Artist ON Album.ArtistId = Artist.ArtistId
-                WHERE LOWER(Artist.Name) LIKE LOWER(:artist)
-            """)
-            result = session.execute(query, {"artist": f"%{artist}%"}).fetchall()
-            return {
-                "albums": [
-                    {
-                        "id": row.AlbumId,
-                        "title": row.album_title,
-                        "artist": row.artist_name
-                    }
-                    for row in result
-                ]
-            }
+        with self._catalog_session() as session:
+            result = self._read_catalog(session, lambda _, use_index: self._fetch_all(
+                session,
+                "get_albums_by_artist",
+                ALBUMS_BY_ARTIST_INDEXED_QUERY if use_index else ALBUMS_BY_ARTIST_QUERY,
+                _catalog_params("artist", artist, after_id, limit),
+            ), rollups=False)
+            albums = [
+                AlbumRecord(row.AlbumId, row.album_title, row.artist_name)
+                for row in result
+            ]
+            return _paginate("albums", albums, limit)
 
-    def get_artist_by_genre(self, genre: str) -> Dict[str, Any]:
+    def iter_albums_by_artist(self, artist: str, after_id: int = 0, batch_size: int = 100) -> Iterator[AlbumRecord]:
         """
-        Get artists by genre from the database.
+        Stream albums by artist without materializing the full result.
+        
+        Args:
+            artist: Name of the artist
+            after_id: Only yield albums with an ID greater than this
+            batch_size: Number of rows fetched from the cursor at a time
+            
+        Yields:
+            Album records ordered by album ID
+        """
+        with self._catalog_session() as session:
+            result = self._read_catalog(session, lambda _, use_index: session.execute(
+                (ALBUMS_BY_ARTIST_INDEXED_QUERY if use_index else ALBUMS_BY_ARTIST_QUERY).execution_options(
+                    yield_per=batch_size
+                ),
+                _catalog_params("artist", artist, after_id, None),
+            ), rollups=False)
+            for row in result:
+                yield AlbumRecord(row.AlbumId, row.album_title, row.artist_name)
+
+    @cached
+    def get_artist_by_genre(self, genre: str, after_id: int = 0, limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Get artists by genre from the database, ordered by artist ID.
         
         Args:
             genre: Music genre
+            after_id: Only return artists with an ID greater than this (keyset pagination)
+            limit: Maximum number of artists to return (all if omitted)
             
         Returns:
-            Dictionary with artist information
+            Dictionary with artist information, plus ``next_after_id`` when a limit is given
         """
-        with self.Session() as session:
-            query = text("""
-                SELECT DISTINCT Artist.Name as artist_name, Artist.ArtistId
-                FROM Artist
-                JOIN Album ON Artist.ArtistId = Album.ArtistId
-                JOIN Track ON Album.AlbumId = Track.AlbumId
-                JOIN Genre ON Track.GenreId = Genre.GenreId
-                WHERE LOWER(Genre.Name) LIKE LOWER(:genre)
-            """)
-            result = session.execute(query, {"genre": f"%{genre}%"}).fetchall()
-            return {
-                "artists": [
-                    {
-                        "id": row.ArtistId,
-                        "name": row.artist_name
-                    }
-                    for row in result
-                ]
-            }
+        with self._catalog_session() as session:
+            result = self._read_catalog(session, lambda rollups, use_index: self._fetch_all(
+                session,
+                "get_artist_by_genre",
+                ARTISTS_BY_GENRE_QUERIES[rollups, use_index],
+                _catalog_params("genre", genre, after_id, limit),
+            ))
+            artists = [
+                ArtistRecord(row.ArtistId, row.artist_name)
+                for row in result
+            ]
+            return _paginate("artists", artists, limit)
 
+    def iter_artist_by_genre(self, genre: str, after_id: int = 0, batch_size: int = 100) -> Iterator[ArtistRecord]:
+        """
+        Stream artists by genre without materializing the full result.
+        
+        Args:
+            genre: Music genre
+            after_id: Only yield artists with an ID greater than this
+            batch_size: Number of rows fetched from the cursor at a time
+            
+        Yields:
+            Artist records ordered by artist ID
+        """
+        with self._catalog_session() as session:
+            result = self._read_catalog(session, lambda rollups, use_index: session.execute(
+                ARTISTS_BY_GENRE_QUERIES[rollups, use_index].execution_options(yield_per=batch_size),
+                _catalog_params("genre", genre, after_id, None),
+            ))
+            for row in result:
+                yield ArtistRecord(row.ArtistId, row.artist_name)
+
+    @cached
     def get_top_tracks(self, artist: str) -> Dict[str, Any]:
         """
         Get top tracks for an artist.
@@ -78,29 +700,19 @@ class DatabaseService:
         Returns:
             Dictionary with track information
         """
-        with self.Session() as session:
-            query = text("""
-                SELECT Track.Name as track_name, Track.TrackId, Album.Title as album_title
-                FROM Track
-                JOIN Album ON Track.AlbumId = Album.AlbumId
-                JOIN Artist ON Album.ArtistId = Artist.ArtistId
-                WHERE LOWER(Artist.Name) LIKE LOWER(:artist)
-                ORDER BY Track.PlayCount DESC
-                LIMIT 10
-            """)
-            result = session.execute(query, {"artist": f"%{artist}%"}).fetchall()
+        with self._catalog_session() as session:
+            result = self._read_catalog(session, lambda rollups, use_index: self._fetch_all(
+                session, "get_top_tracks", TOP_TRACKS_QUERIES[rollups, use_index], {"artist": f"%{artist}%"}
+            ))
             return {
                 "tracks": [
-                    {
-                        "id": row.TrackId,
-                        "name": row.track_name,
-                        "album": row.album_title
-                    }
+                    TrackRecord(row.TrackId, row.track_name, row.album_title)
                     for row in result
                 ]
             }
 
-    def get_customer_info(self, customer_id: str) -> Dict[str, Any]:
+    @cached
+    def get_customer_info(self, customer_id: str) -> Optional[CustomerRecord]:
         """
         Get customer information from the database.
         
@@ -108,26 +720,27 @@ class DatabaseService:
             customer_id: ID of the customer
             
         Returns:
-            Dictionary with customer information
+            Customer record, or None if not found
         """
         with self.Session() as session:
-            query = text("""
-                SELECT CustomerId, FirstName, LastName, Email, Phone, Company
-                FROM Customer
-                WHERE CustomerId = :customer_id
-            """)
-            result = session.execute(query, {"customer_id": customer_id}).fetchone()
+            result = self._fetch_one(
+                session,
+                "get_customer_info",
+                CUSTOMER_INFO_QUERY,
+                {"customer_id": customer_id},
+            )
             if result:
-                return {
-                    "id": result.CustomerId,
-                    "name": f"{result.FirstName} {result.LastName}",
-                    "email": result.Email,
-                    "phone": result.Phone,
-                    "company": result.Company
-                }
+                return CustomerRecord(
+                    result.CustomerId,
+                    f"{result.FirstName} {result.LastName}",
+                    result.Email,
+                    result.Phone,
+                    result.Company,
+                )
             return None
 
-    def get_invoice_details(self, invoice_id: str) -> Dict[str, Any]:
+    @cached
+    def get_invoice_details(self, invoice_id: str) -> Optional[InvoiceRecord]:
         """
         Get invoice details from the database.
         
@@ -135,24 +748,53 @@ class DatabaseService:
             invoice_id: ID of the invoice
             
         Returns:
-            Dictionary with invoice information
+            Invoice record, or None if not found
         """
         with self.Session() as session:
-            query = text("""
-                SELECT InvoiceId, InvoiceDate, BillingAddress, Total
-                FROM Invoice
-                WHERE InvoiceId = :invoice_id
-            """)
-            result = session.execute(query, {"invoice_id": invoice_id}).fetchone()
+            result = self._fetch_one(
+                session,
+                "get_invoice_details",
+                INVOICE_DETAILS_QUERY,
+                {"invoice_id": invoice_id},
+            )
             if result:
-                return {
-                    "id": result.InvoiceId,
-                    "date": result.InvoiceDate,
-                    "address": result.BillingAddress,
-                    "total": float(result.Total)
-                }
+                return InvoiceRecord(
+                    result.InvoiceId,
+                    result.InvoiceDate,
+                    result.BillingAddress,
+                    float(result.Total),
+                )
             return None
 
+    @cached
+    def get_customer_invoice_details(self, customer_id: str, invoice_id: str) -> Optional[InvoiceRecord]:
+        """
+        Get details of an invoice only if it belongs to a customer.
+        
+        Args:
+            customer_id: ID of the customer
+            invoice_id: ID of the invoice
+            
+        Returns:
+            Invoice record, or None if not found or billed to another customer
+        """
+        with self.Session() as session:
+            result = self._fetch_one(
+                session,
+                "get_customer_invoice_details",
+                CUSTOMER_INVOICE_DETAILS_QUERY,
+                {"customer_id": customer_id, "invoice_id": invoice_id},
+            )
+            if result:
+                return InvoiceRecord(
+                    result.InvoiceId,
+                    result.InvoiceDate,
+                    result.BillingAddress,
+                    float(result.Total),
+                )
+            return None
+
+    @cached
     def get_purchase_history(self, customer_id: str) -> Dict[str, Any]:
         """
         Get purchase history for a customer.
@@ -164,23 +806,112 @@ class DatabaseService:
             Dictionary with purchase history
         """
         with self.Session() as session:
-            query = text("""
-                SELECT Invoice.InvoiceId, Invoice.InvoiceDate, SUM(InvoiceLine.UnitPrice * InvoiceLine.Quantity) as Total
-                FROM Invoice
-                JOIN InvoiceLine ON Invoice.InvoiceId = InvoiceLine.InvoiceId
-                WHERE Invoice.CustomerId = :customer_id
-                GROUP BY Invoice.InvoiceId, Invoice.InvoiceDate
-                ORDER BY InvoiceDate DESC
-                LIMIT 10
-            """)
-            result = session.execute(query, {"customer_id": customer_id}).fetchall()
+            result = self._fetch_all(
+                session,
+                "get_purchase_history",
+                PURCHASE_HISTORY_QUERY,
+                {"customer_id": customer_id},
+            )
             return {
                 "purchases": [
-                    {
-                        "id": row.InvoiceId,
-                        "date": row.InvoiceDate,
-                        "total": float(row.Total)
-                    }
+                    PurchaseRecord(row.InvoiceId, row.InvoiceDate, float(row.Total))
                     for row in result
                 ]
             }
+
+    def get_customer_info_many(self, customer_ids: Iterable[str]) -> Dict[str, Optional[CustomerRecord]]:
+        """
+        Get customer information for several customers with one query.
+        
+        Args:
+            customer_ids: IDs of the customers
+            
+        Returns:
+            Dictionary mapping each customer ID to its information (None if not found)
+            
+        Raises:
+            ValueError: If an ID is not numeric
+        """
+        def fetch(chunk: List[int]) -> Dict[int, Any]:
+            with self.Session() as session:
+                result = self._fetch_all(
+                    session,
+                    "get_customer_info_many",
+                    CUSTOMER_INFO_MANY_QUERY,
+                    {"customer_ids": chunk},
+                )
+                return {
+                    int(row.CustomerId): CustomerRecord(
+                        row.CustomerId,
+                        f"{row.FirstName} {row.LastName}",
+                        row.Email,
+                        row.Phone,
+                        row.Company,
+                    )
+                    for row in result
+                }
+
+        return self._get_many("get_customer_info", customer_ids, fetch, lambda: None)
+
+    def get_invoice_details_many(self, invoice_ids: Iterable[str]) -> Dict[str, Optional[InvoiceRecord]]:
+        """
+        Get invoice details for several invoices with one query.
+        
+        Args:
+            invoice_ids: IDs of the invoices
+            
+        Returns:
+            Dictionary mapping each invoice ID to its information (None if not found)
+            
+        Raises:
+            ValueError: If an ID is not numeric
+        """
+        def fetch(chunk: List[int]) -> Dict[int, Any]:
+            with self.Session() as session:
+                result = self._fetch_all(
+                    session,
+                    "get_invoice_details_many",
+                    INVOICE_DETAILS_MANY_QUERY,
+                    {"invoice_ids": chunk},
+                )
+                return {
+                    int(row.InvoiceId): InvoiceRecord(
+                        row.InvoiceId,
+                        row.InvoiceDate,
+                        row.BillingAddress,
+                        float(row.Total),
+                    )
+                    for row in result
+                }
+
+        return self._get_many("get_invoice_details", invoice_ids, fetch, lambda: None)
+
+    def get_purchase_history_many(self, customer_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get purchase history for several customers with one query.
+        
+        Args:
+            customer_ids: IDs of the customers
+            
+        Returns:
+            Dictionary mapping each customer ID to its purchase history
+            
+        Raises:
+            ValueError: If an ID is not numeric
+        """
+        def fetch(chunk: List[int]) -> Dict[int, Any]:
+            with self.Session() as session:
+                result = self._fetch_all(
+                    session,
+                    "get_purchase_history_many",
+                    PURCHASE_HISTORY_MANY_QUERY,
+                    {"customer_ids": chunk},
+                )
+                histories = {}
+                for row in result:
+                    histories.setdefault(int(row.CustomerId), {"purchases": []})["purchases"].append(
+                        PurchaseRecord(row.InvoiceId, row.InvoiceDate, float(row.Total))
+                    )
+                return histories
+
+        return self._get_many("get_purchase_history", customer_ids, fetch, lambda: {"purchases": []})
@@ -0,0 +1,234 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Optional
+from src.config.settings import settings
+from src.core.services.cache_service import ResultCache, _MISSING
+
+LLM_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_response_cache (
+    Key TEXT PRIMARY KEY,
+    Agent TEXT NOT NULL,
+    ExpiresAt REAL NOT NULL,
+    Value TEXT NOT NULL
+)
+"""
+
+_TRAILING_PUNCTUATION = "?!.,;: "
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a user query for cache lookups.
+
+    Case, repeated whitespace and trailing punctuation are ignored, so
+    "What albums does AC/DC have?" and "what albums  does ac/dc have"
+    share an entry.
+    """
+    return " ".join((query or "").lower().split()).rstrip(_TRAILING_PUNCTUATION)
+
+
+def is_sensitive(value: Any) -> bool:
+    """
+    Check whether an LLM answer is flagged as sensitive.
+
+    Answers that cannot be inspected (not a mapping and not JSON) and answers
+    without an explicit ``"sensitive": false`` are treated as sensitive.
+    """
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return True
+    if not isinstance(value, dict):
+        return True
+    return value.get("sensitive") is not False
+
+
+class LLMResponseCache:
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttls: Optional[Dict[str, float]] = None,
+        path: Optional[str] = None,
+        sensitive_agents: Iterable[str] = ("invoice",),
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Two-tier cache for LLM answers: an in-memory LRU backed by an optional SQLite file.
+
+        Args:
+            max_size: Maximum number of entries kept in memory
+            ttls: TTL in seconds per agent (agents without a TTL are not cached)
+            path: SQLite file for the persistent tier (memory only if omitted)
+            sensitive_agents: Agents whose answers are only cached when explicitly not sensitive
+            clock: Wall-clock time source (expiry times are persisted across restarts)
+        """
+        self.ttls = dict(ttls or {})
+        self.path = path
+        self.sensitive_agents = frozenset(sensitive_agents)
+        self._clock = clock
+        self.memory = ResultCache(max_size=max_size, default_ttl=0, ttls=self.ttls, clock=clock)
+        self._lock = threading.Lock()
+        self._bypassed = 0
+        self._disk_hits = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(LLM_CACHE_SCHEMA)
+            self.prune()
+
+    @staticmethod
+    def make_key(model: str, template_id: str, query: str, context: Any = None) -> str:
+        """
+        Build a cache key.
+
+        Args:
+            model: Model or deployment name
+            template_id: ID of the compiled prompt template
+            query: User query (normalized before hashing)
+            context: Request context that affects the answer (profile, customer info)
+
+        Returns:
+            Hex digest identifying the request
+        """
+        payload = json.dumps(
+            [model, template_id, normalize_query(query), context],
+            sort_keys=True,
+            separators=(",", ":"),
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, agent: str, key: str) -> Any:
+        """
+        Look up a cached answer, promoting disk hits into memory.
+
+        Returns:
+            The cached answer, or the ``_MISSING`` marker
+        """
+        value = self.memory.get(agent, (key,))
+        if value is not _MISSING or self._conn is None:
+            return value
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT ExpiresAt, Value FROM llm_response_cache WHERE Key = ? AND Agent = ?",
+                (key, agent),
+            ).fetchone()
+        if row is None or row[0] <= self._clock():
+            return _MISSING
+        value = json.loads(row[1])
+        self.memory.set(agent, (key,), value, expires_at=row[0])
+        with self._lock:
+            self._disk_hits += 1
+        return value
+
+    def should_cache(self, agent: str, value: Any) -> bool:
+        """Apply the bypass rules: errors and sensitive answers are never cached."""
+        if isinstance(value, dict) and "error" in value:
+            return False
+        if agent in self.sensitive_agents and settings.LLM_CACHE_SKIP_SENSITIVE:
+            return not is_sensitive(value)
+        return True
+
+    def set(self, agent: str, key: str, value: Any) -> bool:
+        """
+        Store an answer in memory and, if configured, on disk.
+
+        Returns:
+            True if the answer was cached, False if a TTL or bypass rule skipped it
+        """
+        ttl = self.ttls.get(agent, 0)
+        if ttl <= 0:
+            return False
+        if not self.should_cache(agent, value):
+            with self._lock:
+                self._bypassed += 1
+            return False
+        expires_at = self._clock() + ttl
+        self.memory.set(agent, (key,), value, expires_at=expires_at)
+        if self._conn is not None:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_response_cache (Key, Agent, ExpiresAt, Value) VALUES (?, ?, ?, ?)",
+                    (key, agent, expires_at, json.dumps(value, default=str)),
+                )
+        return True
+
+    def invalidate(self, agent: Optional[str] = None) -> int:
+        """
+        Drop cached answers for one agent (or all agents).
+
+        Returns:
+            Number of in-memory entries removed
+        """
+        removed = self.memory.invalidate(agent)
+        if self._conn is not None:
+            with self._lock:
+                if agent is None:
+                    self._conn.execute("DELETE FROM llm_response_cache")
+                else:
+                    self._conn.execute("DELETE FROM llm_response_cache WHERE Agent = ?", (agent,))
+        return removed
+
+    def prune(self) -> int:
+        """
+        Delete expired rows from the persistent tier.
+
+        Returns:
+            Number of rows deleted
+        """
+        if self._conn is None:
+            return 0
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM llm_response_cache WHERE ExpiresAt <= ?", (self._clock(),))
+        return cursor.rowcount
+
+    def close(self) -> None:
+        """Close the persistent tier."""
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters.
+
+        Returns:
+            In-memory hit/miss counters plus disk hits and bypassed writes
+        """
+        result = self.memory.stats()
+        with self._lock:
+            result["disk_hits"] = self._disk_hits
+            result["bypassed"] = self._bypassed
+        result["persistent"] = self.path is not None
+        return result
+
+
+@lru_cache()
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """
+    Get the process-wide LLM response cache.
+
+    Returns:
+        The shared LLMResponseCache, or None if LLM response caching is disabled
+    """
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+    return LLMResponseCache(
+        max_size=settings.LLM_CACHE_MAX_SIZE,
+        ttls={
+            "music": settings.LLM_CACHE_MUSIC_TTL,
+            "invoice": settings.LLM_CACHE_INVOICE_TTL,
+        },
+        path=settings.LLM_CACHE_PATH,
+    )
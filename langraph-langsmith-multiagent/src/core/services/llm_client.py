@@ -0,0 +1,155 @@
+import asyncio
+import threading
+import weakref
+from functools import lru_cache
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+import httpx
+from langchain_openai import AzureChatOpenAI
+from src.config.settings import settings
+from src.core.services.resilience import CircuitBreaker, CircuitOpenError, ResiliencePolicy
+
+
+def create_azure_chat_client() -> AzureChatOpenAI:
+    """
+    Build an Azure OpenAI chat client on keep-alive HTTP connection pools.
+
+    Returns:
+        AzureChatOpenAI client sharing one sync and one async httpx pool
+    """
+    limits = httpx.Limits(
+        max_connections=settings.LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY,
+    )
+    return AzureChatOpenAI(
+        openai_api_key=settings.UOC_API_KEY,
+        azure_endpoint=settings.UOC_ENDPOINT,
+        deployment_name=settings.UOC_MODEL_NAME,
+        api_version=settings.UOC_API_VERSION,
+        http_client=httpx.Client(limits=limits),
+        http_async_client=httpx.AsyncClient(limits=limits),
+        timeout=settings.LLM_TIMEOUT,
+    )
+
+
+def build_resilience_policy() -> ResiliencePolicy:
+    """Build the LLM call policy (deadlines, hedging, circuit breaker) from settings."""
+    return ResiliencePolicy(
+        timeout=settings.LLM_TIMEOUT,
+        hedge=settings.LLM_HEDGE_ENABLED,
+        hedge_percentile=settings.LLM_HEDGE_PERCENTILE,
+        hedge_min_delay=settings.LLM_HEDGE_MIN_DELAY,
+        hedge_min_samples=settings.LLM_HEDGE_MIN_SAMPLES,
+        breaker=CircuitBreaker(
+            failure_rate=settings.LLM_BREAKER_FAILURE_RATE,
+            min_calls=settings.LLM_BREAKER_MIN_CALLS,
+            window=settings.LLM_BREAKER_WINDOW,
+            open_seconds=settings.LLM_BREAKER_OPEN_SECONDS,
+        ),
+    )
+
+
+class LLMClientRegistry:
+    def __init__(
+        self,
+        max_concurrency: int = 16,
+        factories: Optional[Dict[str, Callable[[], Any]]] = None,
+        policy: Optional[ResiliencePolicy] = None,
+    ):
+        """
+        Process-wide registry of shared LLM clients.
+
+        Every agent gets the same client instance (and therefore the same HTTP
+        connection pool), and all calls go through a concurrency limit shared by
+        the sync and async paths.
+
+        Args:
+            max_concurrency: Maximum number of in-flight LLM calls per path
+            factories: Client factories by name (defaults to the Azure OpenAI client)
+            policy: Deadline/hedging/circuit-breaker policy applied to every call (optional)
+        """
+        self.max_concurrency = max_concurrency
+        self._factories = factories or {"default": create_azure_chat_client}
+        self.policy = policy
+        self._clients: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._thread_semaphore = threading.BoundedSemaphore(max_concurrency)
+        # asyncio semaphores bind to the loop they are first awaited on
+        self._loop_semaphores: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+    def get(self, name: str = "default") -> Any:
+        """
+        Get (creating on first use) the shared client registered under a name.
+
+        Args:
+            name: Client name
+
+        Returns:
+            Shared LLM client
+        """
+        client = self._clients.get(name)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(name)
+                if client is None:
+                    client = self._clients[name] = self._factories[name]()
+        return client
+
+    def register(self, name: str, factory: Callable[[], Any]) -> None:
+        """Register a client factory (replacing any existing client with that name)."""
+        with self._lock:
+            self._factories[name] = factory
+            self._clients.pop(name, None)
+
+    def _async_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._loop_semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._loop_semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    def invoke(self, llm: Any, messages: Any, **kwargs: Any) -> Any:
+        """Call ``llm.invoke`` under the concurrency limit (and the resilience policy, if any)."""
+        with self._thread_semaphore:
+            if self.policy is None:
+                return llm.invoke(messages, **kwargs)
+            return self.policy.call(lambda: llm.invoke(messages, **kwargs))
+
+    async def ainvoke(self, llm: Any, messages: Any, **kwargs: Any) -> Any:
+        """Call ``llm.ainvoke`` under the concurrency limit (and the resilience policy, if any)."""
+        async with self._async_semaphore():
+            if self.policy is None:
+                return await llm.ainvoke(messages, **kwargs)
+            return await self.policy.acall(lambda: llm.ainvoke(messages, **kwargs))
+
+    async def astream(self, llm: Any, messages: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        """
+        Iterate over ``llm.astream`` chunks, holding a concurrency slot for the whole stream.
+
+        Streams are not hedged, but they respect and feed the circuit breaker.
+        """
+        breaker = self.policy.breaker if self.policy is not None else None
+        if breaker is not None and not breaker.allow():
+            raise CircuitOpenError("LLM backend circuit breaker is open")
+        try:
+            async with self._async_semaphore():
+                async for chunk in llm.astream(messages, **kwargs):
+                    yield chunk
+        except BaseException as e:
+            # A closed stream (client gone) or a rejected request only frees the admission
+            if breaker is not None:
+                breaker.record_error(e)
+            raise
+        if breaker is not None:
+            breaker.record(True)
+
+
+@lru_cache()
+def get_llm_registry() -> LLMClientRegistry:
+    """Get the process-wide LLM client registry."""
+    return LLMClientRegistry(max_concurrency=settings.LLM_MAX_CONCURRENCY, policy=build_resilience_policy())
+
+
+def get_llm_client(name: str = "default") -> Any:
+    """Get the shared LLM client registered under a name."""
+    return get_llm_registry().get(name)
@@ -1,21 +1,324 @@
-from typing import Dict, Any, List, Optional
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.messages import HumanMessage, SystemMessage
+import time
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
+from langchain_core.messages import BaseMessage
 from langchain_core.tools import Tool
-from langchain_openai import AzureChatOpenAI
+from langchain_core.utils.function_calling import convert_to_openai_tool
 from src.config.settings import settings
+from src.core.models.responses import parse_agent_response
+from src.core.services.cache_service import _MISSING
+from src.core.services.context_assembler import AssembledPrompt, ContextAssembler, get_context_assembler
+from src.core.services.llm_cache import LLMResponseCache, get_llm_cache
+from src.core.services.llm_client import get_llm_client, get_llm_registry
+from src.core.services.prompt_registry import get_prompt_registry
+from src.core.services.resilience import LLMUnavailableError
+from src.core.services.singleflight import SingleFlight, get_singleflight
+from src.core.services.tool_executor import StepTiming, ToolExecutor, get_tool_calls, get_tool_executor
+from src.core.services.tracing import get_tracer
+
+# Canned answers served (and never cached) while the LLM backend is unavailable
+FALLBACK_RESPONSES = {
+    "music": "Our music assistant is temporarily unavailable. Please try again in a moment.",
+    "invoice": "Our billing assistant is temporarily unavailable. Please try again in a moment.",
+}
+
 
 class LLMService:
-    def __init__(self):
-        """Initialize LLM service with Azure OpenAI."""
-        self.llm = AzureChatOpenAI(
-            openai_api_key=settings.UOC_API_KEY,
-            azure_endpoint=settings.UOC_ENDPOINT,
-            deployment_name=settings.UOC_MODEL_NAME,
-            api_version=settings.UOC_API_VERSION
-        )
+    def __init__(
+        self,
+        llm: Optional[Any] = None,
+        cache: Optional[LLMResponseCache] = None,
+        singleflight: Optional[SingleFlight] = None,
+        assembler: Optional[ContextAssembler] = None,
+        tool_executor: Optional[ToolExecutor] = None,
+    ):
+        """
+        Initialize LLM service with Azure OpenAI.
+        
+        Args:
+            llm: Language model instance (optional, defaults to the shared client)
+            cache: Response cache (optional, defaults to the shared cache when enabled)
+            singleflight: Request coalescer (optional, defaults to the shared one when enabled)
+            assembler: Context assembler enforcing the prompt token budgets (optional)
+            tool_executor: Runs the tool calls the model requests (optional)
+        """
+        self.llm = llm or get_llm_client()
+        self.registry = get_llm_registry()
+        self.prompts = get_prompt_registry()
+        self.cache = cache if cache is not None else get_llm_cache()
+        if singleflight is None and settings.SINGLEFLIGHT_ENABLED:
+            singleflight = get_singleflight()
+        self.singleflight = singleflight
+        self.assembler = assembler or get_context_assembler()
+        self.tool_executor = tool_executor or get_tool_executor()
+        self.max_steps = settings.AGENT_MAX_STEPS
+        self.tracer = get_tracer()
+        self._tool_schemas: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+
+    def _music_prompt(self, query: str, user_profile: Dict[str, Any], tools: List[Tool], chat_history: Optional[List[Any]]) -> AssembledPrompt:
+        """Assemble the budgeted prompt for a music-related query."""
+        prompt = self.prompts.get("music", tools)
+        return self._assemble("music", prompt, query, {"user_profile": user_profile}, chat_history)
+
+    def _invoice_prompt(self, query: str, customer_info: Dict[str, Any], tools: List[Tool], chat_history: Optional[List[Any]]) -> AssembledPrompt:
+        """Assemble the budgeted prompt for an invoice-related query."""
+        prompt = self.prompts.get("invoice", tools)
+        return self._assemble("invoice", prompt, query, {"customer_info": customer_info}, chat_history)
+
+    def _assemble(self, agent: str, prompt: Any, query: str, fields: Dict[str, Any], chat_history: Optional[List[Any]]) -> AssembledPrompt:
+        """Fit the prompt into the agent's token budget, recording its size on a span."""
+        with self.tracer.span("llm.prompt", agent=agent) as span:
+            assembled = self.assembler.assemble(agent, prompt, query, fields, chat_history)
+            span.set(prompt_tokens=assembled.report.prompt_tokens, trimmed=assembled.report.trimmed)
+        return assembled
+
+    def _cache_lookup(self, agent: str, query: str, prompt: AssembledPrompt, tools: List[Tool]) -> Tuple[Optional[str], Any]:
+        """
+        Build the request key and look it up in the cache.
+        
+        The key is also used to coalesce identical in-flight requests; it is
+        None only when both caching and coalescing are off.
+        """
+        if self.cache is None and self.singleflight is None:
+            return None, _MISSING
+        template_id = self.prompts.get(agent, tools).template_id
+        # Key on the context exactly as it is rendered into the prompt (after trimming)
+        context = [prompt.fields, [(message.type, message.content) for message in prompt.history]]
+        key = LLMResponseCache.make_key(settings.UOC_MODEL_NAME, template_id, query, context)
+        if self.cache is None:
+            return key, _MISSING
+        cached = self.cache.get(agent, key)
+        self.tracer.current_span().set(cache_hit=cached is not _MISSING)
+        return key, cached
+
+    def _cache_store(self, agent: str, key: Optional[str], result: Any) -> None:
+        """Store a result under a key from ``_cache_lookup``."""
+        if key is not None and self.cache is not None:
+            self.cache.set(agent, key, result)
 
-    def process_music_query(self, query: str, user_profile: Dict[str, Any], tools: List[Tool]) -> Dict[str, Any]:
+    def _step_kwargs(self, tools: List[Tool], final: bool) -> Dict[str, Any]:
+        """
+        Build the invoke arguments for one step of the tool loop.
+        
+        Tools are sent with each call rather than pre-bound to the client, so
+        the shared client serves every agent. On the final step the model is
+        told not to call tools, which forces an answer.
+        """
+        kwargs = self._output_kwargs()
+        if tools:
+            names = tuple(tool.name for tool in tools)
+            schemas = self._tool_schemas.get(names)
+            if schemas is None:
+                schemas = self._tool_schemas[names] = [convert_to_openai_tool(tool) for tool in tools]
+            kwargs["tools"] = schemas
+            if final:
+                kwargs["tool_choice"] = "none"
+        return kwargs
+
+    @staticmethod
+    def _usage(response: Any) -> Dict[str, Any]:
+        """Get the token counts the backend reported for a response (empty if none)."""
+        usage = getattr(response, "usage_metadata", None)
+        if not isinstance(usage, dict):
+            return {}
+        return {"input_tokens": usage.get("input_tokens"), "output_tokens": usage.get("output_tokens")}
+
+    def _run_steps(self, agent: str, messages: List[BaseMessage], tools: List[Tool]) -> Any:
+        """
+        Run the tool loop: call the LLM, execute the tools it asks for, feed the results back.
+        
+        Args:
+            agent: Agent name
+            messages: Prompt messages
+            tools: Tools the model may call
+            
+        Returns:
+            The final LLM message
+        """
+        conversation = list(messages)
+        steps: List[StepTiming] = []
+        try:
+            for step in range(1, self.max_steps + 2):
+                final = step > self.max_steps
+                started = time.perf_counter()
+                with self.tracer.span("llm.generate", agent=agent, step=step) as span:
+                    response = self.registry.invoke(self.llm, conversation, **self._step_kwargs(tools, final))
+                    span.set(**self._usage(response))
+                timing = StepTiming(step=step, llm_ms=(time.perf_counter() - started) * 1000)
+                steps.append(timing)
+                tool_calls = get_tool_calls(response)
+                if final or not tool_calls:
+                    return response
+                
+                started = time.perf_counter()
+                with self.tracer.span("tools.execute", agent=agent, step=step, calls=len(tool_calls)):
+                    results = self.tool_executor.run(tool_calls, tools)
+                timing.tools_ms = (time.perf_counter() - started) * 1000
+                timing.tool_calls = tuple(result.name for result in results)
+                conversation.append(response)
+                conversation.extend(result.message for result in results)
+        finally:
+            self.tool_executor.record_run(agent, steps, hit_limit=len(steps) > self.max_steps)
+
+    async def _arun_steps(self, agent: str, messages: List[BaseMessage], tools: List[Tool]) -> Any:
+        """Await the tool loop; a step's tool calls run concurrently on the event loop."""
+        conversation = list(messages)
+        steps: List[StepTiming] = []
+        try:
+            for step in range(1, self.max_steps + 2):
+                final = step > self.max_steps
+                started = time.perf_counter()
+                with self.tracer.span("llm.generate", agent=agent, step=step) as span:
+                    response = await self.registry.ainvoke(self.llm, conversation, **self._step_kwargs(tools, final))
+                    span.set(**self._usage(response))
+                timing = StepTiming(step=step, llm_ms=(time.perf_counter() - started) * 1000)
+                steps.append(timing)
+                tool_calls = get_tool_calls(response)
+                if final or not tool_calls:
+                    return response
+                
+                started = time.perf_counter()
+                with self.tracer.span("tools.execute", agent=agent, step=step, calls=len(tool_calls)):
+                    results = await self.tool_executor.arun(tool_calls, tools)
+                timing.tools_ms = (time.perf_counter() - started) * 1000
+                timing.tool_calls = tuple(result.name for result in results)
+                conversation.append(response)
+                conversation.extend(result.message for result in results)
+        finally:
+            self.tool_executor.record_run(agent, steps, hit_limit=len(steps) > self.max_steps)
+
+    def _complete(self, agent: str, key: Optional[str], messages: List[BaseMessage], tools: List[Tool]) -> Any:
+        """Run the tool loop, sharing one run between identical concurrent requests."""
+        def call():
+            try:
+                response = self._run_steps(agent, messages, tools)
+            except LLMUnavailableError as e:
+                return self._fallback(agent, e)
+            result = self._parse_response(agent, response)
+            self._cache_store(agent, key, result)
+            return result
+        
+        if self.singleflight is None or key is None:
+            return call()
+        return self.singleflight.do(agent, key, call)
+
+    async def _acomplete(self, agent: str, key: Optional[str], messages: List[BaseMessage], tools: List[Tool]) -> Any:
+        """Await the tool loop, sharing one run between identical concurrent requests."""
+        async def call():
+            try:
+                response = await self._arun_steps(agent, messages, tools)
+            except LLMUnavailableError as e:
+                return self._fallback(agent, e)
+            result = self._parse_response(agent, response)
+            self._cache_store(agent, key, result)
+            return result
+        
+        if self.singleflight is None or key is None:
+            return await call()
+        return await self.singleflight.ado(agent, key, call)
+
+    def _fallback(self, agent: str, error: Exception) -> Dict[str, Any]:
+        """Build the degraded answer returned when the LLM backend is unavailable."""
+        return {
+            "response": FALLBACK_RESPONSES[agent],
+            "degraded": True,
+            "reason": type(error).__name__,
+        }
+
+    def _output_kwargs(self) -> Dict[str, Any]:
+        """Request native JSON output so the answer can be validated in one pass."""
+        if not settings.LLM_JSON_MODE:
+            return {}
+        return {"response_format": {"type": "json_object"}}
+
+    def _parse_response(self, agent: str, response: Any) -> Dict[str, Any]:
+        """
+        Parse and validate an LLM response against the agent's output schema.
+        
+        Args:
+            agent: Agent name selecting the schema
+            response: LLM message
+            
+        Returns:
+            Validated result, or a dictionary with an error
+        """
+        try:
+            return parse_agent_response(agent, response.content)
+        except Exception as e:
+            return {"error": f"Error processing query: {str(e)}"}
+
+    async def _astream(self, agent: str, key: Optional[str], messages: List[BaseMessage], tools: List[Tool]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream the tool loop as events.
+        
+        Yields ``token`` events for content chunks and ``tool_call_chunk``
+        events for streamed tool-call fragments. Each step that calls tools
+        adds ``tool_call`` and ``tool_result`` events and a ``step`` event with
+        its timings. A final ``result`` event carries the same value the
+        non-streaming path returns.
+        """
+        conversation = list(messages)
+        steps: List[StepTiming] = []
+        full = None
+        streamed = False
+        try:
+            for step in range(1, self.max_steps + 2):
+                final = step > self.max_steps
+                full = None
+                started = time.perf_counter()
+                with self.tracer.span("llm.generate", agent=agent, step=step, streamed=True) as span:
+                    async for chunk in self.registry.astream(self.llm, conversation, **self._step_kwargs(tools, final)):
+                        streamed = True
+                        if chunk.content:
+                            yield {"event": "token", "data": chunk.content}
+                        for tool_chunk in getattr(chunk, "tool_call_chunks", None) or []:
+                            yield {
+                                "event": "tool_call_chunk",
+                                "data": {
+                                    "index": tool_chunk.get("index"),
+                                    "name": tool_chunk.get("name"),
+                                    "args": tool_chunk.get("args"),
+                                },
+                            }
+                        full = chunk if full is None else full + chunk
+                    span.set(**self._usage(full))
+                timing = StepTiming(step=step, llm_ms=(time.perf_counter() - started) * 1000)
+                steps.append(timing)
+                tool_calls = get_tool_calls(full)
+                if final or not tool_calls:
+                    break
+                
+                for tool_call in tool_calls:
+                    yield {"event": "tool_call", "data": {"name": tool_call.get("name"), "args": tool_call.get("args")}}
+                started = time.perf_counter()
+                with self.tracer.span("tools.execute", agent=agent, step=step, calls=len(tool_calls)):
+                    results = await self.tool_executor.arun(tool_calls, tools)
+                timing.tools_ms = (time.perf_counter() - started) * 1000
+                timing.tool_calls = tuple(result.name for result in results)
+                for result in results:
+                    yield {
+                        "event": "tool_result",
+                        "data": {"name": result.name, "ok": result.error is None, "elapsed_ms": round(result.elapsed_ms, 3)},
+                    }
+                yield {"event": "step", "data": timing.to_dict()}
+                conversation.append(full)
+                conversation.extend(result.message for result in results)
+        except LLMUnavailableError as e:
+            # Only fall back before anything was streamed; a half-sent answer is an error
+            if streamed:
+                raise
+            yield {"event": "result", "data": self._fallback(agent, e)}
+            return
+        finally:
+            self.tool_executor.record_run(agent, steps, hit_limit=len(steps) > self.max_steps)
+        
+        if full is None:
+            yield {"event": "result", "data": {"error": "Error processing query: empty response"}}
+            return
+        result = self._parse_response(agent, full)
+        self._cache_store(agent, key, result)
+        yield {"event": "result", "data": result}
+
+    def process_music_query(self, query: str, user_profile: Dict[str, Any], tools: List[Tool], chat_history: Optional[List[Any]] = None) -> Dict[str, Any]:
         """
         Process a music-related query using the LLM.
         
@@ -23,45 +326,61 @@ class LLMService:
             query: User's query
             user_profile: User's music preferences
             tools: Available tools for the LLM
+            chat_history: Earlier messages in the conversation (optional)
             
         Returns:
             Dictionary with response and any updated preferences
         """
-        # Create prompt template
-        prompt = ChatPromptTemplate.from_messages([
-            SystemMessage(content="""
-                You are a music catalog assistant. Use the available tools to answer questions about music.
-                If the user mentions music preferences, update their profile accordingly.
-                Format the response as JSON with the following structure:
-                {
-                    "response": "Your response here",
-                    "music_preferences": {
-                        "genres": ["genre1", "genre2"],
-                        "artists": ["artist1", "artist2"]
-                    }
-                }
-            """),
-            MessagesPlaceholder(variable_name="chat_history"),
-            HumanMessage(content="""
-                User query: {query}
-                User preferences: {user_profile}
-            """)
-        ])
-
-        # Generate response
-        response = self.llm.invoke(prompt.format_messages(
-            query=query,
-            user_profile=user_profile
-        ))
-
-        # Parse response
-        try:
-            result = response.content
-            return result
-        except Exception as e:
-            return {"error": f"Error processing query: {str(e)}"}
+        prompt = self._music_prompt(query, user_profile, tools, chat_history)
+        key, cached = self._cache_lookup("music", query, prompt, tools)
+        if cached is not _MISSING:
+            return cached
+        
+        return self._complete("music", key, prompt.messages, tools)
+
+    async def aprocess_music_query(self, query: str, user_profile: Dict[str, Any], tools: List[Tool], chat_history: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """
+        Process a music-related query using the LLM without blocking the event loop.
+        
+        Args:
+            query: User's query
+            user_profile: User's music preferences
+            tools: Available tools for the LLM
+            chat_history: Earlier messages in the conversation (optional)
+            
+        Returns:
+            Dictionary with response and any updated preferences
+        """
+        prompt = self._music_prompt(query, user_profile, tools, chat_history)
+        key, cached = self._cache_lookup("music", query, prompt, tools)
+        if cached is not _MISSING:
+            return cached
+        
+        return await self._acomplete("music", key, prompt.messages, tools)
+
+    async def astream_music_query(self, query: str, user_profile: Dict[str, Any], tools: List[Tool], chat_history: Optional[List[Any]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a music-related query as token events followed by the result.
+        
+        Args:
+            query: User's query
+            user_profile: User's music preferences
+            tools: Available tools for the LLM
+            chat_history: Earlier messages in the conversation (optional)
+            
+        Yields:
+            Event dictionaries with ``event`` and ``data`` keys
+        """
+        prompt = self._music_prompt(query, user_profile, tools, chat_history)
+        key, cached = self._cache_lookup("music", query, prompt, tools)
+        if cached is not _MISSING:
+            yield {"event": "result", "data": cached}
+            return
+        
+        async for event in self._astream("music", key, prompt.messages, tools):
+            yield event
 
-    def process_invoice_query(self, query: str, customer_info: Dict[str, Any], tools: List[Tool]) -> Dict[str, Any]:
+    def process_invoice_query(self, query: str, customer_info: Dict[str, Any], tools: List[Tool], chat_history: Optional[List[Any]] = None) -> Dict[str, Any]:
         """
         Process an invoice-related query using the LLM.
         
@@ -69,37 +388,56 @@ class LLMService:
             query: User's query
             customer_info: Customer information
             tools: Available tools for the LLM
+            chat_history: Earlier messages in the conversation (optional)
             
         Returns:
             Dictionary with response
         """
-        # Create prompt template
-        prompt = ChatPromptTemplate.from_messages([
-            SystemMessage(content="""
-                You are an invoice information assistant. Use the available tools to answer questions about invoices.
-                Verify customer information before providing sensitive data.
-                Format the response as JSON with the following structure:
-                {
-                    "response": "Your response here",
-                    "sensitive": boolean
-                }
-            """),
-            MessagesPlaceholder(variable_name="chat_history"),
-            HumanMessage(content="""
-                User query: {query}
-                Customer info: {customer_info}
-            """)
-        ])
-
-        # Generate response
-        response = self.llm.invoke(prompt.format_messages(
-            query=query,
-            customer_info=customer_info
-        ))
-
-        # Parse response
-        try:
-            result = response.content
-            return result
-        except Exception as e:
-            return {"error": f"Error processing query: {str(e)}"}
+        prompt = self._invoice_prompt(query, customer_info, tools, chat_history)
+        key, cached = self._cache_lookup("invoice", query, prompt, tools)
+        if cached is not _MISSING:
+            return cached
+        
+        return self._complete("invoice", key, prompt.messages, tools)
+
+    async def aprocess_invoice_query(self, query: str, customer_info: Dict[str, Any], tools: List[Tool], chat_history: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """
+        Process an invoice-related query using the LLM without blocking the event loop.
+        
+        Args:
+            query: User's query
+            customer_info: Customer information
+            tools: Available tools for the LLM
+            chat_history: Earlier messages in the conversation (optional)
+            
+        Returns:
+            Dictionary with response
+        """
+        prompt = self._invoice_prompt(query, customer_info, tools, chat_history)
+        key, cached = self._cache_lookup("invoice", query, prompt, tools)
+        if cached is not _MISSING:
+            return cached
+        
+        return await self._acomplete("invoice", key, prompt.messages, tools)
+
+    async def astream_invoice_query(self, query: str, customer_info: Dict[str, Any], tools: List[Tool], chat_history: Optional[List[Any]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream an invoice-related query as token events followed by the result.
+        
+        Args:
+            query: User's query
+            customer_info: Customer information
+            tools: Available tools for the LLM
+            chat_history: Earlier messages in the conversation (optional)
+            
+        Yields:
+            Event dictionaries with ``event`` and ``data`` keys
+        """
+        prompt = self._invoice_prompt(query, customer_info, tools, chat_history)
+        key, cached = self._cache_lookup("invoice", query, prompt, tools)
+        if cached is not _MISSING:
+            yield {"event": "result", "data": cached}
+            return
+        
+        async for event in self._astream("invoice", key, prompt.messages, tools):
+            yield event
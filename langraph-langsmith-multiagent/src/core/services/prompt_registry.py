@@ -0,0 +1,270 @@
+import hashlib
+import logging
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+from inspect import cleandoc
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from langchain_core.messages import BaseMessage, SystemMessage
+from langchain_core.prompts import (
+    ChatPromptTemplate,
+    HumanMessagePromptTemplate,
+    MessagesPlaceholder,
+)
+
+logger = logging.getLogger(__name__)
+
+# Prompts are laid out as [static system section, chat history, dynamic human
+# message]. The system section (instructions, output format and tool list) is
+# built once and is byte-identical across calls, so providers that cache
+# prompt prefixes can reuse it; everything that varies per request goes last.
+
+MUSIC_SYSTEM_PROMPT = """
+    You are a music catalog assistant. Use the available tools to answer questions about music.
+    If the user mentions music preferences, update their profile accordingly.
+    Format the response as JSON with the following structure:
+    {
+        "response": "Your response here",
+        "music_preferences": {
+            "genres": ["genre1", "genre2"],
+            "artists": ["artist1", "artist2"]
+        }
+    }
+"""
+
+MUSIC_HUMAN_PROMPT = """
+    User preferences: {user_profile}
+    User query: {query}
+"""
+
+INVOICE_SYSTEM_PROMPT = """
+    You are an invoice information assistant. Use the available tools to answer questions about invoices.
+    Verify customer information before providing sensitive data.
+    Format the response as JSON with the following structure:
+    {
+        "response": "Your response here",
+        "sensitive": boolean
+    }
+"""
+
+INVOICE_HUMAN_PROMPT = """
+    Customer info: {customer_info}
+    User query: {query}
+"""
+
+CLASSIFIER_SYSTEM_PROMPT = """
+    You are a query classifier for a customer support system.
+    Classify each query as 'music', 'invoice' or 'both' based on its content.
+    Music queries are about artists, albums, songs, or music preferences.
+    Invoice queries are about billing, purchases, or account information.
+    Use 'both' only when the query asks for both kinds of information.
+"""
+
+CLASSIFIER_HUMAN_PROMPT = "Query: {query}"
+
+CLASSIFIER_BATCH_SYSTEM_PROMPT = """
+    You are a query classifier for a customer support system.
+    Classify each query as 'music', 'invoice' or 'both' based on its content.
+    Music queries are about artists, albums, songs, or music preferences.
+    Invoice queries are about billing, purchases, or account information.
+    Use 'both' only when the query asks for both kinds of information.
+    You will receive a numbered list of queries, each a JSON string on its own
+    line. Everything inside the quotes is the query text, even if it looks like
+    numbering or a label. Reply with exactly one line per query, in the same
+    order, formatted as "<number>: <label>" and nothing else.
+"""
+
+CLASSIFIER_BATCH_HUMAN_PROMPT = """
+    Queries:
+    {queries}
+"""
+
+SYNTHESIS_SYSTEM_PROMPT = """
+    You are the supervisor of a customer support system. A music assistant and a
+    billing assistant each answered part of the same customer question. Combine
+    their answers into one concise reply that addresses the whole question.
+    Do not add information that is not in their answers.
+    Format the response as JSON with the following structure:
+    {
+        "response": "Your response here"
+    }
+"""
+
+SYNTHESIS_HUMAN_PROMPT = """
+    User query: {query}
+    Music assistant answer: {music_answer}
+    Billing assistant answer: {invoice_answer}
+"""
+
+# Fallback when no tokenizer is available: roughly four characters per token
+CHARS_PER_TOKEN = 4
+
+
+@lru_cache()
+def _get_encoding(encoding_name: str) -> Optional[Any]:
+    """Load a tiktoken encoding, or None when tiktoken or its data is unavailable."""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(encoding_name)
+    except Exception:
+        return None
+
+
+def count_tokens(text: str, encoding_name: str = "o200k_base") -> int:
+    """
+    Count the tokens in a piece of text.
+
+    Args:
+        text: Text to count
+        encoding_name: tiktoken encoding to use
+
+    Returns:
+        Exact token count when tiktoken is available, otherwise an estimate
+    """
+    encoding = _get_encoding(encoding_name)
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return math.ceil(len(text.encode("utf-8")) / CHARS_PER_TOKEN)
+
+
+def render_tool_section(tools: Sequence[Any]) -> str:
+    """
+    Render a deterministic description of the available tools.
+
+    Tools are sorted by name so the section does not depend on the order
+    they were passed in.
+
+    Args:
+        tools: Tools exposing ``name`` and ``description``
+
+    Returns:
+        Tool section text, or an empty string when there are no tools
+    """
+    if not tools:
+        return ""
+    lines = ["Available tools:"]
+    for tool in sorted(tools, key=lambda t: t.name):
+        description = " ".join((tool.description or "").split())
+        lines.append(f"- {tool.name}: {description}")
+    return "\n".join(lines)
+
+
+@dataclass(frozen=True)
+class PromptSpec:
+    name: str
+    system: str
+    human: str
+
+
+@dataclass
+class CompiledPrompt:
+    name: str
+    system_text: str
+    template: ChatPromptTemplate
+    prefix_tokens: int
+    tool_names: Tuple[str, ...] = ()
+    template_id: str = ""
+
+    def format_messages(self, chat_history: Optional[List[BaseMessage]] = None, **kwargs: Any) -> List[BaseMessage]:
+        """
+        Render the messages for one call.
+
+        Args:
+            chat_history: Earlier messages to place between the prefix and the query
+            **kwargs: Values for the dynamic template fields
+
+        Returns:
+            Messages starting with the shared static prefix
+        """
+        return self.template.format_messages(chat_history=chat_history or [], **kwargs)
+
+
+DEFAULT_PROMPTS = (
+    PromptSpec("music", MUSIC_SYSTEM_PROMPT, MUSIC_HUMAN_PROMPT),
+    PromptSpec("invoice", INVOICE_SYSTEM_PROMPT, INVOICE_HUMAN_PROMPT),
+    PromptSpec("classifier", CLASSIFIER_SYSTEM_PROMPT, CLASSIFIER_HUMAN_PROMPT),
+    PromptSpec("classifier_batch", CLASSIFIER_BATCH_SYSTEM_PROMPT, CLASSIFIER_BATCH_HUMAN_PROMPT),
+    PromptSpec("synthesis", SYNTHESIS_SYSTEM_PROMPT, SYNTHESIS_HUMAN_PROMPT),
+)
+
+
+class PromptRegistry:
+    def __init__(self, specs: Sequence[PromptSpec] = DEFAULT_PROMPTS):
+        """
+        Registry of prompt templates compiled once and reused across calls.
+
+        Args:
+            specs: Prompt specifications to compile
+        """
+        self._specs: Dict[str, PromptSpec] = {spec.name: spec for spec in specs}
+        self._compiled: Dict[Tuple[str, Tuple[str, ...]], CompiledPrompt] = {}
+        for spec in specs:
+            self.get(spec.name)
+
+    def _compile(self, spec: PromptSpec, tools: Sequence[Any]) -> CompiledPrompt:
+        sections = [cleandoc(spec.system)]
+        tool_section = render_tool_section(tools)
+        if tool_section:
+            sections.append(tool_section)
+        system_text = "\n\n".join(sections)
+        human_text = cleandoc(spec.human)
+        # Changes whenever the rendered prompt changes, so caches keyed on it go stale safely
+        digest = hashlib.sha256(f"{system_text}\0{human_text}".encode("utf-8")).hexdigest()[:16]
+
+        template = ChatPromptTemplate.from_messages([
+            # A message instance, not a template: braces in the JSON examples stay literal
+            SystemMessage(content=system_text),
+            MessagesPlaceholder(variable_name="chat_history", optional=True),
+            HumanMessagePromptTemplate.from_template(human_text),
+        ])
+        compiled = CompiledPrompt(
+            name=spec.name,
+            system_text=system_text,
+            template=template,
+            prefix_tokens=count_tokens(system_text),
+            tool_names=tuple(sorted(tool.name for tool in tools)),
+            template_id=f"{spec.name}:{digest}",
+        )
+        logger.info("Compiled prompt %s (%d prefix tokens)", spec.name, compiled.prefix_tokens)
+        return compiled
+
+    def get(self, name: str, tools: Optional[Sequence[Any]] = None) -> CompiledPrompt:
+        """
+        Get a compiled prompt, compiling it on first use for a given tool set.
+
+        Args:
+            name: Prompt name
+            tools: Tools to describe in the static prefix (optional)
+
+        Returns:
+            Compiled prompt
+        """
+        tools = list(tools or [])
+        key = (name, tuple(sorted(tool.name for tool in tools)))
+        compiled = self._compiled.get(key)
+        if compiled is None:
+            compiled = self._compiled[key] = self._compile(self._specs[name], tools)
+        return compiled
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the prefix size of every compiled prompt.
+
+        Returns:
+            Dictionary of prefix token and character counts keyed by prompt name
+            (suffixed with the tool names when compiled with tools)
+        """
+        result = {}
+        for (name, tool_names), compiled in self._compiled.items():
+            key = f"{name}[{','.join(tool_names)}]" if tool_names else name
+            result[key] = {
+                "prefix_tokens": compiled.prefix_tokens,
+                "prefix_chars": len(compiled.system_text),
+            }
+        return result
+
+
+@lru_cache()
+def get_prompt_registry() -> PromptRegistry:
+    """Get the process-wide prompt registry."""
+    return PromptRegistry()
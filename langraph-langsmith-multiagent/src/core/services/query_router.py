@@ -0,0 +1,402 @@
+import argparse
+import json
+import logging
+import math
+import os
+import random
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+MUSIC_KEYWORDS = frozenset({
+    "album", "albums", "artist", "artists", "band", "bands", "song", "songs", "track", "tracks",
+    "genre", "genres", "music", "listen", "playlist", "discography", "composer", "sings",
+    "jazz", "rock", "metal", "blues", "pop", "classical", "reggae", "grunge", "soundtrack",
+})
+
+INVOICE_KEYWORDS = frozenset({
+    "invoice", "invoices", "bill", "billing", "billed", "purchase", "purchases",
+    "purchased", "pay", "paying", "payment", "paid", "charge", "charged", "receipt", "order", "orders",
+    "account", "refund", "total", "buy", "bought", "spend", "spent", "spending", "owe",
+})
+
+# Confidence reported for a query matched by the keyword rules of exactly one label
+RULE_CONFIDENCE = 0.99
+
+# Words that join several requests in one query; a keyword match for one label
+# says nothing about the other parts, so these queries are left to the model
+MULTI_INTENT_TERMS = frozenset({"and", "also", "plus", "both", "as well", "as for", "then"})
+
+
+def tokenize(text: str) -> List[str]:
+    """Split a query into lower-cased word tokens."""
+    return TOKEN_PATTERN.findall((text or "").lower())
+
+
+def extract_terms(text: str) -> List[str]:
+    """Get the unigram and bigram terms the model is trained on."""
+    tokens = tokenize(text)
+    return tokens + [f"{first} {second}" for first, second in zip(tokens, tokens[1:])]
+
+
+def is_multi_intent(text: str) -> bool:
+    """Check whether a query may ask several things (conjunctions or more than one question)."""
+    return (text or "").count("?") > 1 or not MULTI_INTENT_TERMS.isdisjoint(extract_terms(text))
+
+
+@dataclass(frozen=True)
+class RouteDecision:
+    label: Optional[str]
+    confidence: float
+    source: str  # "rules", "model" or "none" (below the threshold: ask the LLM)
+
+
+class KeywordRules:
+    def __init__(self, keywords: Optional[Dict[str, FrozenSet[str]]] = None):
+        """
+        Route queries that mention the keywords of exactly one label.
+
+        Args:
+            keywords: Keyword set per label
+        """
+        self.keywords = keywords or {"music": MUSIC_KEYWORDS, "invoice": INVOICE_KEYWORDS}
+
+    def match(self, query: str) -> List[str]:
+        """Get the labels whose keywords occur in the query."""
+        words = set(tokenize(query))
+        return [label for label, keywords in self.keywords.items() if words & keywords]
+
+    def classify(self, query: str) -> Optional[str]:
+        """Get the label when the rules are unambiguous (None otherwise, including multi-intent queries)."""
+        labels = self.match(query)
+        if len(labels) != 1 or is_multi_intent(query):
+            return None
+        return labels[0]
+
+
+class TfidfLogisticModel:
+    def __init__(
+        self,
+        labels: Sequence[str],
+        vocabulary: Dict[str, int],
+        idf: np.ndarray,
+        weights: np.ndarray,
+        bias: np.ndarray,
+    ):
+        """
+        TF-IDF features with a multinomial logistic regression on top.
+
+        Args:
+            labels: Class labels, in weight column order
+            vocabulary: Term to feature index
+            idf: Inverse document frequency per feature
+            weights: Feature-by-label weight matrix
+            bias: Bias per label
+        """
+        self.labels = list(labels)
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.weights = weights
+        self.bias = bias
+
+    def _features(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        counts = Counter(term for term in extract_terms(text) if term in self.vocabulary)
+        if not counts:
+            return np.zeros(0, dtype=np.intp), np.zeros(0)
+        indices = np.fromiter((self.vocabulary[term] for term in counts), dtype=np.intp, count=len(counts))
+        values = (1.0 + np.log(np.fromiter(counts.values(), dtype=float, count=len(counts)))) * self.idf[indices]
+        return indices, values / np.linalg.norm(values)
+
+    def predict_proba(self, text: str) -> Dict[str, float]:
+        """
+        Get the probability of each label for a query.
+
+        Only the weight rows of terms present in the query are touched, so a
+        prediction costs a few microseconds regardless of vocabulary size.
+        """
+        indices, values = self._features(text)
+        logits = self.bias + values @ self.weights[indices]
+        probabilities = np.exp(logits - logits.max())
+        probabilities /= probabilities.sum()
+        return dict(zip(self.labels, probabilities.tolist()))
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """Get the most likely label and its probability."""
+        probabilities = self.predict_proba(text)
+        label = max(probabilities, key=probabilities.get)
+        return label, probabilities[label]
+
+    @classmethod
+    def fit(
+        cls,
+        texts: Sequence[str],
+        labels: Sequence[str],
+        epochs: int = 300,
+        learning_rate: float = 2.0,
+        l2: float = 1e-3,
+    ) -> "TfidfLogisticModel":
+        """
+        Train the model with full-batch gradient descent.
+
+        Args:
+            texts: Training queries
+            labels: Label per query
+            epochs: Gradient descent iterations
+            learning_rate: Step size
+            l2: L2 regularization strength
+
+        Returns:
+            Trained model
+        """
+        classes = sorted(set(labels))
+        documents = [Counter(extract_terms(text)) for text in texts]
+        document_frequency = Counter(term for document in documents for term in document)
+        vocabulary = {term: index for index, term in enumerate(sorted(document_frequency))}
+        idf = np.array([
+            math.log((1 + len(documents)) / (1 + document_frequency[term])) + 1 for term in sorted(document_frequency)
+        ])
+
+        features = np.zeros((len(documents), len(vocabulary)))
+        for row, document in enumerate(documents):
+            for term, count in document.items():
+                features[row, vocabulary[term]] = (1.0 + math.log(count)) * idf[vocabulary[term]]
+            norm = np.linalg.norm(features[row])
+            if norm:
+                features[row] /= norm
+        targets = np.zeros((len(documents), len(classes)))
+        targets[np.arange(len(documents)), [classes.index(label) for label in labels]] = 1.0
+
+        weights = np.zeros((len(vocabulary), len(classes)))
+        bias = np.zeros(len(classes))
+        for _ in range(epochs):
+            logits = features @ weights + bias
+            probabilities = np.exp(logits - logits.max(axis=1, keepdims=True))
+            probabilities /= probabilities.sum(axis=1, keepdims=True)
+            error = (probabilities - targets) / len(documents)
+            weights -= learning_rate * (features.T @ error + l2 * weights)
+            bias -= learning_rate * error.sum(axis=0)
+        return cls(classes, vocabulary, idf, weights, bias)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "labels": self.labels,
+            "vocabulary": self.vocabulary,
+            "idf": self.idf.tolist(),
+            "weights": self.weights.tolist(),
+            "bias": self.bias.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TfidfLogisticModel":
+        return cls(
+            data["labels"],
+            data["vocabulary"],
+            np.asarray(data["idf"], dtype=float),
+            np.asarray(data["weights"], dtype=float).reshape(len(data["vocabulary"]), len(data["labels"])),
+            np.asarray(data["bias"], dtype=float),
+        )
+
+    def save(self, path: str) -> None:
+        """Write the model to a JSON file."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(self.to_dict(), handle)
+
+    @classmethod
+    def load(cls, path: str) -> "TfidfLogisticModel":
+        """Read a model written by ``save``."""
+        with open(path, encoding="utf-8") as handle:
+            return cls.from_dict(json.load(handle))
+
+
+def load_labeled_queries(path: str) -> List[Tuple[str, str]]:
+    """
+    Read a labeled query file.
+
+    Args:
+        path: JSON Lines file with one ``{"query": ..., "label": ...}`` object per line
+
+    Returns:
+        List of (query, label) pairs
+    """
+    examples = []
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            if line.strip():
+                record = json.loads(line)
+                examples.append((record["query"], record["label"]))
+    return examples
+
+
+def split_holdout(
+    examples: Sequence[Tuple[str, str]], holdout: float, seed: int = 0
+) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]:
+    """Split examples into train and held-out sets, stratified by label."""
+    by_label: Dict[str, List[Tuple[str, str]]] = {}
+    for example in examples:
+        by_label.setdefault(example[1], []).append(example)
+    rng = random.Random(seed)
+    train, held_out = [], []
+    for label in sorted(by_label):
+        group = list(by_label[label])
+        rng.shuffle(group)
+        count = int(round(len(group) * holdout))
+        held_out.extend(group[:count])
+        train.extend(group[count:])
+    return train, held_out
+
+
+class QueryRouter:
+    def __init__(
+        self,
+        model: Optional[TfidfLogisticModel] = None,
+        rules: Optional[KeywordRules] = None,
+        threshold: float = 0.8,
+    ):
+        """
+        Local query classifier that answers without an LLM call when it is confident.
+
+        Single-intent queries matching the keywords of one label are routed by
+        the rules. Other queries (including mixed ones, which may need both
+        agents) go
+        to the TF-IDF model; predictions below ``threshold`` are reported
+        without a label so the caller can fall back to the LLM classifier.
+
+        Args:
+            model: Trained TF-IDF/logistic model (rules only if omitted)
+            rules: Keyword rules (the default music/invoice rules if omitted)
+            threshold: Minimum model probability for a local answer
+        """
+        self.model = model
+        self.rules = rules or KeywordRules()
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._counts = Counter()
+
+    def route(self, query: str) -> RouteDecision:
+        """
+        Classify a query locally.
+
+        Args:
+            query: User's query
+
+        Returns:
+            The decision; ``label`` is None when the LLM should decide
+        """
+        label = self.rules.classify(query)
+        if label is not None:
+            decision = RouteDecision(label, RULE_CONFIDENCE, "rules")
+        elif self.model is not None:
+            label, confidence = self.model.predict(query)
+            if confidence >= self.threshold:
+                decision = RouteDecision(label, confidence, "model")
+            else:
+                decision = RouteDecision(None, confidence, "none")
+        else:
+            decision = RouteDecision(None, 0.0, "none")
+        with self._lock:
+            self._counts[decision.source] += 1
+        return decision
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get routing counters.
+
+        Returns:
+            Dictionary with decisions per source and the share answered locally
+        """
+        with self._lock:
+            total = sum(self._counts.values())
+            return {
+                "rules": self._counts["rules"],
+                "model": self._counts["model"],
+                "llm_fallbacks": self._counts["none"],
+                "local_rate": (total - self._counts["none"]) / total if total else 0.0,
+                "threshold": self.threshold,
+            }
+
+
+def evaluate(router: QueryRouter, examples: Iterable[Tuple[str, str]]) -> Dict[str, Any]:
+    """
+    Measure a router against labeled queries.
+
+    Returns:
+        Dictionary with the local coverage, the accuracy of local answers and
+        the model's accuracy on every query (ignoring the threshold)
+    """
+    examples = list(examples)
+    answered = correct = model_correct = 0
+    for query, label in examples:
+        decision = router.route(query)
+        if decision.label is not None:
+            answered += 1
+            correct += int(decision.label == label)
+        if router.model is not None:
+            model_correct += int(router.model.predict(query)[0] == label)
+    return {
+        "queries": len(examples),
+        "coverage": answered / len(examples) if examples else 0.0,
+        "local_accuracy": correct / answered if answered else 0.0,
+        "model_accuracy": model_correct / len(examples) if examples else 0.0,
+    }
+
+
+@lru_cache()
+def get_query_router() -> Optional[QueryRouter]:
+    """
+    Get the process-wide query router (None when disabled).
+
+    A saved model is loaded when present; otherwise one is trained from the
+    labeled query file, which takes milliseconds.
+    """
+    if not settings.ROUTER_ENABLED:
+        return None
+    model = None
+    if settings.ROUTER_MODEL_PATH and os.path.exists(settings.ROUTER_MODEL_PATH):
+        model = TfidfLogisticModel.load(settings.ROUTER_MODEL_PATH)
+    elif settings.ROUTER_DATA_PATH and os.path.exists(settings.ROUTER_DATA_PATH):
+        queries, labels = zip(*load_labeled_queries(settings.ROUTER_DATA_PATH))
+        model = TfidfLogisticModel.fit(queries, labels)
+    else:
+        logger.warning("No query router model or training data found; routing by keyword rules only")
+    return QueryRouter(model, threshold=settings.ROUTER_THRESHOLD)
+
+
+def main() -> None:
+    """Retrain the query router and report its accuracy on held-out queries."""
+    parser = argparse.ArgumentParser(description="Train and evaluate the local query router.")
+    parser.add_argument("--data", default=settings.ROUTER_DATA_PATH, help="Labeled query file (JSON Lines)")
+    parser.add_argument("--out", default=settings.ROUTER_MODEL_PATH, help="Where to save the trained model")
+    parser.add_argument("--holdout", type=float, default=0.2, help="Share of queries held out for evaluation")
+    parser.add_argument("--threshold", type=float, default=settings.ROUTER_THRESHOLD, help="Confidence threshold")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the train/held-out split")
+    args = parser.parse_args()
+
+    examples = load_labeled_queries(args.data)
+    train, held_out = split_holdout(examples, args.holdout, args.seed)
+    model = TfidfLogisticModel.fit(*zip(*train))
+    if held_out:
+        report = evaluate(QueryRouter(model, threshold=args.threshold), held_out)
+        print(f"Held-out queries: {report['queries']}")
+        print(f"Answered locally: {report['coverage']:.1%} (accuracy {report['local_accuracy']:.1%})")
+        print(f"Model accuracy:   {report['model_accuracy']:.1%}")
+
+    # Ship a model trained on every labeled query
+    model = TfidfLogisticModel.fit(*zip(*examples))
+    model.save(args.out)
+    print(f"Saved model trained on {len(examples)} queries to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+import bisect
+import logging
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class LatencyHistogram:
+    __slots__ = ("counts", "count", "total_ms", "min_ms", "max_ms", "rows")
+
+    def __init__(self):
+        """Fixed-bucket latency histogram with row totals."""
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = float("inf")
+        self.max_ms = 0.0
+        self.rows = 0
+
+    def add(self, elapsed_ms: float, rows: int) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.min_ms = min(self.min_ms, elapsed_ms)
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.rows += rows
+
+    def percentile(self, quantile: float) -> float:
+        """Estimate a latency percentile (ms) as the upper bound of its bucket."""
+        if not self.count:
+            return 0.0
+        threshold = quantile * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= threshold:
+                return LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "rows": self.rows,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "min_ms": self.min_ms if self.count else 0.0,
+            "max_ms": self.max_ms,
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "buckets": {
+                (f"le_{bound}ms" if index < len(LATENCY_BUCKETS_MS) else "gt_max"): self.counts[index]
+                for index, bound in enumerate(LATENCY_BUCKETS_MS + (None,))
+            },
+        }
+
+
+class QueryStats:
+    def __init__(
+        self,
+        slow_query_ms: Optional[float] = None,
+        slow_log_size: int = 100,
+        explain_slow_queries: bool = True,
+    ):
+        """
+        Per-method query latency/row statistics with a slow-query log.
+
+        Args:
+            slow_query_ms: Statements slower than this are logged (None disables the slow log)
+            slow_log_size: Number of slow queries kept in memory
+            explain_slow_queries: Capture EXPLAIN QUERY PLAN output for slow queries
+        """
+        self.slow_query_ms = slow_query_ms
+        self.explain_slow_queries = explain_slow_queries
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._slow_queries = deque(maxlen=slow_log_size)
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        method: str,
+        elapsed: float,
+        rows: int,
+        explain: Optional[Callable[[], List[str]]] = None,
+    ) -> None:
+        """
+        Record one statement execution.
+
+        Args:
+            method: Service method that ran the statement
+            elapsed: Execution time in seconds (execute + fetch)
+            rows: Number of rows fetched
+            explain: Returns the statement's query plan; only called for slow queries
+        """
+        elapsed_ms = elapsed * 1000
+        with self._lock:
+            histogram = self._histograms.get(method)
+            if histogram is None:
+                histogram = self._histograms[method] = LatencyHistogram()
+            histogram.add(elapsed_ms, rows)
+
+        if self.slow_query_ms is None or elapsed_ms < self.slow_query_ms:
+            return
+        plan = None
+        if self.explain_slow_queries and explain is not None:
+            try:
+                plan = explain()
+            except Exception as e:
+                plan = [f"EXPLAIN failed: {e}"]
+        entry = {
+            "method": method,
+            "elapsed_ms": elapsed_ms,
+            "rows": rows,
+            "plan": plan,
+            "timestamp": time.time(),
+        }
+        with self._lock:
+            self._slow_queries.append(entry)
+        logger.warning("Slow query in %s: %.1f ms, %d rows, plan=%s", method, elapsed_ms, rows, plan)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get latency histograms and row counts per method.
+
+        Returns:
+            Dictionary mapping method names to their statistics
+        """
+        with self._lock:
+            return {method: histogram.snapshot() for method, histogram in sorted(self._histograms.items())}
+
+    def slow_queries(self) -> List[Dict[str, Any]]:
+        """Get the most recent slow queries, oldest first."""
+        with self._lock:
+            return list(self._slow_queries)
+
+    def reset(self) -> None:
+        """Clear all statistics and the slow-query log."""
+        with self._lock:
+            self._histograms.clear()
+            self._slow_queries.clear()
+
+
+@lru_cache()
+def get_query_stats() -> Optional[QueryStats]:
+    """Get the process-wide query statistics collector (None if disabled)."""
+    if not settings.DB_STATS_ENABLED:
+        return None
+    return QueryStats(
+        slow_query_ms=settings.DB_SLOW_QUERY_MS,
+        slow_log_size=settings.DB_SLOW_QUERY_LOG_SIZE,
+        explain_slow_queries=settings.DB_SLOW_QUERY_EXPLAIN,
+    )
@@ -0,0 +1,181 @@
+import inspect
+import itertools
+import logging
+import os
+import sqlite3
+import threading
+import weakref
+from functools import lru_cache
+from typing import Callable, List, Optional, Union
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_replica_ids = itertools.count()
+
+
+class MemoryReplica:
+    def __init__(
+        self,
+        source_path: str,
+        refresh_mode: str = "mtime",
+        refresh_interval: float = 60.0,
+    ):
+        """
+        Read-only in-memory copy of an on-disk SQLite database.
+
+        Each refresh copies the file into a new shared-cache in-memory database
+        with the SQLite backup API and then swaps the engine, so readers never
+        block on a refresh in progress.
+
+        Args:
+            source_path: Path of the on-disk database
+            refresh_mode: 'mtime' to refresh when the file changes, 'interval' to refresh on every tick
+            refresh_interval: Seconds between background checks (0 disables the background thread)
+        """
+        if refresh_mode not in ("mtime", "interval"):
+            raise ValueError(f"Unknown replica refresh mode: {refresh_mode}")
+        self.source_path = source_path
+        self.refresh_mode = refresh_mode
+        self.refresh_interval = refresh_interval
+        self.engine = None
+        self.refresh_count = 0
+        self._keeper: Optional[sqlite3.Connection] = None
+        self._source_mtime: Optional[float] = None
+        self._listeners: List[Union[weakref.WeakMethod, Callable[[], Callable[[], None]]]] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _get_source_mtime(self) -> float:
+        """Latest modification time of the database file and its WAL."""
+        mtimes = [
+            os.path.getmtime(path)
+            for path in (self.source_path, f"{self.source_path}-wal")
+            if os.path.exists(path)
+        ]
+        return max(mtimes)
+
+    def add_listener(self, listener: Callable[[], None]) -> None:
+        """
+        Register a callback run after every refresh (e.g. to drop cached results).
+
+        Bound methods are held weakly, so registering does not keep their
+        instance alive; they are dropped once the instance is collected.
+        """
+        if inspect.ismethod(listener):
+            reference = weakref.WeakMethod(listener)
+        else:
+            # Plain functions are held strongly
+            def reference():
+                return listener
+        with self._lock:
+            self._listeners.append(reference)
+
+    def remove_listener(self, listener: Callable[[], None]) -> None:
+        """Unregister a callback added with ``add_listener``."""
+        with self._lock:
+            self._listeners = [reference for reference in self._listeners if reference() not in (None, listener)]
+
+    def _live_listeners(self) -> List[Callable[[], None]]:
+        """Get the registered callbacks, pruning those whose instance was collected."""
+        with self._lock:
+            listeners = [(reference, reference()) for reference in self._listeners]
+            self._listeners = [reference for reference, listener in listeners if listener is not None]
+        return [listener for _, listener in listeners if listener is not None]
+
+    def refresh(self) -> None:
+        """Copy the on-disk database into a fresh in-memory database and swap it in."""
+        with self._lock:
+            mtime = self._get_source_mtime()
+            uri = f"file:replica_{os.getpid()}_{next(_replica_ids)}?mode=memory&cache=shared"
+            keeper = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            source = sqlite3.connect(f"file:{self.source_path}?mode=ro", uri=True)
+            try:
+                source.backup(keeper)
+            finally:
+                source.close()
+
+            engine = create_engine(
+                "sqlite://",
+                creator=lambda: sqlite3.connect(uri, uri=True, check_same_thread=False),
+            )
+            old_engine, old_keeper = self.engine, self._keeper
+            self.engine, self._keeper = engine, keeper
+            self._source_mtime = mtime
+            self.refresh_count += 1
+
+            # Sessions still running on the old copy keep it alive until they close
+            if old_engine is not None:
+                old_engine.dispose()
+            if old_keeper is not None:
+                old_keeper.close()
+
+        for listener in self._live_listeners():
+            listener()
+        logger.info("Refreshed in-memory replica of %s", self.source_path)
+
+    def refresh_if_changed(self) -> bool:
+        """
+        Refresh the replica if the on-disk database changed since the last copy.
+
+        Returns:
+            True if a refresh happened
+        """
+        if self._get_source_mtime() != self._source_mtime:
+            self.refresh()
+            return True
+        return False
+
+    def session(self) -> Session:
+        """Open a session on the current in-memory copy."""
+        if self.engine is None:
+            self.refresh()
+        return Session(bind=self.engine)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                if self.refresh_mode == "interval":
+                    self.refresh()
+                else:
+                    self.refresh_if_changed()
+            except Exception:
+                logger.exception("In-memory replica refresh failed")
+
+    def start(self) -> "MemoryReplica":
+        """Load the initial copy and start the background refresh thread."""
+        if self.engine is None:
+            self.refresh()
+        if self.refresh_interval > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="memory-replica-refresh", daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self) -> None:
+        """Stop the refresh thread and release the in-memory copy."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            if self.engine is not None:
+                self.engine.dispose()
+                self.engine = None
+            if self._keeper is not None:
+                self._keeper.close()
+                self._keeper = None
+
+
+@lru_cache()
+def get_memory_replica() -> MemoryReplica:
+    """Get the process-wide in-memory replica of settings.DB_URL."""
+    source_path = make_url(settings.DB_URL).database
+    return MemoryReplica(
+        source_path,
+        refresh_mode=settings.DB_REPLICA_REFRESH_MODE,
+        refresh_interval=settings.DB_REPLICA_REFRESH_INTERVAL,
+    ).start()
@@ -0,0 +1,408 @@
+import asyncio
+import concurrent.futures
+import logging
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+import httpx
+import openai
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class LLMUnavailableError(Exception):
+    """The LLM backend could not produce an answer in time (callers may fall back)."""
+
+
+class CircuitOpenError(LLMUnavailableError):
+    """The circuit breaker is open; the call was not attempted."""
+
+
+class LLMTimeoutError(LLMUnavailableError):
+    """The call missed its deadline."""
+
+
+def is_backend_failure(error: BaseException) -> bool:
+    """
+    Check whether an error means the backend is unhealthy.
+
+    Timeouts, connection failures and 5xx/429 responses count against the
+    circuit breaker. Errors caused by the request itself (400 context-length
+    or content-filter rejections, bad arguments) and cancellations do not, so
+    a few bad prompts cannot open the breaker for everyone.
+    """
+    if not isinstance(error, Exception):
+        return False
+    if isinstance(error, (LLMTimeoutError, TimeoutError, ConnectionError, httpx.TransportError, openai.APIConnectionError)):
+        return True
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return isinstance(status, int) and (status == 429 or status >= 500)
+
+
+class LatencyWindow:
+    def __init__(self, size: int = 200):
+        """
+        Rolling window of recent call latencies.
+
+        Args:
+            size: Number of most recent samples kept
+        """
+        self._samples: Deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Get a latency percentile in seconds (None without samples)."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, max(0, math.ceil(percent / 100 * len(samples)) - 1))
+        return samples[index]
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        failure_rate: float = 0.5,
+        min_calls: int = 10,
+        window: float = 30.0,
+        open_seconds: float = 15.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Failure-rate circuit breaker.
+
+        The breaker opens when at least ``min_calls`` outcomes in the last
+        ``window`` seconds have a failure rate of ``failure_rate`` or more.
+        After ``open_seconds`` it lets a single trial call through
+        (half-open); that call's outcome closes or re-opens it.
+
+        Args:
+            failure_rate: Failure ratio that opens the breaker
+            min_calls: Minimum outcomes in the window before the rate is evaluated
+            window: Length of the rolling outcome window in seconds
+            open_seconds: How long the breaker stays open before a trial call
+            clock: Monotonic time source
+        """
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window = window
+        self.open_seconds = open_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.open_seconds:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Check whether a call may be attempted now."""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN and self._clock() - self._opened_at >= self.open_seconds:
+                self._state = HALF_OPEN
+            if self._state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self._rejected += 1
+            return False
+
+    def record(self, success: bool) -> None:
+        """Record the outcome of an attempted call."""
+        with self._lock:
+            now = self._clock()
+            if self._state == HALF_OPEN:
+                self._trial_in_flight = False
+                if success:
+                    self._state = CLOSED
+                    self._outcomes.clear()
+                else:
+                    self._open(now)
+                return
+
+            self._outcomes.append((now, success))
+            while self._outcomes and self._outcomes[0][0] < now - self.window:
+                self._outcomes.popleft()
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            if (
+                self._state == CLOSED
+                and len(self._outcomes) >= self.min_calls
+                and failures / len(self._outcomes) >= self.failure_rate
+            ):
+                self._open(now)
+
+    def release(self) -> None:
+        """Give back an admitted call without recording an outcome (frees the half-open trial)."""
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._trial_in_flight = False
+
+    def record_error(self, error: BaseException) -> None:
+        """Record a failed or abandoned call: backend failures count, anything else is released."""
+        if is_backend_failure(error):
+            self.record(False)
+        else:
+            self.release()
+
+    def _open(self, now: float) -> None:
+        self._state = OPEN
+        self._opened_at = now
+        self._outcomes.clear()
+        logger.warning("LLM circuit breaker opened for %.0fs", self.open_seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        state = self.state
+        with self._lock:
+            return {
+                "state": state,
+                "window_calls": len(self._outcomes),
+                "window_failures": sum(1 for _, ok in self._outcomes if not ok),
+                "rejected": self._rejected,
+            }
+
+
+class ResiliencePolicy:
+    def __init__(
+        self,
+        timeout: Optional[float] = 30.0,
+        hedge: bool = True,
+        hedge_percentile: float = 95.0,
+        hedge_min_delay: float = 0.5,
+        hedge_min_samples: int = 20,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        """
+        Deadlines, hedged requests and a circuit breaker for backend calls.
+
+        Each call gets a deadline. If it has not answered after the recent
+        ``hedge_percentile`` latency (never less than ``hedge_min_delay``), a
+        duplicate request is fired and whichever answers first wins. Failures
+        and timeouts feed the circuit breaker, which rejects calls outright
+        while the backend is unhealthy.
+
+        Args:
+            timeout: Per-call deadline in seconds covering all attempts (None disables it)
+            hedge: Fire a duplicate request when the first one is slow
+            hedge_percentile: Latency percentile after which the duplicate is fired
+            hedge_min_delay: Lower bound for the hedge delay in seconds
+            hedge_min_samples: Latency samples needed before hedging starts
+            breaker: Circuit breaker (a default one if omitted)
+        """
+        self.timeout = timeout
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker = breaker or CircuitBreaker()
+        self.latency = LatencyWindow()
+        self._lock = threading.Lock()
+        self._running_attempts = 0
+        self._hedged = 0
+        self._hedge_wins = 0
+        self._timeouts = 0
+
+    def hedge_delay(self) -> Optional[float]:
+        """Get the delay before firing a duplicate request (None when not hedging yet)."""
+        if not self.hedge or len(self.latency) < self.hedge_min_samples:
+            return None
+        return max(self.hedge_min_delay, self.latency.percentile(self.hedge_percentile))
+
+    def _deadline_left(self, started: float) -> Optional[float]:
+        if self.timeout is None:
+            return None
+        return max(0.0, self.timeout - (time.monotonic() - started))
+
+    def _finish(self, started: float, hedge_won: bool = False) -> None:
+        self.latency.add(time.monotonic() - started)
+        self.breaker.record(True)
+        with self._lock:
+            self._hedge_wins += int(hedge_won)
+
+    def _fail(self, error: BaseException) -> None:
+        # Only backend failures count; a cancelled or rejected call just frees its admission
+        self.breaker.record_error(error)
+        if isinstance(error, LLMTimeoutError):
+            with self._lock:
+                self._timeouts += 1
+
+    def _submit(self, fn: Callable[[], Any]) -> concurrent.futures.Future:
+        """
+        Start a blocking attempt on its own thread.
+
+        Losing and timed-out attempts cannot be interrupted. A shared bounded
+        pool would queue new calls behind them (their time in the queue eating
+        the deadline), so every attempt gets a dedicated daemon thread.
+        """
+        future: concurrent.futures.Future = concurrent.futures.Future()
+
+        def run() -> None:
+            try:
+                result = fn()
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+            finally:
+                with self._lock:
+                    self._running_attempts -= 1
+
+        future.set_running_or_notify_cancel()
+        with self._lock:
+            self._running_attempts += 1
+        threading.Thread(target=run, name="llm-call", daemon=True).start()
+        return future
+
+    def _admit(self) -> float:
+        if not self.breaker.allow():
+            raise CircuitOpenError("LLM backend circuit breaker is open")
+        return time.monotonic()
+
+    def call(self, fn: Callable[[], Any]) -> Any:
+        """
+        Run a blocking call under the policy.
+
+        Attempts run on their own threads; a losing or timed-out attempt cannot
+        be interrupted and is left to finish in the background without delaying
+        later calls.
+
+        Raises:
+            CircuitOpenError: If the breaker is open
+            LLMTimeoutError: If no attempt answered before the deadline
+        """
+        started = self._admit()
+        try:
+            result, hedge_won = self._race(fn, started)
+        except BaseException as e:
+            self._fail(e)
+            raise
+        self._finish(started, hedge_won=hedge_won)
+        return result
+
+    def _race(self, fn: Callable[[], Any], started: float) -> Tuple[Any, bool]:
+        """Run the attempts of one blocking call; returns the result and whether the hedge won."""
+        delay = self.hedge_delay()
+        if delay is None and self.timeout is None:
+            # Nothing to enforce: call inline and only feed the breaker
+            return fn(), False
+
+        attempts = [self._submit(fn)]
+        while True:
+            # Check before waiting: an attempt may have finished since the last wait
+            for index, attempt in enumerate(attempts):
+                if attempt.done() and attempt.exception() is None:
+                    return attempt.result(), index > 0
+            failed = [attempt for attempt in attempts if attempt.done()]
+            if len(failed) == len(attempts) and (len(attempts) == 2 or delay is None):
+                raise failed[-1].exception()
+            left = self._deadline_left(started)
+            if left is not None and left <= 0:
+                raise LLMTimeoutError(f"LLM call exceeded its {self.timeout:.1f}s deadline")
+
+            wait_for = left
+            if delay is not None and len(attempts) == 1:
+                until_hedge = delay - (time.monotonic() - started)
+                if failed or until_hedge <= 0:
+                    # Slow (or failed) first attempt: fire the hedge
+                    with self._lock:
+                        self._hedged += 1
+                    attempts.append(self._submit(fn))
+                    continue
+                wait_for = until_hedge if wait_for is None else min(wait_for, until_hedge)
+            pending = [attempt for attempt in attempts if not attempt.done()]
+            concurrent.futures.wait(pending, timeout=wait_for, return_when=concurrent.futures.FIRST_COMPLETED)
+
+    async def acall(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await a call under the policy; losing and timed-out attempts are cancelled.
+
+        If the caller is cancelled, the call's breaker admission is released
+        without recording an outcome.
+
+        Raises:
+            CircuitOpenError: If the breaker is open
+            LLMTimeoutError: If no attempt answered before the deadline
+        """
+        started = self._admit()
+        try:
+            result, hedge_won = await self._arace(fn, started)
+        except BaseException as e:
+            self._fail(e)
+            raise
+        self._finish(started, hedge_won=hedge_won)
+        return result
+
+    async def _arace(self, fn: Callable[[], Awaitable[Any]], started: float) -> Tuple[Any, bool]:
+        """Await the attempts of one call; returns the result and whether the hedge won."""
+        delay = self.hedge_delay()
+        attempts: List[asyncio.Future] = [asyncio.ensure_future(fn())]
+        try:
+            while True:
+                for index, attempt in enumerate(attempts):
+                    if attempt.done() and not attempt.cancelled() and attempt.exception() is None:
+                        return attempt.result(), index > 0
+                failed = [attempt for attempt in attempts if attempt.done()]
+                if len(failed) == len(attempts) and (len(attempts) == 2 or delay is None):
+                    raise failed[-1].exception()
+                left = self._deadline_left(started)
+                if left is not None and left <= 0:
+                    raise LLMTimeoutError(f"LLM call exceeded its {self.timeout:.1f}s deadline")
+
+                wait_for = left
+                if delay is not None and len(attempts) == 1:
+                    until_hedge = delay - (time.monotonic() - started)
+                    if failed or until_hedge <= 0:
+                        with self._lock:
+                            self._hedged += 1
+                        attempts.append(asyncio.ensure_future(fn()))
+                        continue
+                    wait_for = until_hedge if wait_for is None else min(wait_for, until_hedge)
+                pending = [attempt for attempt in attempts if not attempt.done()]
+                await asyncio.wait(pending, timeout=wait_for, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for attempt in attempts:
+                if not attempt.done():
+                    attempt.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get resilience counters.
+
+        Returns:
+            Dictionary with hedging, timeout, latency and breaker figures
+            (``running_attempts`` includes abandoned attempts still in flight)
+        """
+        with self._lock:
+            result = {
+                "running_attempts": self._running_attempts,
+                "hedged": self._hedged,
+                "hedge_wins": self._hedge_wins,
+                "timeouts": self._timeouts,
+            }
+        result["hedge_delay_s"] = self.hedge_delay()
+        result["p95_s"] = self.latency.percentile(95)
+        result["breaker"] = self.breaker.stats()
+        return result
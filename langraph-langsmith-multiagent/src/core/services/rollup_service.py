@@ -0,0 +1,194 @@
+import argparse
+from typing import Dict
+from sqlalchemy import bindparam, create_engine, text
+from src.config.settings import settings
+
+# Number of tracks materialized per artist (matches the LIMIT in get_top_tracks)
+TOP_TRACKS_PER_ARTIST = 10
+
+ROLLUP_TABLES = ("artist_genre", "top_tracks", "rollup_dirty_artists")
+
+ROLLUP_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS artist_genre (
+        GenreId INTEGER NOT NULL,
+        ArtistId INTEGER NOT NULL,
+        PRIMARY KEY (GenreId, ArtistId)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_artist_genre_artist ON artist_genre (ArtistId)",
+    """
+    CREATE TABLE IF NOT EXISTS top_tracks (
+        ArtistId INTEGER NOT NULL,
+        Rank INTEGER NOT NULL,
+        TrackId INTEGER NOT NULL,
+        TrackName TEXT,
+        AlbumTitle TEXT,
+        PlayCount INTEGER,
+        PRIMARY KEY (ArtistId, Rank)
+    ) WITHOUT ROWID
+    """,
+    "CREATE TABLE IF NOT EXISTS rollup_dirty_artists (ArtistId INTEGER PRIMARY KEY)",
+)
+
+# Triggers only queue the affected artists; refresh_rollups() recomputes them
+# so bulk Track/Album loads stay cheap.
+ROLLUP_TRIGGERS = {
+    "rollup_track_insert": """
+        AFTER INSERT ON Track BEGIN
+            INSERT OR IGNORE INTO rollup_dirty_artists (ArtistId)
+            SELECT ArtistId FROM Album WHERE AlbumId = NEW.AlbumId;
+        END
+    """,
+    "rollup_track_update": """
+        AFTER UPDATE OF Name, AlbumId, GenreId, PlayCount ON Track BEGIN
+            INSERT OR IGNORE INTO rollup_dirty_artists (ArtistId)
+            SELECT ArtistId FROM Album WHERE AlbumId IN (OLD.AlbumId, NEW.AlbumId);
+        END
+    """,
+    "rollup_track_delete": """
+        AFTER DELETE ON Track BEGIN
+            INSERT OR IGNORE INTO rollup_dirty_artists (ArtistId)
+            SELECT ArtistId FROM Album WHERE AlbumId = OLD.AlbumId;
+        END
+    """,
+    "rollup_album_update": """
+        AFTER UPDATE OF Title, ArtistId ON Album BEGIN
+            INSERT OR IGNORE INTO rollup_dirty_artists (ArtistId) VALUES (OLD.ArtistId), (NEW.ArtistId);
+        END
+    """,
+    "rollup_album_delete": """
+        AFTER DELETE ON Album BEGIN
+            INSERT OR IGNORE INTO rollup_dirty_artists (ArtistId) VALUES (OLD.ArtistId);
+        END
+    """,
+}
+
+REFRESH_STATEMENTS = (
+    "DELETE FROM artist_genre WHERE ArtistId IN (SELECT ArtistId FROM rollup_dirty_artists)",
+    """
+    INSERT INTO artist_genre (GenreId, ArtistId)
+    SELECT DISTINCT Track.GenreId, Album.ArtistId
+    FROM rollup_dirty_artists
+    JOIN Album ON Album.ArtistId = rollup_dirty_artists.ArtistId
+    JOIN Track ON Track.AlbumId = Album.AlbumId
+    WHERE Track.GenreId IS NOT NULL
+    """,
+    "DELETE FROM top_tracks WHERE ArtistId IN (SELECT ArtistId FROM rollup_dirty_artists)",
+    f"""
+    INSERT INTO top_tracks (ArtistId, Rank, TrackId, TrackName, AlbumTitle, PlayCount)
+    SELECT ArtistId, Rank, TrackId, TrackName, AlbumTitle, PlayCount
+    FROM (
+        SELECT
+            Album.ArtistId,
+            ROW_NUMBER() OVER (
+                PARTITION BY Album.ArtistId ORDER BY Track.PlayCount DESC, Track.TrackId
+            ) AS Rank,
+            Track.TrackId,
+            Track.Name AS TrackName,
+            Album.Title AS AlbumTitle,
+            Track.PlayCount
+        FROM rollup_dirty_artists
+        JOIN Album ON Album.ArtistId = rollup_dirty_artists.ArtistId
+        JOIN Track ON Track.AlbumId = Album.AlbumId
+    )
+    WHERE Rank <= {TOP_TRACKS_PER_ARTIST}
+    """,
+)
+
+
+def has_rollups(session) -> bool:
+    """
+    Check whether the rollup tables have been built.
+
+    Args:
+        session: SQLAlchemy session or connection
+        
+    Returns:
+        True if every rollup table exists
+    """
+    query = text(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name IN :names"
+    ).bindparams(bindparam("names", expanding=True))
+    return session.execute(query, {"names": list(ROLLUP_TABLES)}).scalar() == len(ROLLUP_TABLES)
+
+
+def refresh_rollups(connection) -> int:
+    """
+    Recompute the rollup rows of every artist whose tracks or albums changed.
+
+    Args:
+        connection: SQLAlchemy connection inside a transaction
+        
+    Returns:
+        Number of artists refreshed
+    """
+    dirty = connection.execute(text("SELECT COUNT(*) FROM rollup_dirty_artists")).scalar()
+    if dirty:
+        for statement in REFRESH_STATEMENTS:
+            connection.execute(text(statement))
+        connection.execute(text("DELETE FROM rollup_dirty_artists"))
+    return dirty
+
+
+def build_rollups(connection) -> Dict[str, int]:
+    """
+    Create the rollup tables and change triggers and fully repopulate them.
+
+    Args:
+        connection: SQLAlchemy connection inside a transaction
+        
+    Returns:
+        Dictionary with the number of rows per rollup table
+    """
+    for statement in ROLLUP_SCHEMA:
+        connection.execute(text(statement))
+    for trigger_name, body in ROLLUP_TRIGGERS.items():
+        connection.execute(text(f"CREATE TRIGGER IF NOT EXISTS {trigger_name} {body}"))
+
+    connection.execute(text("DELETE FROM artist_genre"))
+    connection.execute(text("DELETE FROM top_tracks"))
+    connection.execute(text("INSERT OR IGNORE INTO rollup_dirty_artists (ArtistId) SELECT ArtistId FROM Artist"))
+    refresh_rollups(connection)
+    return {
+        table: connection.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+        for table in ("artist_genre", "top_tracks")
+    }
+
+
+def drop_rollups(connection) -> None:
+    """
+    Drop the rollup tables and their change triggers.
+
+    Args:
+        connection: SQLAlchemy connection inside a transaction
+    """
+    for trigger_name in ROLLUP_TRIGGERS:
+        connection.execute(text(f"DROP TRIGGER IF EXISTS {trigger_name}"))
+    for table in ROLLUP_TABLES:
+        connection.execute(text(f"DROP TABLE IF EXISTS {table}"))
+
+
+def main() -> None:
+    """Build, incrementally refresh or drop the catalog rollup tables."""
+    parser = argparse.ArgumentParser(description="Manage the artist_genre / top_tracks rollup tables.")
+    parser.add_argument("--db-url", default=settings.DB_URL, help="Database URL (defaults to settings.DB_URL)")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--full", action="store_true", help="Rebuild every artist instead of only changed ones")
+    group.add_argument("--drop", action="store_true", help="Drop the rollup tables and triggers")
+    args = parser.parse_args()
+
+    engine = create_engine(args.db_url)
+    with engine.begin() as connection:
+        if args.drop:
+            drop_rollups(connection)
+            print("Dropped rollup tables")
+        elif args.full or not has_rollups(connection):
+            for table, count in build_rollups(connection).items():
+                print(f"{table}: {count} rows")
+        else:
+            print(f"Refreshed {refresh_rollups(connection)} artists")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import argparse
+from typing import Dict
+from sqlalchemy import bindparam, create_engine, text
+from src.config.settings import settings
+
+# External-content FTS5 tables: they index Artist.Name / Genre.Name without
+# duplicating the rows and the trigram tokenizer lets substring LIKE lookups
+# use the index instead of scanning the base table.
+SEARCH_INDEXES = {
+    "artist_search": ("Artist", "ArtistId"),
+    "genre_search": ("Genre", "GenreId"),
+}
+
+
+def _sync_triggers(search_table: str, content_table: str, content_rowid: str) -> Dict[str, str]:
+    """Build the triggers that mirror row changes of a content table into its search table."""
+    delete_old = (
+        f"INSERT INTO {search_table}({search_table}, rowid, Name) "
+        f"VALUES ('delete', OLD.{content_rowid}, OLD.Name);"
+    )
+    insert_new = f"INSERT INTO {search_table}(rowid, Name) VALUES (NEW.{content_rowid}, NEW.Name);"
+    return {
+        f"{search_table}_insert": f"AFTER INSERT ON {content_table} BEGIN {insert_new} END",
+        f"{search_table}_update": f"AFTER UPDATE OF Name, {content_rowid} ON {content_table} BEGIN {delete_old} {insert_new} END",
+        f"{search_table}_delete": f"AFTER DELETE ON {content_table} BEGIN {delete_old} END",
+    }
+
+
+# External-content tables are not updated by SQLite itself; these triggers keep
+# them in step with Artist/Genre writes so new and renamed names are searchable.
+SEARCH_TRIGGERS = {
+    trigger_name: body
+    for search_table, (content_table, content_rowid) in SEARCH_INDEXES.items()
+    for trigger_name, body in _sync_triggers(search_table, content_table, content_rowid).items()
+}
+
+# Foreign key indexes the indexed queries join through (present in the stock
+# Chinook schema, created here for databases that lack them).
+JOIN_INDEXES = {
+    "IFK_AlbumArtistId": ("Album", "ArtistId"),
+    "IFK_TrackAlbumId": ("Track", "AlbumId"),
+    "IFK_TrackGenreId": ("Track", "GenreId"),
+}
+
+
+def has_search_index(session) -> bool:
+    """
+    Check whether the FTS5 name indexes have been built.
+
+    Args:
+        session: SQLAlchemy session or connection
+        
+    Returns:
+        True if every search table exists
+    """
+    query = text(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name IN :names"
+    ).bindparams(bindparam("names", expanding=True))
+    return session.execute(query, {"names": list(SEARCH_INDEXES)}).scalar() == len(SEARCH_INDEXES)
+
+
+def build_search_index(connection) -> Dict[str, int]:
+    """
+    Create the FTS5 trigram indexes and their sync triggers if needed and rebuild them from the base tables.
+
+    Later Artist and Genre inserts, renames and deletes are applied to the
+    indexes by the triggers.
+
+    Args:
+        connection: SQLAlchemy connection inside a transaction
+        
+    Returns:
+        Dictionary with the number of indexed rows per search table
+    """
+    for index_name, (table, column) in JOIN_INDEXES.items():
+        connection.execute(text(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table} ({column})"))
+
+    counts = {}
+    for search_table, (content_table, content_rowid) in SEARCH_INDEXES.items():
+        connection.execute(text(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {search_table} USING fts5(
+                Name,
+                content='{content_table}',
+                content_rowid='{content_rowid}',
+                tokenize='trigram'
+            )
+        """))
+        connection.execute(text(f"INSERT INTO {search_table}({search_table}) VALUES ('rebuild')"))
+        counts[search_table] = connection.execute(text(f"SELECT COUNT(*) FROM {content_table}")).scalar()
+    for trigger_name, body in SEARCH_TRIGGERS.items():
+        connection.execute(text(f"CREATE TRIGGER IF NOT EXISTS {trigger_name} {body}"))
+    return counts
+
+
+def drop_search_index(connection) -> None:
+    """
+    Drop the FTS5 name indexes and their sync triggers.
+
+    Args:
+        connection: SQLAlchemy connection inside a transaction
+    """
+    for trigger_name in SEARCH_TRIGGERS:
+        connection.execute(text(f"DROP TRIGGER IF EXISTS {trigger_name}"))
+    for search_table in SEARCH_INDEXES:
+        connection.execute(text(f"DROP TABLE IF EXISTS {search_table}"))
+
+
+def main() -> None:
+    """Build, refresh or drop the artist/genre search indexes."""
+    parser = argparse.ArgumentParser(description="Manage the FTS5 artist/genre search indexes.")
+    parser.add_argument("--db-url", default=settings.DB_URL, help="Database URL (defaults to settings.DB_URL)")
+    parser.add_argument("--drop", action="store_true", help="Drop the indexes instead of building them")
+    args = parser.parse_args()
+
+    engine = create_engine(args.db_url)
+    with engine.begin() as connection:
+        if args.drop:
+            drop_search_index(connection)
+            print("Dropped search indexes")
+        else:
+            for search_table, count in build_search_index(connection).items():
+                print(f"{search_table}: {count} rows indexed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+import secrets
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, Optional
+from src.config.settings import settings
+
+
+@dataclass(frozen=True)
+class VerifiedSession:
+    token: str
+    customer_id: str
+    customer_info: Dict[str, Any]
+    identifiers: FrozenSet[str]
+    expires_at: float
+
+    def matches(self, identifier: Any) -> bool:
+        """Check whether an ID, email or phone number was used to verify this session."""
+        return normalize_identifier(identifier) in self.identifiers
+
+
+def normalize_identifier(identifier: Any) -> str:
+    """Normalize a customer identifier (ID, email or phone) for comparison."""
+    return str(identifier).strip().lower()
+
+
+class SessionStore:
+    def __init__(
+        self,
+        ttl: float = 1800.0,
+        max_size: int = 10000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Map session tokens to verified customer records.
+
+        A session is created after a successful verification and lets later
+        turns of the same conversation skip the customer lookup. It lasts
+        ``ttl`` seconds from verification (it is not extended by use), so a
+        changed customer record is picked up at the next verification.
+
+        Args:
+            ttl: Session lifetime in seconds
+            max_size: Maximum number of live sessions before the least recently used is dropped
+            clock: Monotonic time source
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self._clock = clock
+        self._sessions: "OrderedDict[str, VerifiedSession]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts = Counter()
+
+    def create(self, customer_id: Any, customer_info: Dict[str, Any], identifier: Any = None) -> VerifiedSession:
+        """
+        Start a session for a verified customer.
+
+        Args:
+            customer_id: Verified customer ID
+            customer_info: Customer record returned by the verification lookup
+            identifier: Email or phone number the customer verified with, if not the ID
+
+        Returns:
+            New session (its token is returned to the client)
+        """
+        identifiers = {normalize_identifier(customer_id)}
+        if identifier is not None:
+            identifiers.add(normalize_identifier(identifier))
+        session = VerifiedSession(
+            token=secrets.token_urlsafe(32),
+            customer_id=str(customer_id),
+            customer_info=customer_info,
+            identifiers=frozenset(identifiers),
+            expires_at=self._clock() + self.ttl,
+        )
+        with self._lock:
+            self._sessions[session.token] = session
+            self._counts["created"] += 1
+            while len(self._sessions) > self.max_size:
+                self._sessions.popitem(last=False)
+                self._counts["evicted"] += 1
+        return session
+
+    def get(self, token: Optional[str]) -> Optional[VerifiedSession]:
+        """
+        Look up a live session.
+
+        Args:
+            token: Session token from the client
+
+        Returns:
+            The session, or None if the token is unknown, expired or revoked
+        """
+        if not token:
+            return None
+        with self._lock:
+            session = self._sessions.get(token)
+            if session is None:
+                self._counts["misses"] += 1
+                return None
+            if session.expires_at <= self._clock():
+                del self._sessions[token]
+                self._counts["expired"] += 1
+                return None
+            self._sessions.move_to_end(token)
+            self._counts["hits"] += 1
+            return session
+
+    def revoke(self, token: Optional[str]) -> bool:
+        """
+        End a session explicitly (logout).
+
+        Returns:
+            True if a session was removed
+        """
+        with self._lock:
+            removed = self._sessions.pop(token, None) is not None
+            self._counts["revoked"] += int(removed)
+            return removed
+
+    def revoke_customer(self, customer_id: Any) -> int:
+        """
+        End every session of a customer (e.g. after their record changes).
+
+        Returns:
+            Number of sessions removed
+        """
+        customer_id = str(customer_id)
+        with self._lock:
+            tokens = [token for token, session in self._sessions.items() if session.customer_id == customer_id]
+            for token in tokens:
+                del self._sessions[token]
+            self._counts["revoked"] += len(tokens)
+            return len(tokens)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get session counters.
+
+        Returns:
+            Live session count and created/hit/miss/expired/revoked/evicted counts
+        """
+        with self._lock:
+            return {
+                "active": len(self._sessions),
+                **{name: self._counts[name] for name in ("created", "hits", "misses", "expired", "revoked", "evicted")},
+            }
+
+
+@lru_cache()
+def get_session_store() -> Optional[SessionStore]:
+    """Get the process-wide session store (None when verified sessions are disabled)."""
+    if not settings.SESSION_ENABLED:
+        return None
+    return SessionStore(ttl=settings.SESSION_TTL, max_size=settings.SESSION_MAX_SIZE)
@@ -0,0 +1,144 @@
+import asyncio
+import threading
+import weakref
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    def __init__(self):
+        """
+        Coalesce concurrent calls that share a key into one execution.
+
+        The first caller for a key runs the computation; callers arriving while
+        it is in flight wait for it and receive the same result (or exception).
+        Nothing is remembered once the call completes - that is the response
+        cache's job. Shared results must be treated as read-only.
+        """
+        self._lock = threading.Lock()
+        self._calls: Dict[Tuple[str, Hashable], _Call] = {}
+        # In-flight tasks are bound to the event loop that created them
+        self._tasks: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+        self._requests = Counter()
+        self._executions = Counter()
+
+    def do(self, group: str, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Run ``fn`` unless an identical call is already in flight on another thread.
+
+        Args:
+            group: Call group used for metrics (and as part of the key)
+            key: Key identifying identical calls within the group
+            fn: Computation to run
+
+        Returns:
+            Result of the (possibly shared) computation
+        """
+        flight_key = (group, key)
+        with self._lock:
+            self._requests[group] += 1
+            call = self._calls.get(flight_key)
+            leader = call is None
+            if leader:
+                call = self._calls[flight_key] = _Call()
+                self._executions[group] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[flight_key]
+            call.done.set()
+        return call.result
+
+    async def ado(self, group: str, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await ``fn()`` unless an identical call is already in flight on this event loop.
+
+        The computation runs as a task, so a waiter being cancelled does not
+        cancel the shared call for everyone else.
+
+        Args:
+            group: Call group used for metrics (and as part of the key)
+            key: Key identifying identical calls within the group
+            fn: Coroutine function to run
+
+        Returns:
+            Result of the (possibly shared) computation
+        """
+        loop = asyncio.get_running_loop()
+        flight_key = (group, key)
+        with self._lock:
+            self._requests[group] += 1
+            tasks = self._tasks.get(loop)
+            if tasks is None:
+                tasks = self._tasks[loop] = {}
+            task = tasks.get(flight_key)
+            if task is None:
+                task = tasks[flight_key] = loop.create_task(fn())
+                self._executions[group] += 1
+                task.add_done_callback(lambda done: self._forget(tasks, flight_key, done))
+        return await asyncio.shield(task)
+
+    def _forget(self, tasks: Dict[Tuple[str, Hashable], "asyncio.Task"], flight_key: Tuple[str, Hashable], task: "asyncio.Task") -> None:
+        with self._lock:
+            if tasks.get(flight_key) is task:
+                del tasks[flight_key]
+        # Mark the exception as retrieved even if every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get coalescing counters.
+
+        Returns:
+            Dictionary with totals and per-group requests, executions and saved calls
+        """
+        with self._lock:
+            requests = sum(self._requests.values())
+            executions = sum(self._executions.values())
+            return {
+                "requests": requests,
+                "executions": executions,
+                "saved": requests - executions,
+                "groups": {
+                    group: {
+                        "requests": self._requests[group],
+                        "executions": self._executions[group],
+                        "saved": self._requests[group] - self._executions[group],
+                    }
+                    for group in sorted(self._requests)
+                },
+            }
+
+    def reset(self) -> None:
+        """Reset the counters (in-flight calls are unaffected)."""
+        with self._lock:
+            self._requests.clear()
+            self._executions.clear()
+
+
+@lru_cache()
+def get_singleflight() -> SingleFlight:
+    """Get the process-wide request coalescer."""
+    return SingleFlight()
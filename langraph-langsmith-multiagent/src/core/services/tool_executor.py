@@ -0,0 +1,207 @@
+import asyncio
+import concurrent.futures
+import logging
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from langchain_core.messages import ToolMessage
+from src.config.settings import settings
+from src.core.models.serialization import to_prompt_text
+from src.core.services.query_stats import LatencyHistogram
+from src.core.services.tracing import get_tracer, wrap
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ToolCallResult:
+    name: str
+    call_id: str
+    message: ToolMessage
+    elapsed_ms: float
+    error: Optional[str] = None
+
+
+@dataclass
+class StepTiming:
+    step: int
+    llm_ms: float
+    tools_ms: float = 0.0
+    tool_calls: Tuple[str, ...] = ()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "step": self.step,
+            "llm_ms": round(self.llm_ms, 3),
+            "tools_ms": round(self.tools_ms, 3),
+            "tool_calls": list(self.tool_calls),
+        }
+
+
+def get_tool_calls(response: Any) -> List[Dict[str, Any]]:
+    """Get the tool calls requested by an LLM message (empty if it is a final answer)."""
+    tool_calls = getattr(response, "tool_calls", None)
+    return tool_calls if isinstance(tool_calls, list) else []
+
+
+class ToolExecutor:
+    def __init__(
+        self,
+        max_workers: int = 8,
+        result_filter: Optional[Callable[[Any], Any]] = None,
+    ):
+        """
+        Run the tool calls from one model turn concurrently.
+
+        Calls from the same turn are independent, so they run in parallel (a
+        thread pool on the sync path, ``asyncio.gather`` on the async path).
+        A failing or unknown tool produces an error ``ToolMessage`` instead of
+        aborting the turn, so the model can recover.
+
+        Args:
+            max_workers: Threads for the sync path
+            result_filter: Applied to each tool result before it is rendered (e.g. list capping)
+        """
+        self.result_filter = result_filter
+        self.tracer = get_tracer()
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="agent-tool"
+        )
+        self._lock = threading.Lock()
+        self._tool_latency: Dict[str, LatencyHistogram] = defaultdict(LatencyHistogram)
+        self._tool_errors: Dict[str, int] = defaultdict(int)
+        self._steps: Dict[str, LatencyHistogram] = defaultdict(LatencyHistogram)
+        self._step_limit_hits: Dict[str, int] = defaultdict(int)
+
+    def _to_message(self, call: Dict[str, Any], result: Any = None, error: Optional[Exception] = None) -> ToolMessage:
+        if error is not None:
+            return ToolMessage(
+                content=f"Error: {error}",
+                tool_call_id=call.get("id") or "",
+                name=call.get("name"),
+                status="error",
+            )
+        if self.result_filter is not None:
+            result = self.result_filter(result)
+        return ToolMessage(content=to_prompt_text(result), tool_call_id=call.get("id") or "", name=call.get("name"))
+
+    def _finish(self, call: Dict[str, Any], started: float, result: Any = None, error: Optional[Exception] = None) -> ToolCallResult:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        name = call.get("name") or "unknown"
+        with self._lock:
+            self._tool_latency[name].add(elapsed_ms, 0)
+            if error is not None:
+                self._tool_errors[name] += 1
+        if error is not None:
+            logger.warning("Tool %s failed after %.1fms: %s", name, elapsed_ms, error)
+        return ToolCallResult(
+            name=name,
+            call_id=call.get("id") or "",
+            message=self._to_message(call, result, error),
+            elapsed_ms=elapsed_ms,
+            error=str(error) if error is not None else None,
+        )
+
+    def _invoke(self, call: Dict[str, Any], tools_by_name: Dict[str, Any]) -> ToolCallResult:
+        with self.tracer.span("tool.call", tool=call.get("name")) as span:
+            started = time.perf_counter()
+            tool = tools_by_name.get(call.get("name"))
+            if tool is None:
+                outcome = self._finish(call, started, error=LookupError(f"Unknown tool: {call.get('name')}"))
+            else:
+                try:
+                    outcome = self._finish(call, started, tool.invoke(call.get("args") or {}))
+                except Exception as e:
+                    outcome = self._finish(call, started, error=e)
+            span.set(error=outcome.error)
+            return outcome
+
+    async def _ainvoke(self, call: Dict[str, Any], tools_by_name: Dict[str, Any]) -> ToolCallResult:
+        with self.tracer.span("tool.call", tool=call.get("name")) as span:
+            started = time.perf_counter()
+            tool = tools_by_name.get(call.get("name"))
+            if tool is None:
+                outcome = self._finish(call, started, error=LookupError(f"Unknown tool: {call.get('name')}"))
+            else:
+                try:
+                    # Sync tools are run in the default executor by ainvoke
+                    outcome = self._finish(call, started, await tool.ainvoke(call.get("args") or {}))
+                except Exception as e:
+                    outcome = self._finish(call, started, error=e)
+            span.set(error=outcome.error)
+            return outcome
+
+    def run(self, tool_calls: Sequence[Dict[str, Any]], tools: Sequence[Any]) -> List[ToolCallResult]:
+        """
+        Execute one turn's tool calls, in parallel when there is more than one.
+
+        Args:
+            tool_calls: Tool calls from the model message
+            tools: Available tools
+
+        Returns:
+            One result per call, in call order
+        """
+        tools_by_name = {tool.name: tool for tool in tools}
+        if len(tool_calls) == 1:
+            return [self._invoke(tool_calls[0], tools_by_name)]
+        # Each call joins the current trace on its pool thread
+        futures = [self._executor.submit(wrap(self._invoke), call, tools_by_name) for call in tool_calls]
+        return [future.result() for future in futures]
+
+    async def arun(self, tool_calls: Sequence[Dict[str, Any]], tools: Sequence[Any]) -> List[ToolCallResult]:
+        """
+        Execute one turn's tool calls concurrently on the event loop.
+
+        Args:
+            tool_calls: Tool calls from the model message
+            tools: Available tools
+
+        Returns:
+            One result per call, in call order
+        """
+        tools_by_name = {tool.name: tool for tool in tools}
+        return list(await asyncio.gather(*(self._ainvoke(call, tools_by_name) for call in tool_calls)))
+
+    def record_run(self, agent: str, steps: Sequence[StepTiming], hit_limit: bool = False) -> None:
+        """Record the per-step timings of one agent loop."""
+        with self._lock:
+            for step in steps:
+                self._steps[agent].add(step.llm_ms + step.tools_ms, len(step.tool_calls))
+            if hit_limit:
+                self._step_limit_hits[agent] += 1
+        logger.debug("Agent %s loop: %s", agent, [step.to_dict() for step in steps])
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get tool and loop timing statistics.
+
+        Returns:
+            Per-tool latency histograms and error counts, and per-agent step
+            latency histograms (``rows`` counts tool calls) and step-limit hits
+        """
+        with self._lock:
+            return {
+                "tools": {
+                    name: {**histogram.snapshot(), "errors": self._tool_errors[name]}
+                    for name, histogram in sorted(self._tool_latency.items())
+                },
+                "steps": {
+                    agent: {**histogram.snapshot(), "step_limit_hits": self._step_limit_hits[agent]}
+                    for agent, histogram in sorted(self._steps.items())
+                },
+            }
+
+
+@lru_cache()
+def get_tool_executor() -> ToolExecutor:
+    """Get the process-wide tool executor."""
+    from src.core.services.context_assembler import get_context_assembler
+
+    return ToolExecutor(
+        max_workers=settings.AGENT_TOOL_WORKERS,
+        result_filter=get_context_assembler().cap_tool_result,
+    )
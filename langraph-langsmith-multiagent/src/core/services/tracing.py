@@ -0,0 +1,303 @@
+import argparse
+import atexit
+import contextvars
+import functools
+import json
+import logging
+import math
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from src.config.settings import settings
+from src.core.models.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start: float
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    duration_ms: Optional[float] = None
+    status: str = "ok"
+    error: Optional[str] = None
+
+    def set(self, **attributes: Any) -> None:
+        """Add attributes (row counts, tokens, decisions) to the span."""
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "request_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start": self.start,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+# Returned by a disabled tracer: entering, setting and exiting cost a method call each
+NOOP_SPAN = _NoopSpan()
+
+
+class _SpanScope:
+    __slots__ = ("tracer", "name", "request_id", "attributes", "span", "started", "token")
+
+    def __init__(self, tracer: "Tracer", name: str, request_id: Optional[str], attributes: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.request_id = request_id
+        self.attributes = attributes
+
+    def __enter__(self) -> Span:
+        parent = _current_span.get()
+        self.span = Span(
+            name=self.name,
+            trace_id=parent.trace_id if parent is not None else (self.request_id or uuid.uuid4().hex),
+            span_id=uuid.uuid4().hex[:16],
+            parent_id=parent.span_id if parent is not None else None,
+            start=time.time(),
+            attributes=self.attributes,
+        )
+        self.token = _current_span.set(self.span)
+        self.started = time.perf_counter()
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        span = self.span
+        span.duration_ms = (time.perf_counter() - self.started) * 1000
+        if exc is not None:
+            span.status = "error"
+            span.error = f"{exc_type.__name__}: {exc}"
+        try:
+            _current_span.reset(self.token)
+        except ValueError:
+            # Ended in another context (an async generator closed by a different task)
+            pass
+        self.tracer.exporter.export(span)
+        return False
+
+
+class InMemoryExporter:
+    def __init__(self):
+        """Keep finished spans in a list (for tests and interactive use)."""
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def flush(self) -> None:
+        pass
+
+
+class JsonLinesExporter:
+    def __init__(self, path: str, buffer_size: int = 64):
+        """
+        Append finished spans to a local JSON Lines file.
+
+        Spans are buffered and written in batches so request threads do not
+        pay for a file write per span.
+
+        Args:
+            path: Output file (created with its directory if missing)
+            buffer_size: Spans buffered before a write
+        """
+        self.path = path
+        self.buffer_size = max(1, buffer_size)
+        self._buffer: List[bytes] = []
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def export(self, span: Span) -> None:
+        line = dumps(span.to_dict()) + b"\n"
+        with self._lock:
+            self._buffer.append(line)
+            if len(self._buffer) >= self.buffer_size:
+                self._write_locked()
+
+    def _write_locked(self) -> None:
+        lines, self._buffer = self._buffer, []
+        if lines:
+            with open(self.path, "ab") as handle:
+                handle.writelines(lines)
+
+    def flush(self) -> None:
+        """Write buffered spans to the file."""
+        with self._lock:
+            self._write_locked()
+
+
+class Tracer:
+    def __init__(self, exporter: Optional[Any] = None):
+        """
+        Span-based tracer; disabled (every span a no-op) without an exporter.
+
+        The current span is held in a context variable, so nesting follows
+        ``with`` blocks, asyncio tasks and ``asyncio.to_thread`` calls. Work
+        submitted to thread pools must be wrapped with ``wrap`` to stay in
+        the request's trace.
+
+        Args:
+            exporter: Receives each span when it ends
+        """
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def span(self, name: str, request_id: Optional[str] = None, **attributes: Any) -> Any:
+        """
+        Open a span as a context manager yielding the span.
+
+        Args:
+            name: Stage name (e.g. ``supervisor.route``)
+            request_id: Trace ID for a root span (ignored inside an existing trace)
+            **attributes: Initial span attributes
+
+        Returns:
+            Context manager; a no-op when tracing is disabled
+        """
+        if self.exporter is None:
+            return NOOP_SPAN
+        return _SpanScope(self, name, request_id, attributes)
+
+    @staticmethod
+    def current_span() -> Any:
+        """Get the innermost open span (a no-op span outside any trace)."""
+        span = _current_span.get()
+        return span if span is not None else NOOP_SPAN
+
+    @staticmethod
+    def current_request_id() -> Optional[str]:
+        """Get the request (trace) ID of the current span, if any."""
+        span = _current_span.get()
+        return span.trace_id if span is not None else None
+
+    def flush(self) -> None:
+        """Write any buffered spans."""
+        if self.exporter is not None:
+            self.exporter.flush()
+
+
+def wrap(fn: Callable) -> Callable:
+    """Bind a callable to the current context so it joins the current trace on a pool thread."""
+    context = contextvars.copy_context()
+    return functools.partial(context.run, fn)
+
+
+@lru_cache()
+def get_tracer() -> Tracer:
+    """Get the process-wide tracer (a no-op tracer when tracing is disabled)."""
+    if not settings.TRACING_ENABLED:
+        return Tracer()
+    tracer = Tracer(JsonLinesExporter(settings.TRACE_EXPORT_PATH, settings.TRACE_BUFFER_SIZE))
+    atexit.register(tracer.flush)
+    return tracer
+
+
+def percentile(values: Sequence[float], percent: float) -> float:
+    """Nearest-rank percentile of a sorted sequence."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, math.ceil(percent / 100 * len(values)) - 1))]
+
+
+def load_spans(path: str) -> List[Dict[str, Any]]:
+    """Read the spans written by ``JsonLinesExporter``."""
+    with open(path, encoding="utf-8") as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+def summarize(spans: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Compute per-stage latency percentiles.
+
+    Args:
+        spans: Span dictionaries
+
+    Returns:
+        One row per span name with count, errors, p50/p95/p99/mean/max (ms) and
+        the stage's share of total root-span (request) time, slowest stages first
+    """
+    durations: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    root_total = 0.0
+    for span in spans:
+        duration = span.get("duration_ms") or 0.0
+        durations[span["name"]].append(duration)
+        errors[span["name"]] += int(span.get("status") == "error")
+        if span.get("parent_id") is None:
+            root_total += duration
+
+    rows = []
+    for name, values in durations.items():
+        values.sort()
+        total = sum(values)
+        rows.append({
+            "name": name,
+            "count": len(values),
+            "errors": errors[name],
+            "p50_ms": percentile(values, 50),
+            "p95_ms": percentile(values, 95),
+            "p99_ms": percentile(values, 99),
+            "mean_ms": total / len(values),
+            "max_ms": values[-1],
+            "share": total / root_total if root_total else 0.0,
+        })
+    rows.sort(key=lambda row: row["p95_ms"], reverse=True)
+    return rows
+
+
+def main() -> None:
+    """Print per-stage latency percentiles from an exported trace file."""
+    parser = argparse.ArgumentParser(description="Summarize exported trace spans per stage.")
+    parser.add_argument("path", nargs="?", default=settings.TRACE_EXPORT_PATH, help="Span file (JSON Lines)")
+    parser.add_argument("--prefix", default="", help="Only include stages whose name starts with this")
+    args = parser.parse_args()
+
+    spans = load_spans(args.path)
+    rows = [row for row in summarize(spans) if row["name"].startswith(args.prefix)]
+    print(f"{len({span['request_id'] for span in spans})} requests, {len(spans)} spans")
+    print(f"{'stage':<32}{'count':>7}{'errors':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'mean ms':>10}{'share':>8}")
+    for row in rows:
+        print(
+            f"{row['name']:<32}{row['count']:>7}{row['errors']:>7}{row['p50_ms']:>10.2f}"
+            f"{row['p95_ms']:>10.2f}{row['p99_ms']:>10.2f}{row['mean_ms']:>10.2f}{row['share']:>8.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,105 @@
-from typing import Dict, Any, Optional
+import asyncio
+import concurrent.futures
+import json
+import logging
+import re
+from functools import partial
+from typing import Dict, Any, AsyncIterator, Callable, List, Optional, Tuple
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.messages import HumanMessage, SystemMessage
-from langchain_openai import AzureChatOpenAI
+from langchain_core.messages import BaseMessage, SystemMessage
 from src.config.settings import settings
 from src.core.agents.base_agent import BaseAgent
+from src.core.models.responses import parse_agent_response
+from src.core.services.batcher import MicroBatcher
 from src.core.services.database_service import DatabaseService
+from src.core.services.llm_cache import normalize_query
+from src.core.services.llm_client import get_llm_client, get_llm_registry
+from src.core.services.prompt_registry import get_prompt_registry
+from src.core.services.query_router import INVOICE_KEYWORDS, QueryRouter
+from src.core.services.resilience import LLMUnavailableError
+from src.core.services.session_store import SessionStore, get_session_store
+from src.core.services.singleflight import get_singleflight
+from src.core.services.tracing import get_tracer, wrap
+
+logger = logging.getLogger(__name__)
+
+# One "<number>: <label>" line per query in a batched classification reply
+BATCH_LABEL_PATTERN = re.compile(r"^\s*(\d+)\s*[:.)\-]\s*([A-Za-z]+)", re.MULTILINE)
+
+# "both" routes a mixed query to both agents and merges their answers
+FAN_OUT = "both"
+QUERY_TYPES = ("music", "invoice", FAN_OUT)
+QUERY_TYPE_PATTERN = re.compile(r"\b(" + "|".join(QUERY_TYPES) + r")\b")
+
+# Request keys carrying customer context the supervisor prefetched for the agents
+PREFETCH_KEYS = ("user_profile", "customer_info")
+# Prefetched context each route uses; the rest is cancelled
+ROUTE_CONTEXT = {
+    "music": ("user_profile",),
+    "invoice": ("customer_info",),
+    FAN_OUT: PREFETCH_KEYS,
+}
+# Request key carrying the token of a verified session
+SESSION_KEY = "session_token"
+
+
+def parse_query_type(text: str) -> str:
+    """
+    Extract the query type from a classifier reply.
+    
+    A chatty reply ("This is a music question.") still yields its label;
+    replies naming neither type are returned lower-cased as they are.
+    """
+    text = (text or "").strip().lower()
+    match = QUERY_TYPE_PATTERN.search(text)
+    return match.group(1) if match else text
+
+
+def fallback_query_type(query: str) -> str:
+    """Classify a query by keywords when the LLM classifier is unavailable."""
+    words = set(re.findall(r"[a-z]+", (query or "").lower()))
+    return "invoice" if words & INVOICE_KEYWORDS else "music"
+
+
+def branch_answer(result: Any) -> str:
+    """Get the text of one fan-out branch's result for the synthesis prompt."""
+    if not isinstance(result, dict):
+        return ""
+    return str(result.get("response") or result.get("error") or "")
+
+
+def format_batch_queries(queries: List[str]) -> str:
+    """
+    Render queries for the batched classifier, one numbered line each.
+    
+    Each query is collapsed to a single line and JSON-quoted, so newlines or
+    text like "2: invoice" inside one user's query cannot pose as another
+    entry of the list.
+    """
+    return "\n".join(
+        f"{number}. {json.dumps(' '.join(str(query).split()), ensure_ascii=False)}"
+        for number, query in enumerate(queries, start=1)
+    )
+
+
+def parse_batch_labels(text: str, count: int) -> List[Optional[str]]:
+    """
+    Parse a batched classification reply.
+    
+    Args:
+        text: Model reply with one "<number>: <label>" line per query
+        count: Number of queries in the batch
+        
+    Returns:
+        Lower-cased label per query (None where the reply has no label for it)
+    """
+    labels: List[Optional[str]] = [None] * count
+    for number, label in BATCH_LABEL_PATTERN.findall(text or ""):
+        index = int(number) - 1
+        if 0 <= index < count and labels[index] is None:
+            labels[index] = label.lower()
+    return labels
+
 
 class SupervisorAgent:
     def __init__(
@@ -12,6 +107,8 @@ class SupervisorAgent:
         music_agent: BaseAgent,
         invoice_agent: BaseAgent,
         llm: Optional[Any] = None,
+        router: Optional[QueryRouter] = None,
+        sessions: Optional[SessionStore] = None,
     ):
         """
         Initialize the supervisor agent.
@@ -19,68 +116,490 @@ class SupervisorAgent:
         Args:
             music_agent: Music catalog agent
             invoice_agent: Invoice information agent
-            llm: Language model instance (optional)
+            llm: Language model instance (optional, defaults to the shared client)
+            router: Local classifier tried before the LLM (optional; every query goes to the LLM without it)
+            sessions: Verified-session store (optional, defaults to the shared store)
         """
         self.music_agent = music_agent
         self.invoice_agent = invoice_agent
-        self.llm = llm or AzureChatOpenAI(
-            openai_api_key=settings.UOC_API_KEY,
-            azure_endpoint=settings.UOC_ENDPOINT,
-            deployment_name=settings.UOC_MODEL_NAME,
-            api_version=settings.UOC_API_VERSION
-        )
+        self.llm = llm or get_llm_client()
+        self.registry = get_llm_registry()
+        self.router = router
+        self.sessions = sessions if sessions is not None else get_session_store()
+        self.tracer = get_tracer()
+        self.prompts = get_prompt_registry()
+        self.singleflight = get_singleflight() if settings.SINGLEFLIGHT_ENABLED else None
+        self.classification_batcher = None
+        if settings.CLASSIFIER_BATCH_SIZE > 1:
+            self.classification_batcher = MicroBatcher(
+                self._aclassify_batch,
+                max_batch_size=settings.CLASSIFIER_BATCH_SIZE,
+                max_wait=settings.CLASSIFIER_BATCH_WAIT_MS / 1000,
+            )
+        # Runs speculative context lookups and the music branch of a fan-out off the caller's thread
+        self._executor = concurrent.futures.ThreadPoolExecutor(thread_name_prefix="supervisor")
+
+    def _query_type_messages(self, query: str) -> List[BaseMessage]:
+        """Build the messages for classifying a query."""
+        return self.prompts.get("classifier").format_messages(query=query)
+
+    def _route_locally(self, query: str) -> Optional[str]:
+        """Classify a query with the local router (None when it is not confident)."""
+        if self.router is None:
+            return None
+        decision = self.router.route(query)
+        self.tracer.current_span().set(router=decision.source, router_confidence=round(decision.confidence, 3))
+        return decision.label
 
     def _get_query_type(self, query: str) -> str:
         """
         Determine the type of query (music or invoice).
         
+        Confident local classifications skip the LLM call.
+        
         Args:
             query: User's query
             
         Returns:
             Type of query ('music' or 'invoice')
         """
-        prompt = ChatPromptTemplate.from_messages([
-            SystemMessage(content="""
-                You are a query classifier for a customer support system.
-                Classify each query as either 'music' or 'invoice' based on its content.
-                Music queries are about artists, albums, songs, or music preferences.
-                Invoice queries are about billing, purchases, or account information.
-            """),
-            HumanMessage(content="Query: {query}")
-        ])
+        query_type = self._route_locally(query)
+        if query_type is not None:
+            return query_type
+        
+        def classify():
+            response = self.registry.invoke(self.llm, self._query_type_messages(query))
+            return parse_query_type(response.content)
+        
+        try:
+            if self.singleflight is None:
+                return classify()
+            return self.singleflight.do("classifier", normalize_query(query), classify)
+        except LLMUnavailableError:
+            return fallback_query_type(query)
+
+    async def _aclassify_one(self, query: str) -> str:
+        """Classify a single query with its own LLM call."""
+        response = await self.registry.ainvoke(self.llm, self._query_type_messages(query))
+        return parse_query_type(response.content)
+
+    async def _aclassify_batch(self, queries: List[str]) -> List[str]:
+        """
+        Classify several queries with one LLM call.
+        
+        Queries the reply has no label for are classified individually.
+        
+        Args:
+            queries: Queries collected by the batcher
+            
+        Returns:
+            Query type per query, in order
+        """
+        if len(queries) == 1:
+            return [await self._aclassify_one(queries[0])]
+        
+        messages = self.prompts.get("classifier_batch").format_messages(queries=format_batch_queries(queries))
+        response = await self.registry.ainvoke(self.llm, messages)
+        labels = parse_batch_labels(response.content, len(queries))
+        
+        missing = [index for index, label in enumerate(labels) if label is None]
+        if missing:
+            retried = await asyncio.gather(*(self._aclassify_one(queries[index]) for index in missing))
+            for index, label in zip(missing, retried):
+                labels[index] = label
+        return labels
+
+    async def _aget_query_type(self, query: str) -> str:
+        """
+        Determine the type of query (music or invoice) without blocking the event loop.
+        
+        Confident local classifications skip the LLM call. Otherwise identical
+        concurrent queries share one classification, and distinct ones
+        arriving within the batch window are classified in one LLM call.
+        
+        Args:
+            query: User's query
+            
+        Returns:
+            Type of query ('music' or 'invoice')
+        """
+        query_type = self._route_locally(query)
+        if query_type is not None:
+            return query_type
+        
+        async def classify():
+            if self.classification_batcher is not None:
+                return await self.classification_batcher.submit(query)
+            return await self._aclassify_one(query)
+        
+        try:
+            if self.singleflight is None:
+                return await classify()
+            return await self.singleflight.ado("classifier", normalize_query(query), classify)
+        except LLMUnavailableError:
+            return fallback_query_type(query)
+
+    def _call_agent(self, name: str, agent: BaseAgent, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Run an agent in its own span."""
+        with self.tracer.span(f"agent.{name}"):
+            return agent.process_request(request)
+
+    async def _acall_agent(self, name: str, agent: BaseAgent, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Await an agent in its own span."""
+        with self.tracer.span(f"agent.{name}"):
+            return await agent.aprocess_request(request)
+
+    def _synthesis_messages(self, query: str, music_result: Dict[str, Any], invoice_result: Dict[str, Any]) -> List[BaseMessage]:
+        """Build the messages for merging the two branch answers."""
+        return self.prompts.get("synthesis").format_messages(
+            query=query,
+            music_answer=branch_answer(music_result),
+            invoice_answer=branch_answer(invoice_result),
+        )
+
+    def _merge(self, music_result: Dict[str, Any], invoice_result: Dict[str, Any], synthesis: Any) -> Dict[str, Any]:
+        """
+        Build the fan-out result from the branch results and the synthesis reply.
+        
+        Args:
+            music_result: Music agent result
+            invoice_result: Invoice agent result
+            synthesis: Synthesis LLM message, or the exception that prevented it
+            
+        Returns:
+            Merged result (both answers joined verbatim when synthesis failed)
+        """
+        result = {}
+        if not isinstance(synthesis, Exception):
+            try:
+                result = parse_agent_response("synthesis", synthesis.content)
+            except Exception as e:
+                synthesis = e
+        if isinstance(synthesis, Exception):
+            answers = [branch_answer(music_result), branch_answer(invoice_result)]
+            result = {"response": "\n\n".join(answer for answer in answers if answer), "degraded": True}
+        
+        if isinstance(music_result, dict) and "music_preferences" in music_result:
+            result["music_preferences"] = music_result["music_preferences"]
+        if isinstance(invoice_result, dict) and invoice_result.get("sensitive"):
+            result["sensitive"] = True
+        return result
+
+    def _output_kwargs(self) -> Dict[str, Any]:
+        """Request native JSON output for the synthesis step."""
+        return {"response_format": {"type": "json_object"}} if settings.LLM_JSON_MODE else {}
+
+    def _fan_out(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Answer a mixed query with both agents concurrently and merge the answers.
+        
+        Args:
+            request: Dictionary containing customer query and optional customer_id
+            
+        Returns:
+            Merged response
+        """
+        music_future = self._executor.submit(wrap(self._call_agent), "music", self.music_agent, request)
+        try:
+            invoice_result = self._call_agent("invoice", self.invoice_agent, request)
+        except Exception as e:
+            invoice_result = {"error": str(e)}
+        try:
+            music_result = music_future.result()
+        except Exception as e:
+            music_result = {"error": str(e)}
+        
+        try:
+            messages = self._synthesis_messages(request.get("query", ""), music_result, invoice_result)
+            with self.tracer.span("supervisor.synthesis"):
+                synthesis = self.registry.invoke(self.llm, messages, **self._output_kwargs())
+        except Exception as e:
+            synthesis = e
+        return self._merge(music_result, invoice_result, synthesis)
+
+    async def _afan_out_branches(self, request: Dict[str, Any]) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Run both agents concurrently, yielding each (agent, result) as it finishes."""
+        async def run(name: str, agent: BaseAgent) -> Tuple[str, Dict[str, Any]]:
+            try:
+                return name, await self._acall_agent(name, agent, request)
+            except Exception as e:
+                return name, {"error": str(e)}
+        
+        for branch in asyncio.as_completed([run("music", self.music_agent), run("invoice", self.invoice_agent)]):
+            yield await branch
+
+    async def _asynthesize(self, query: str, results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Merge the branch results with one synthesis LLM call."""
+        music_result, invoice_result = results.get("music", {}), results.get("invoice", {})
+        try:
+            messages = self._synthesis_messages(query, music_result, invoice_result)
+            with self.tracer.span("supervisor.synthesis"):
+                synthesis = await self.registry.ainvoke(self.llm, messages, **self._output_kwargs())
+        except Exception as e:
+            synthesis = e
+        return self._merge(music_result, invoice_result, synthesis)
+
+    async def _afan_out(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Answer a mixed query with both agents concurrently and merge the answers.
+        
+        Args:
+            request: Dictionary containing customer query and optional customer_id
+            
+        Returns:
+            Merged response
+        """
+        results = {name: result async for name, result in self._afan_out_branches(request)}
+        return await self._asynthesize(request.get("query", ""), results)
+
+    def _apply_session(self, request: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Resolve the request's session token to its verified customer.
+        
+        Args:
+            request: Original request
+            
+        Returns:
+            Request carrying the session's customer ID, and the context the
+            session already holds (both unchanged/empty without a live session)
+        """
+        if self.sessions is None:
+            return request, {}
+        session = self.sessions.get(request.get(SESSION_KEY))
+        if session is None:
+            return request, {}
+        return {**request, "customer_id": session.customer_id}, {"customer_info": session.customer_info}
+
+    def _prefetch_loaders(self, customer_id: Optional[str], known: Dict[str, Any]) -> Dict[str, Callable[[], Any]]:
+        """Get the lookups that can start before the query is classified (they only need the customer ID)."""
+        if not customer_id or not settings.PREFETCH_ENABLED:
+            return {}
+        loaders = {}
+        if hasattr(self.music_agent, "_get_user_profile"):
+            loaders["user_profile"] = partial(self._load_context, "user_profile", self.music_agent._get_user_profile, customer_id)
+        if hasattr(self.invoice_agent, "get_customer_info") and "customer_info" not in known:
+            loaders["customer_info"] = partial(self._load_context, "customer_info", self.invoice_agent.get_customer_info, customer_id)
+        return loaders
+
+    def _load_context(self, key: str, loader: Callable[[str], Any], customer_id: str) -> Any:
+        """Run one prefetch lookup in its own span."""
+        with self.tracer.span("supervisor.prefetch", key=key):
+            return loader(customer_id)
+
+    def _start_prefetch(self, customer_id: Optional[str], known: Dict[str, Any]) -> Dict[str, concurrent.futures.Future]:
+        """Start the customer context lookups not already in ``known`` on worker threads."""
+        return {key: self._executor.submit(wrap(loader)) for key, loader in self._prefetch_loaders(customer_id, known).items()}
+
+    def _start_aprefetch(self, customer_id: Optional[str], known: Dict[str, Any]) -> Dict[str, asyncio.Task]:
+        """Start the customer context lookups not already in ``known`` as tasks (database access runs in worker threads)."""
+        return {
+            key: asyncio.ensure_future(asyncio.to_thread(loader))
+            for key, loader in self._prefetch_loaders(customer_id, known).items()
+        }
+
+    def _cancel_prefetch(self, prefetch: Dict[str, Any]) -> None:
+        """Cancel prefetched lookups (futures or tasks) whose result is no longer needed."""
+        for pending in prefetch.values():
+            pending.cancel()
+
+    def _agent_request(self, request: Dict[str, Any], known: Dict[str, Any], wanted: Tuple[str, ...]) -> Dict[str, Any]:
+        """Copy a request without client-supplied context keys (which only the supervisor may set) or the session token."""
+        agent_request = {key: value for key, value in request.items() if key not in PREFETCH_KEYS and key != SESSION_KEY}
+        agent_request.update({key: value for key, value in known.items() if key in wanted})
+        return agent_request
+
+    def _use_prefetch(
+        self,
+        request: Dict[str, Any],
+        prefetch: Dict[str, concurrent.futures.Future],
+        query_type: str,
+        known: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """
+        Hand the prefetched context the chosen route needs to its agent and cancel the rest.
+        
+        Args:
+            request: Original request
+            prefetch: Lookups started by ``_start_prefetch``
+            query_type: Chosen route
+            known: Context taken from the verified session
+            
+        Returns:
+            Request for the agent (a failed lookup is left for the agent to retry)
+        """
+        wanted = ROUTE_CONTEXT.get(query_type, ())
+        agent_request = self._agent_request(request, known, wanted)
+        for key, future in prefetch.items():
+            if key not in wanted:
+                # Only cancels lookups that have not started; a running one is left to finish
+                future.cancel()
+                continue
+            try:
+                agent_request[key] = future.result()
+            except Exception as e:
+                logger.warning("Prefetching %s failed: %s", key, e)
+        return agent_request
 
-        response = self.llm.invoke(prompt.format_messages(query=query))
-        return response.content.lower()
+    async def _ause_prefetch(
+        self,
+        request: Dict[str, Any],
+        prefetch: Dict[str, asyncio.Task],
+        query_type: str,
+        known: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Await the prefetched context the chosen route needs and cancel the rest."""
+        wanted = ROUTE_CONTEXT.get(query_type, ())
+        agent_request = self._agent_request(request, known, wanted)
+        # Cancel first: awaiting a wanted lookup would let an unwanted one start
+        self._cancel_prefetch({key: task for key, task in prefetch.items() if key not in wanted})
+        for key, task in prefetch.items():
+            if key not in wanted:
+                continue
+            try:
+                agent_request[key] = await task
+            except Exception as e:
+                logger.warning("Prefetching %s failed: %s", key, e)
+        return agent_request
 
     def process_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """
         Process a customer support request.
         
+        The customer's profile and record are looked up while the query is
+        classified; the chosen agent receives the part it needs. A verified
+        session's customer record is used without a lookup.
+        
         Args:
-            request: Dictionary containing customer query and optional customer_id
+            request: Dictionary containing customer query and optional customer_id or session_token
             
         Returns:
-            Response from the appropriate agent
+            Response from the appropriate agent (both agents' merged answer for mixed queries)
         """
         # Extract request information
         query = request.get("query", "")
+        request, known = self._apply_session(request)
         customer_id = request.get("customer_id")
         
-        # Get query type
-        query_type = self._get_query_type(query)
+        # Get query type, prefetching customer context meanwhile
+        prefetch = self._start_prefetch(customer_id, known)
+        try:
+            with self.tracer.span("supervisor.route") as span:
+                query_type = self._get_query_type(query)
+                span.set(query_type=query_type)
+        except BaseException:
+            self._cancel_prefetch(prefetch)
+            raise
+        request = self._use_prefetch(request, prefetch, query_type, known)
         
         # Process request with appropriate agent
         if query_type == "music":
-            return self.music_agent.process_request(request)
+            return self._call_agent("music", self.music_agent, request)
         elif query_type == "invoice":
-            return self.invoice_agent.process_request(request)
+            return self._call_agent("invoice", self.invoice_agent, request)
+        elif query_type == FAN_OUT:
+            return self._fan_out(request)
         else:
             return {
                 "error": f"Unknown query type: {query_type}",
                 "suggestion": "Please rephrase your query to be more specific about music or billing information."
             }
 
+    async def aprocess_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Process a customer support request without blocking the event loop.
+        
+        Args:
+            request: Dictionary containing customer query and optional customer_id or session_token
+            
+        Returns:
+            Response from the appropriate agent (both agents' merged answer for mixed queries)
+        """
+        query = request.get("query", "")
+        request, known = self._apply_session(request)
+        
+        # Get query type, prefetching customer context meanwhile
+        prefetch = self._start_aprefetch(request.get("customer_id"), known)
+        try:
+            with self.tracer.span("supervisor.route") as span:
+                query_type = await self._aget_query_type(query)
+                span.set(query_type=query_type)
+        except BaseException:
+            self._cancel_prefetch(prefetch)
+            raise
+        request = await self._ause_prefetch(request, prefetch, query_type, known)
+        
+        # Process request with appropriate agent
+        if query_type == "music":
+            return await self._acall_agent("music", self.music_agent, request)
+        elif query_type == "invoice":
+            return await self._acall_agent("invoice", self.invoice_agent, request)
+        elif query_type == FAN_OUT:
+            return await self._afan_out(request)
+        else:
+            return {
+                "error": f"Unknown query type: {query_type}",
+                "suggestion": "Please rephrase your query to be more specific about music or billing information."
+            }
+
+    async def astream_request(self, request: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a customer support request as events.
+        
+        Emits a ``routing`` event once the query is classified, then the
+        selected agent's events (tool calls, LLM tokens and the final result).
+        Mixed queries emit a ``branch_result`` event per agent as it finishes,
+        then the merged result.
+        
+        Args:
+            request: Dictionary containing customer query and optional customer_id or session_token
+            
+        Yields:
+            Event dictionaries with ``event`` and ``data`` keys
+        """
+        query = request.get("query", "")
+        request, known = self._apply_session(request)
+        
+        prefetch = self._start_aprefetch(request.get("customer_id"), known)
+        try:
+            with self.tracer.span("supervisor.route") as span:
+                query_type = await self._aget_query_type(query)
+                span.set(query_type=query_type)
+        except BaseException:
+            self._cancel_prefetch(prefetch)
+            raise
+        try:
+            yield {"event": "routing", "data": {"query_type": query_type}}
+        except BaseException:
+            # The client went away before the agent started
+            self._cancel_prefetch(prefetch)
+            raise
+        request = await self._ause_prefetch(request, prefetch, query_type, known)
+        
+        if query_type == "music":
+            agent = self.music_agent
+        elif query_type == "invoice":
+            agent = self.invoice_agent
+        elif query_type == FAN_OUT:
+            results = {}
+            async for name, result in self._afan_out_branches(request):
+                results[name] = result
+                yield {"event": "branch_result", "data": {"agent": name, "result": result}}
+            yield {"event": "result", "data": await self._asynthesize(query, results)}
+            return
+        else:
+            yield {
+                "event": "result",
+                "data": {
+                    "error": f"Unknown query type: {query_type}",
+                    "suggestion": "Please rephrase your query to be more specific about music or billing information."
+                }
+            }
+            return
+        
+        with self.tracer.span(f"agent.{query_type}", streamed=True):
+            async for event in agent.astream_request(request):
+                yield event
+
     def get_prompt_template(self) -> ChatPromptTemplate:
         """
         Get the prompt template for the supervisor agent.
@@ -101,20 +620,52 @@ class SupervisorAgent:
             MessagesPlaceholder(variable_name="chat_history")
         ])
 
-    def handle_customer_verification(self, customer_id: str) -> Dict[str, Any]:
+    def handle_customer_verification(self, customer_id: Optional[str] = None, session_token: Optional[str] = None) -> Dict[str, Any]:
         """
         Handle customer verification process.
         
+        A successful verification starts a session; presenting its token on
+        later turns returns the verified record without database lookups.
+        
         Args:
-            customer_id: ID of the customer to verify
+            customer_id: ID, email address or phone number of the customer to verify
+            session_token: Token from an earlier verification (optional)
             
         Returns:
-            Verification status and customer information
+            Verification status, customer information and the session token
         """
+        # A live session covers the identifier it was verified with
+        session = self.sessions.get(session_token) if self.sessions is not None else None
+        if session is not None and (customer_id is None or session.matches(customer_id)):
+            return {
+                "verified": True,
+                "customer_info": session.customer_info,
+                "message": "Customer verified successfully.",
+                "customer_id": session.customer_id,
+                "session_token": session.token
+            }
+        if customer_id is None:
+            return {
+                "verified": False,
+                "message": "Session expired or invalid. Please verify again with your customer ID, email or phone number.",
+                "error": "InvalidSession"
+            }
+        identifier = customer_id
+        
         # Initialize database service if not exists
         if not hasattr(self, 'db_service'):
             self.db_service = DatabaseService()
         
+        # Resolve IDs, emails and phone numbers to a customer ID (in-process hash lookup)
+        resolved_id = self.db_service.resolve_customer_id(customer_id)
+        if resolved_id is None:
+            return {
+                "verified": False,
+                "message": "Customer not found. Please provide a valid customer ID, email or phone number.",
+                "error": "CustomerNotFound"
+            }
+        customer_id = str(resolved_id)
+        
         # Get customer info from database
         customer_info = self.db_service.get_customer_info(customer_id)
         
@@ -125,12 +676,27 @@ class SupervisorAgent:
                 "error": "CustomerNotFound"
             }
         
-        return {
+        result = {
             "verified": True,
             "customer_info": customer_info,
             "message": "Customer verified successfully.",
             "customer_id": customer_id
         }
+        if self.sessions is not None:
+            result["session_token"] = self.sessions.create(customer_id, customer_info, identifier).token
+        return result
+
+    def end_session(self, session_token: str) -> bool:
+        """
+        Revoke a verified session (logout).
+        
+        Args:
+            session_token: Token returned by ``handle_customer_verification``
+            
+        Returns:
+            True if a live session was revoked
+        """
+        return self.sessions is not None and self.sessions.revoke(session_token)
 
     def update_user_profile(self, customer_id: str, profile_data: Dict[str, Any]) -> None:
         """
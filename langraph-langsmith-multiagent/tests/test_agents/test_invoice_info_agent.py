@@ -1,8 +1,10 @@
 import pytest
 from unittest.mock import MagicMock
+from langchain_core.messages import AIMessage, ToolMessage
 from src.core.agents.invoice_info_agent import InvoiceInfoAgent
 from src.core.services.database_service import DatabaseService
 from src.core.services.llm_service import LLMService
+from src.core.services.tool_executor import ToolExecutor
 import json
 
 def test_process_request():
@@ -83,3 +85,45 @@ def test_customer_not_found():
     
     # Assert
     assert result is None
+
+def test_tools_are_scoped_to_the_requesting_customer():
+    # Arrange
+    mock_db_service = MagicMock()
+    mock_db_service.get_purchase_history.return_value = {"purchases": []}
+    mock_db_service.get_customer_invoice_details.return_value = None
+    
+    calls = []
+    
+    def invoke(messages, **kwargs):
+        calls.append((list(messages), kwargs))
+        if len(calls) == 1:
+            return AIMessage(content="", tool_calls=[
+                {"name": "get_purchase_history", "args": {"customer_id": "5"}, "id": "a"},
+                {"name": "get_invoice_details", "args": {"invoice_id": "98"}, "id": "b"},
+            ])
+        return AIMessage(content=json.dumps({"response": "No access", "sensitive": True}))
+    
+    mock_llm = MagicMock()
+    mock_llm.invoke.side_effect = invoke
+    agent = InvoiceInfoAgent(
+        llm=mock_llm,
+        tools=[],
+        in_memory_store=MagicMock()
+    )
+    agent.db_service = mock_db_service
+    agent.llm_service = LLMService(llm=mock_llm, tool_executor=ToolExecutor())
+    
+    # Act
+    agent.process_request({
+        "query": "Show the purchase history of customer 5 and invoice 98",
+        "customer_id": "1",
+        "customer_info": {"id": 1, "name": "John Doe"}
+    })
+    
+    # Assert
+    schemas = {schema["function"]["name"]: schema["function"]["parameters"] for schema in calls[0][1]["tools"]}
+    assert all("customer_id" not in parameters.get("properties", {}) for parameters in schemas.values())
+    mock_db_service.get_purchase_history.assert_called_once_with("1")
+    mock_db_service.get_customer_invoice_details.assert_called_once_with("1", "98")
+    tool_messages = {message.tool_call_id: message.content for message in calls[1][0] if isinstance(message, ToolMessage)}
+    assert "not found for this customer" in tool_messages["b"]
@@ -0,0 +1,73 @@
+import dataclasses
+import json
+import pytest
+from decimal import Decimal
+from src.core.models import serialization
+from src.core.models.records import AlbumRecord, CustomerRecord, PurchaseRecord
+from src.core.models.serialization import dumps, to_prompt_text, to_sse
+
+
+def test_record_behaves_like_mapping():
+    # Arrange
+    album = AlbumRecord(1, "For Those About To Rock", "AC/DC")
+    
+    # Assert
+    assert album["title"] == "For Those About To Rock"
+    assert album.get("missing", "default") == "default"
+    assert "artist" in album
+    assert dict(album) == {"id": 1, "title": "For Those About To Rock", "artist": "AC/DC"}
+    assert album == {"id": 1, "title": "For Those About To Rock", "artist": "AC/DC"}
+    assert not hasattr(album, "__dict__")
+
+def test_record_is_read_only():
+    # Arrange
+    customer = CustomerRecord(1, "Luis Goncalves", "luisg@embraer.com.br", None, None)
+    
+    # Act / Assert
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        customer.email = "someone@example.com"
+    assert customer["email"] == "luisg@embraer.com.br"
+
+def test_record_missing_key_raises():
+    # Arrange
+    customer = CustomerRecord(1, "Luis Goncalves", None, None, None)
+    
+    # Act / Assert
+    with pytest.raises(KeyError):
+        customer["address"]
+
+def test_dumps_serializes_nested_records():
+    # Arrange
+    result = {"purchases": [PurchaseRecord(1, "2024-01-01", Decimal("1.98"))]}
+    
+    # Act
+    payload = json.loads(dumps(result))
+    
+    # Assert
+    assert payload == {"purchases": [{"id": 1, "date": "2024-01-01", "total": 1.98}]}
+
+def test_dumps_without_orjson(monkeypatch):
+    # Arrange
+    monkeypatch.setattr(serialization, "orjson", None)
+    
+    # Act
+    payload = dumps({"albums": [AlbumRecord(1, "Ballad", "Artist")]})
+    
+    # Assert
+    assert json.loads(payload) == {"albums": [{"id": 1, "title": "Ballad", "artist": "Artist"}]}
+
+def test_to_prompt_text():
+    # Assert
+    assert to_prompt_text(None) == "{}"
+    assert to_prompt_text("already text") == "already text"
+    assert to_prompt_text({"genres": ["rock"]}) == '{"genres":["rock"]}'
+
+
+def test_to_sse_frames_event():
+    # Act
+    frame = to_sse("routing", {"query_type": "music"})
+
+    # Assert
+    assert frame.startswith(b"event: routing\ndata: ")
+    assert frame.endswith(b"\n\n")
+    assert json.loads(frame.split(b"data: ")[1]) == {"query_type": "music"}
@@ -0,0 +1,47 @@
+import sqlite3
+import pytest
+
+
+@pytest.fixture
+def chinook_db(tmp_path):
+    """Create a small on-disk Chinook-shaped SQLite database."""
+    db_path = tmp_path / "chinook.db"
+    connection = sqlite3.connect(db_path)
+    connection.executescript("""
+        CREATE TABLE Artist (ArtistId INTEGER PRIMARY KEY, Name TEXT);
+        CREATE TABLE Album (AlbumId INTEGER PRIMARY KEY, Title TEXT, ArtistId INTEGER);
+        CREATE TABLE Genre (GenreId INTEGER PRIMARY KEY, Name TEXT);
+        CREATE TABLE Track (
+            TrackId INTEGER PRIMARY KEY, Name TEXT, AlbumId INTEGER, GenreId INTEGER, PlayCount INTEGER
+        );
+        CREATE TABLE Customer (
+            CustomerId INTEGER PRIMARY KEY, FirstName TEXT, LastName TEXT, Email TEXT, Phone TEXT, Company TEXT
+        );
+        CREATE TABLE Invoice (
+            InvoiceId INTEGER PRIMARY KEY, CustomerId INTEGER, InvoiceDate TEXT, BillingAddress TEXT, Total NUMERIC
+        );
+        CREATE TABLE InvoiceLine (
+            InvoiceLineId INTEGER PRIMARY KEY, InvoiceId INTEGER, TrackId INTEGER, UnitPrice NUMERIC, Quantity INTEGER
+        );
+
+        INSERT INTO Artist VALUES (1, 'AC/DC'), (2, 'Accept'), (3, 'Aerosmith'), (4, 'Miles Davis');
+        INSERT INTO Album VALUES
+            (1, 'For Those About To Rock', 1), (2, 'Let There Be Rock', 1),
+            (3, 'Balls to the Wall', 2), (4, 'Big Ones', 3), (5, 'Kind of Blue', 4);
+        INSERT INTO Genre VALUES (1, 'Rock'), (2, 'Jazz'), (3, 'Metal');
+        INSERT INTO Track VALUES
+            (1, 'For Those About To Rock', 1, 1, 50), (2, 'Put The Finger On You', 1, 1, 20),
+            (3, 'Go Down', 2, 1, 70), (4, 'Balls to the Wall', 3, 3, 10),
+            (5, 'Walk On Water', 4, 1, 5), (6, 'So What', 5, 2, 99);
+        INSERT INTO Customer VALUES
+            (1, 'Luis', 'Goncalves', 'luisg@embraer.com.br', '+55 (12) 3923-5555', 'Embraer'),
+            (2, 'Leonie', 'Kohler', 'leonekohler@surfeu.de', '+49 0711 2842222', NULL);
+        INSERT INTO Invoice VALUES
+            (1, 1, '2024-01-01', 'Av. Brigadeiro', 1.98), (2, 1, '2024-02-01', 'Av. Brigadeiro', 0.99),
+            (3, 2, '2024-03-01', 'Stuttgart', 0.99);
+        INSERT INTO InvoiceLine VALUES
+            (1, 1, 1, 0.99, 1), (2, 1, 2, 0.99, 1), (3, 2, 3, 0.99, 1), (4, 3, 6, 0.99, 1);
+    """)
+    connection.commit()
+    connection.close()
+    return db_path
@@ -0,0 +1,66 @@
+import asyncio
+import pytest
+from src.core.services.batcher import MicroBatcher
+
+
+def test_batch_dispatched_when_full():
+    # Arrange
+    batches = []
+
+    async def process(items):
+        batches.append(list(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(process, max_batch_size=3, max_wait=10)
+
+    async def run():
+        return await asyncio.gather(*(batcher.submit(i) for i in range(3)))
+
+    # Act
+    results = asyncio.run(run())
+
+    # Assert
+    assert results == [0, 2, 4]
+    assert batches == [[0, 1, 2]]
+
+
+def test_partial_batch_dispatched_after_wait():
+    # Arrange
+    batches = []
+
+    async def process(items):
+        batches.append(list(items))
+        return items
+
+    batcher = MicroBatcher(process, max_batch_size=10, max_wait=0.001)
+
+    async def run():
+        first = await asyncio.gather(batcher.submit("a"), batcher.submit("b"))
+        second = await batcher.submit("c")
+        return first, second
+
+    # Act
+    first, second = asyncio.run(run())
+
+    # Assert
+    assert first == ["a", "b"]
+    assert second == "c"
+    assert batches == [["a", "b"], ["c"]]
+    assert batcher.stats()["mean_batch_size"] == 1.5
+
+
+def test_batch_failure_propagates_to_every_caller():
+    # Arrange
+    async def process(items):
+        raise RuntimeError("model unavailable")
+
+    batcher = MicroBatcher(process, max_batch_size=2, max_wait=0.001)
+
+    async def run():
+        return await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+
+    # Act
+    results = asyncio.run(run())
+
+    # Assert
+    assert all(isinstance(result, RuntimeError) for result in results)
@@ -0,0 +1,114 @@
+import pytest
+from unittest.mock import MagicMock
+from src.config.settings import settings
+from src.core.services.cache_service import ResultCache, _MISSING, cached
+from src.core.services.database_service import DatabaseService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_get_and_set_with_normalized_args():
+    # Arrange
+    cache = ResultCache(max_size=10, default_ttl=60)
+    cache.set("get_albums_by_artist", ("AC/DC",), {"albums": []})
+    
+    # Act
+    hit = cache.get("get_albums_by_artist", ("  ac/dc ",))
+    miss = cache.get("get_albums_by_artist", ("Accept",))
+    
+    # Assert
+    assert hit == {"albums": []}
+    assert miss is _MISSING
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+def test_entries_expire_per_method_ttl():
+    # Arrange
+    clock = FakeClock()
+    cache = ResultCache(ttls={"catalog": 100, "invoice": 5}, clock=clock)
+    cache.set("catalog", ("1",), "album")
+    cache.set("invoice", ("1",), "invoice")
+    
+    # Act
+    clock.now = 10
+    
+    # Assert
+    assert cache.get("catalog", ("1",)) == "album"
+    assert cache.get("invoice", ("1",)) is _MISSING
+
+def test_lru_eviction():
+    # Arrange
+    cache = ResultCache(max_size=2, default_ttl=60)
+    cache.set("m", ("a",), 1)
+    cache.set("m", ("b",), 2)
+    cache.get("m", ("a",))
+    
+    # Act
+    cache.set("m", ("c",), 3)
+    
+    # Assert
+    assert cache.get("m", ("b",)) is _MISSING
+    assert cache.get("m", ("a",)) == 1
+    assert cache.stats()["evictions"] == 1
+
+def test_cached_decorator_reads_through():
+    # Arrange
+    class Service:
+        def __init__(self):
+            self.cache = ResultCache(default_ttl=60)
+            self.backend = MagicMock(return_value=None)
+
+        @cached
+        def get_customer_info(self, customer_id):
+            return self.backend(customer_id)
+
+    service = Service()
+    
+    # Act
+    first = service.get_customer_info("999")
+    second = service.get_customer_info(customer_id="999")
+    
+    # Assert
+    assert first is None and second is None
+    service.backend.assert_called_once_with("999")
+
+def test_database_service_invalidate_customer(chinook_db, monkeypatch):
+    # Arrange
+    monkeypatch.setattr(settings, "DB_URL", f"sqlite:///{chinook_db}")
+    db_service = DatabaseService()
+    db_service.get_customer_info("1")
+    db_service.get_customer_info("1")
+    db_service.get_purchase_history("1")
+    
+    # Act
+    db_service.invalidate_customer("1")
+    db_service.get_customer_info("1")
+    
+    # Assert
+    stats = db_service.cache.stats()
+    assert stats["methods"]["get_customer_info"] == {"hits": 1, "misses": 2}
+    assert stats["size"] == 1
+
+def test_services_share_cache_and_get_private_copies(chinook_db, monkeypatch):
+    # Arrange
+    monkeypatch.setattr(settings, "DB_URL", f"sqlite:///{chinook_db}")
+    first = DatabaseService()
+    second = DatabaseService()
+    history = first.get_purchase_history("1")
+    history["purchases"].clear()
+    
+    # Act
+    cached_history = second.get_purchase_history("1")
+    first.invalidate_customer("1")
+    second.get_purchase_history("1")
+    
+    # Assert
+    assert first.cache is second.cache
+    assert len(cached_history["purchases"]) == 2
+    assert first.cache.stats()["methods"]["get_purchase_history"] == {"hits": 1, "misses": 2}
@@ -0,0 +1,99 @@
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from src.core.services.context_assembler import ContextAssembler, cap_lists, truncate_to_tokens
+from src.core.services.prompt_registry import PromptRegistry, PromptSpec
+
+
+def word_count(text):
+    return len(text.split())
+
+
+def _prompt():
+    registry = PromptRegistry([PromptSpec("music", "Answer music questions.", "Profile: {user_profile}\nQuery: {query}")])
+    return registry.get("music")
+
+
+def _history(turns):
+    history = []
+    for number in range(turns):
+        history.append(HumanMessage(content=f"question {number} about some artist and album"))
+        history.append(AIMessage(content=f"answer {number} with several words of detail here"))
+    return history
+
+
+def test_cap_lists_counts_dropped_items():
+    # Act
+    capped, dropped = cap_lists({"albums": list(range(5)), "nested": [{"tracks": list(range(4))}]}, 3)
+
+    # Assert
+    assert capped == {"albums": [0, 1, 2], "nested": [{"tracks": [0, 1, 2]}]}
+    assert dropped == 3
+
+
+def test_truncate_to_tokens_keeps_start():
+    # Act
+    text = truncate_to_tokens("one two three four five six seven eight", 5, word_count)
+
+    # Assert
+    assert text.startswith("one two")
+    assert word_count(text) <= 5
+
+
+def test_small_context_is_untouched():
+    # Arrange
+    assembler = ContextAssembler(default_budget=1000, counter=word_count)
+    history = _history(2)
+
+    # Act
+    assembled = assembler.assemble("music", _prompt(), "AC/DC albums", {"user_profile": {"genres": ["rock"]}}, history)
+
+    # Assert
+    assert assembled.history == history
+    assert not assembled.report.trimmed
+    assert assembled.messages[-1].content.endswith("Query: AC/DC albums")
+
+
+def test_oldest_turns_dropped_and_summarized():
+    # Arrange
+    assembler = ContextAssembler(default_budget=120, summary_tokens=30, counter=word_count)
+    history = _history(10)
+
+    # Act
+    assembled = assembler.assemble("music", _prompt(), "AC/DC albums", {"user_profile": {}}, history)
+
+    # Assert
+    report = assembled.report
+    assert report.history_messages_dropped > 0
+    assert report.summarized
+    assert isinstance(assembled.history[0], SystemMessage)
+    assert "question 0" in assembled.history[0].content
+    assert assembled.history[-1] == history[-1]
+    assert report.prompt_tokens <= 120
+    assert assembler.stats()["music"]["trimmed_requests"] == 1
+
+
+def test_large_tool_results_are_capped_to_budget():
+    # Arrange
+    assembler = ContextAssembler(default_budget=60, max_list_items=20, counter=word_count)
+    profile = {"artists": [f"artist number {i}" for i in range(50)]}
+
+    # Act
+    assembled = assembler.assemble("music", _prompt(), "AC/DC albums", {"user_profile": profile}, None)
+
+    # Assert
+    assert assembled.report.list_items_dropped >= 30
+    assert "more items omitted" in assembled.fields["user_profile"]
+    assert assembled.report.prompt_tokens <= 60
+
+
+def test_dict_history_is_accepted():
+    # Arrange
+    assembler = ContextAssembler(default_budget=1000, counter=word_count)
+
+    # Act
+    assembled = assembler.assemble(
+        "music", _prompt(), "and their first album?", {"user_profile": {}},
+        [{"role": "user", "content": "Who is AC/DC?"}, {"role": "assistant", "content": "A rock band."}],
+    )
+
+    # Assert
+    assert [message.type for message in assembled.history] == ["human", "ai"]
@@ -0,0 +1,60 @@
+import sqlite3
+import pytest
+from src.config.settings import settings
+from src.core.services.customer_directory import classify_identifier, normalize_phone
+from src.core.services.database_service import DatabaseService
+
+
+@pytest.fixture
+def db_service(chinook_db, monkeypatch):
+    monkeypatch.setattr(settings, "DB_URL", f"sqlite:///{chinook_db}")
+    return DatabaseService()
+
+
+def test_classify_identifier():
+    # Assert
+    assert classify_identifier("42") == ("id", "42")
+    assert classify_identifier(" LuisG@Embraer.com.br ") == ("email", "luisg@embraer.com.br")
+    assert classify_identifier("+55 (12) 3923-5555") == ("phone", "+551239235555")
+    assert classify_identifier("hello") == ("unknown", None)
+    assert normalize_phone("0711-2842222") == "07112842222"
+
+def test_resolve_customer_id(db_service):
+    # Act / Assert
+    assert db_service.resolve_customer_id("1") == 1
+    assert db_service.resolve_customer_id("999") is None
+    assert db_service.resolve_customer_id("LUISG@embraer.com.br") == 1
+    assert db_service.resolve_customer_id("+55 12 3923 5555") == 1
+    assert db_service.resolve_customer_id("+49 0711 2842222") == 2
+    assert db_service.resolve_customer_id("nobody@example.com") is None
+
+def test_resolve_unformatted_phone_number(db_service):
+    # Act / Assert
+    assert db_service.resolve_customer_id("551239235555") == 1
+    assert db_service.resolve_customer_id("4907112842222") == 2
+    assert db_service.resolve_customer_id("5551234567") is None
+
+def test_resolve_creates_indexes(db_service, chinook_db):
+    # Act
+    db_service.resolve_customer_id("1")
+    
+    # Assert
+    connection = sqlite3.connect(chinook_db)
+    indexes = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    connection.close()
+    assert {"idx_customer_email", "idx_customer_phone"} <= indexes
+
+def test_directory_refreshes_on_change(db_service, chinook_db):
+    # Arrange
+    db_service.resolve_customer_id("1")
+    connection = sqlite3.connect(chinook_db)
+    connection.execute("INSERT INTO Customer VALUES (3, 'New', 'Customer', 'new@example.com', '+1 555 0100', NULL)")
+    connection.commit()
+    connection.close()
+    
+    # Act
+    result = db_service.resolve_customer_id("new@example.com")
+    
+    # Assert
+    assert result == 3
+    assert db_service.customer_directory.version == 1
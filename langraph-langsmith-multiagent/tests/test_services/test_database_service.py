@@ -84,3 +84,20 @@ def test_get_purchase_history():
     assert "purchases" in result
     assert len(result["purchases"]) == 2
     assert result["purchases"][0]["total"] == 100.0
+
+def test_engine_uses_bounded_pool_and_sqlite_pragmas(chinook_db, monkeypatch):
+    # Arrange
+    monkeypatch.setattr(settings, "DB_URL", f"sqlite:///{chinook_db}")
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 3)
+    db_service = DatabaseService()
+    
+    # Act
+    with db_service.engine.connect() as connection:
+        journal_mode = connection.exec_driver_sql("PRAGMA journal_mode").scalar()
+        busy_timeout = connection.exec_driver_sql("PRAGMA busy_timeout").scalar()
+    
+    # Assert
+    assert db_service.engine.pool.size() == 3
+    assert journal_mode == "wal"
+    assert busy_timeout > 0
+    db_service.close()
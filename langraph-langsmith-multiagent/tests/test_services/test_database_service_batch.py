@@ -0,0 +1,61 @@
+import pytest
+from src.config.settings import settings
+from src.core.services.database_service import DatabaseService
+
+
+@pytest.fixture
+def db_service(chinook_db, monkeypatch):
+    monkeypatch.setattr(settings, "DB_URL", f"sqlite:///{chinook_db}")
+    return DatabaseService()
+
+
+def test_get_customer_info_many(db_service):
+    # Act
+    result = db_service.get_customer_info_many(["1", "2", "999"])
+    
+    # Assert
+    assert result["1"]["name"] == "Luis Goncalves"
+    assert result["2"]["email"] == "leonekohler@surfeu.de"
+    assert result["999"] is None
+
+def test_get_invoice_details_many(db_service):
+    # Act
+    result = db_service.get_invoice_details_many([1, 3])
+    
+    # Assert
+    assert result[1]["total"] == 1.98
+    assert result[3]["address"] == "Stuttgart"
+
+def test_get_purchase_history_many_matches_single_lookups(db_service):
+    # Arrange
+    expected = {customer_id: db_service.get_purchase_history(customer_id) for customer_id in ("1", "2", "3")}
+    db_service.cache.clear()
+    
+    # Act
+    result = db_service.get_purchase_history_many(["1", "2", "3"])
+    
+    # Assert
+    assert result == expected
+    assert result["3"] == {"purchases": []}
+
+def test_batch_shares_single_lookup_cache(db_service):
+    # Arrange
+    db_service.get_customer_info_many(["1", "2"])
+    
+    # Act
+    result = db_service.get_customer_info("2")
+    
+    # Assert
+    assert result["name"] == "Leonie Kohler"
+    assert db_service.cache.stats()["methods"]["get_customer_info"]["hits"] == 1
+
+def test_batch_ids_are_matched_as_integers(db_service):
+    # Act
+    result = db_service.get_customer_info_many(["01", " 2 ", 1])
+    
+    # Assert
+    assert result["01"]["name"] == "Luis Goncalves"
+    assert result[" 2 "]["name"] == "Leonie Kohler"
+    assert result[1] == result["01"]
+    with pytest.raises(ValueError):
+        db_service.get_purchase_history_many(["1", "abc"])
@@ -0,0 +1,43 @@
+import pytest
+from src.config.settings import settings
+from src.core.services.database_service import DatabaseService
+
+
+@pytest.fixture
+def db_service(chinook_db, monkeypatch):
+    monkeypatch.setattr(settings, "DB_URL", f"sqlite:///{chinook_db}")
+    return DatabaseService()
+
+
+def test_get_albums_by_artist_keyset_pages(db_service):
+    # Act
+    first = db_service.get_albums_by_artist("a", limit=2)
+    second = db_service.get_albums_by_artist("a", after_id=first["next_after_id"], limit=2)
+    last = db_service.get_albums_by_artist("a", after_id=second["next_after_id"], limit=2)
+    
+    # Assert
+    assert [album["id"] for album in first["albums"]] == [1, 2]
+    assert [album["id"] for album in second["albums"]] == [3, 4]
+    assert [album["id"] for album in last["albums"]] == [5]
+    assert last["next_after_id"] is None
+
+def test_unpaginated_call_keeps_result_shape(db_service):
+    # Act
+    result = db_service.get_artist_by_genre("rock")
+    
+    # Assert
+    assert result == {"artists": [{"id": 1, "name": "AC/DC"}, {"id": 3, "name": "Aerosmith"}]}
+
+def test_iter_albums_by_artist_streams_all_rows(db_service):
+    # Act
+    albums = list(db_service.iter_albums_by_artist("a", batch_size=2))
+    
+    # Assert
+    assert [album["id"] for album in albums] == [1, 2, 3, 4, 5]
+
+def test_iter_artist_by_genre_after_id(db_service):
+    # Act
+    artists = list(db_service.iter_artist_by_genre("rock", after_id=1))
+    
+    # Assert
+    assert artists == [{"id": 3, "name": "Aerosmith"}]
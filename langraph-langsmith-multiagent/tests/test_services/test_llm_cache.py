@@ -0,0 +1,113 @@
+import json
+from unittest.mock import MagicMock
+from langchain_core.tools import Tool
+from src.core.models.responses import parse_agent_response
+from src.core.services.cache_service import _MISSING
+from src.core.services.llm_cache import LLMResponseCache, normalize_query
+from src.core.services.llm_service import LLMService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _key(query, context=None):
+    return LLMResponseCache.make_key("gpt", "music:abc", query, context)
+
+
+def test_normalized_queries_share_a_key():
+    # Act
+    first = _key("What albums does AC/DC have?")
+    second = _key("  what albums   does ac/dc HAVE ")
+    other_context = _key("What albums does AC/DC have?", {"genres": ["rock"]})
+
+    # Assert
+    assert normalize_query("Hi there?!") == "hi there"
+    assert first == second
+    assert first != other_context
+
+
+def test_entries_expire_per_agent_ttl():
+    # Arrange
+    clock = FakeClock()
+    cache = LLMResponseCache(ttls={"music": 100, "invoice": 5}, clock=clock)
+    cache.set("music", "k1", "albums")
+    cache.set("invoice", "k2", json.dumps({"response": "total", "sensitive": False}))
+
+    # Act
+    clock.now += 10
+
+    # Assert
+    assert cache.get("music", "k1") == "albums"
+    assert cache.get("invoice", "k2") is _MISSING
+
+
+def test_sensitive_and_error_answers_bypass_cache():
+    # Arrange
+    cache = LLMResponseCache(ttls={"music": 100, "invoice": 100})
+
+    # Act
+    sensitive = cache.set("invoice", "k1", json.dumps({"response": "card ending 1234", "sensitive": True}))
+    unparsable = cache.set("invoice", "k2", "Your invoice total is 3.96")
+    error = cache.set("music", "k3", {"error": "boom"})
+
+    # Assert
+    assert (sensitive, unparsable, error) == (False, False, False)
+    assert cache.stats()["bypassed"] == 3
+    assert cache.get("invoice", "k1") is _MISSING
+
+def test_invoice_answers_without_sensitive_flag_bypass_cache():
+    # Arrange
+    cache = LLMResponseCache(ttls={"invoice": 100})
+    parsed = parse_agent_response("invoice", '{"response": "Your total is 3.96"}')
+
+    # Act
+    missing = cache.set("invoice", "k1", parsed)
+    unset = cache.set("invoice", "k2", {"response": "Your total is 3.96", "sensitive": None})
+    cleared = cache.set("invoice", "k3", {"response": "Your total is 3.96", "sensitive": False})
+
+    # Assert
+    assert "sensitive" not in parsed
+    assert (missing, unset, cleared) == (False, False, True)
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    # Arrange
+    path = str(tmp_path / "llm_cache.db")
+    clock = FakeClock()
+    cache = LLMResponseCache(ttls={"music": 100}, path=path, clock=clock)
+    cache.set("music", "k1", {"response": "Back in Black"})
+    cache.close()
+
+    # Act
+    restarted = LLMResponseCache(ttls={"music": 100}, path=path, clock=clock)
+    value = restarted.get("music", "k1")
+    clock.now += 200
+    expired = LLMResponseCache(ttls={"music": 100}, path=path, clock=clock)
+
+    # Assert
+    assert value == {"response": "Back in Black"}
+    assert restarted.stats()["disk_hits"] == 1
+    assert expired.get("music", "k1") is _MISSING
+
+
+def test_llm_service_serves_repeated_query_from_cache():
+    # Arrange
+    mock_llm = MagicMock()
+    mock_llm.invoke.return_value.content = json.dumps({"response": "AC/DC albums"})
+    cache = LLMResponseCache(ttls={"music": 100})
+    llm_service = LLMService(llm=mock_llm, cache=cache)
+    tools = [Tool(name="get_albums_by_artist", description="Get albums by artist", func=lambda x: x)]
+
+    # Act
+    first = llm_service.process_music_query("What albums does AC/DC have?", {}, tools)
+    second = llm_service.process_music_query("what albums does ac/dc have", {}, tools)
+
+    # Assert
+    assert first == second
+    mock_llm.invoke.assert_called_once()
+    assert cache.stats()["hits"] == 1
@@ -0,0 +1,68 @@
+import asyncio
+from unittest.mock import MagicMock
+from src.core.services.llm_client import LLMClientRegistry
+
+
+def test_registry_returns_shared_instance():
+    # Arrange
+    factory = MagicMock(side_effect=lambda: object())
+    registry = LLMClientRegistry(factories={"default": factory})
+
+    # Act
+    first = registry.get()
+    second = registry.get()
+
+    # Assert
+    assert first is second
+    factory.assert_called_once()
+
+
+def test_register_replaces_client():
+    # Arrange
+    registry = LLMClientRegistry(factories={"default": lambda: "old"})
+    registry.get()
+
+    # Act
+    registry.register("default", lambda: "new")
+
+    # Assert
+    assert registry.get() == "new"
+
+
+def test_invoke_delegates_to_client():
+    # Arrange
+    registry = LLMClientRegistry(factories={"default": MagicMock})
+    llm = MagicMock()
+    llm.invoke.return_value = "response"
+
+    # Act
+    result = registry.invoke(llm, ["message"])
+
+    # Assert
+    assert result == "response"
+    llm.invoke.assert_called_once_with(["message"])
+
+
+def test_ainvoke_respects_concurrency_limit():
+    # Arrange
+    registry = LLMClientRegistry(max_concurrency=2, factories={"default": MagicMock})
+    state = {"active": 0, "peak": 0}
+
+    class SlowClient:
+        async def ainvoke(self, messages):
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+            await asyncio.sleep(0.01)
+            state["active"] -= 1
+            return messages
+
+    async def run():
+        client = SlowClient()
+        return await asyncio.gather(*(registry.ainvoke(client, i) for i in range(6)))
+
+    # Act
+    results = asyncio.run(run())
+
+    # Assert
+    assert results == list(range(6))
+    assert state["peak"] == 2
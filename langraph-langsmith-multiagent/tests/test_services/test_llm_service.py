@@ -5,6 +5,8 @@ from langchain_core.tools import Tool
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.messages import HumanMessage, SystemMessage
 import json
+import asyncio
+from langchain_core.messages import AIMessageChunk
 
 def test_process_music_query():
     # Arrange
@@ -66,3 +68,60 @@ def test_process_music_query_error_handling():
     # Assert
     assert "error" in result
     assert "Error processing query" in result["error"]
+
+class StreamingLLM:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.calls = 0
+
+    async def astream(self, messages, **kwargs):
+        self.calls += 1
+        for chunk in self.chunks:
+            yield AIMessageChunk(content=chunk)
+
+async def _collect(stream):
+    return [event async for event in stream]
+
+def test_astream_music_query_yields_tokens_then_result():
+    # Arrange
+    llm = StreamingLLM(['{"response": ', '"Back in Black"}'])
+    llm_service = LLMService(llm=llm)
+    
+    # Act
+    events = asyncio.run(_collect(llm_service.astream_music_query("AC/DC albums?", {}, [])))
+    
+    # Assert
+    assert [event["event"] for event in events] == ["token", "token", "result"]
+    assert events[-1]["data"] == {"response": "Back in Black"}
+
+def test_process_music_query_drops_invalid_preferences():
+    # Arrange
+    mock_llm = MagicMock()
+    mock_llm.invoke.return_value.content = json.dumps({
+        "response": "Noted",
+        "music_preferences": {"genres": ["Rock", " rock ", "", 3], "artists": "AC/DC"}
+    })
+    
+    llm_service = LLMService()
+    llm_service.llm = mock_llm
+    
+    # Act
+    result = llm_service.process_music_query("I love AC/DC", {}, [])
+    
+    # Assert
+    assert result["music_preferences"] == {"genres": ["Rock"], "artists": ["AC/DC"]}
+    assert mock_llm.invoke.call_args.kwargs["response_format"] == {"type": "json_object"}
+
+def test_process_music_query_without_preferences_omits_key():
+    # Arrange
+    mock_llm = MagicMock()
+    mock_llm.invoke.return_value.content = json.dumps({"response": "Here you go", "music_preferences": {"genres": [], "artists": []}})
+    
+    llm_service = LLMService()
+    llm_service.llm = mock_llm
+    
+    # Act
+    result = llm_service.process_music_query("AC/DC albums", {}, [])
+    
+    # Assert
+    assert result == {"response": "Here you go"}
@@ -0,0 +1,76 @@
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.tools import Tool
+from src.core.services.prompt_registry import PromptRegistry, PromptSpec, count_tokens
+
+
+def _tool(name):
+    return Tool(name=name, description=f"Run {name}", func=lambda x: x)
+
+
+def test_prompts_compiled_once():
+    # Arrange
+    registry = PromptRegistry()
+
+    # Act
+    first = registry.get("music")
+    second = registry.get("music")
+
+    # Assert
+    assert first is second
+    assert set(registry.stats()) == {"music", "invoice", "classifier", "classifier_batch", "synthesis"}
+
+
+def test_static_prefix_is_identical_across_calls():
+    # Arrange
+    prompt = PromptRegistry().get("invoice")
+
+    # Act
+    first = prompt.format_messages(query="Total?", customer_info='{"id": 1}')
+    second = prompt.format_messages(query="Address?", customer_info='{"id": 2}')
+
+    # Assert
+    assert isinstance(first[0], SystemMessage)
+    assert first[0].content == second[0].content == prompt.system_text
+    assert '"sensitive": boolean' in prompt.system_text
+    assert isinstance(first[-1], HumanMessage)
+    assert first[-1].content.endswith("User query: Total?")
+
+
+def test_chat_history_goes_between_prefix_and_query():
+    # Arrange
+    prompt = PromptRegistry().get("classifier")
+    history = [HumanMessage(content="hi"), AIMessage(content="hello")]
+
+    # Act
+    messages = prompt.format_messages(chat_history=history, query="Albums by AC/DC")
+
+    # Assert
+    assert messages[1:3] == history
+    assert messages[-1].content == "Query: Albums by AC/DC"
+
+
+def test_tool_section_independent_of_tool_order():
+    # Arrange
+    registry = PromptRegistry()
+    tools = [_tool("get_top_tracks"), _tool("get_albums_by_artist")]
+
+    # Act
+    forward = registry.get("music", tools)
+    backward = registry.get("music", list(reversed(tools)))
+
+    # Assert
+    assert forward is backward
+    assert forward.system_text.index("get_albums_by_artist") < forward.system_text.index("get_top_tracks")
+    assert "music[get_albums_by_artist,get_top_tracks]" in registry.stats()
+
+
+def test_stats_report_prefix_tokens():
+    # Arrange
+    registry = PromptRegistry([PromptSpec("echo", "Repeat the input.", "{query}")])
+
+    # Act
+    stats = registry.stats()
+
+    # Assert
+    assert stats["echo"]["prefix_tokens"] == count_tokens("Repeat the input.")
+    assert stats["echo"]["prefix_tokens"] > 0
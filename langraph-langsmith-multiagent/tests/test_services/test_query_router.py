@@ -0,0 +1,83 @@
+import timeit
+import pytest
+from src.core.services.query_router import (
+    KeywordRules,
+    QueryRouter,
+    TfidfLogisticModel,
+    evaluate,
+    load_labeled_queries,
+    split_holdout,
+)
+
+TRAINING = [
+    ("What albums does AC/DC have?", "music"),
+    ("Recommend some rock bands", "music"),
+    ("Songs by Queen please", "music"),
+    ("Who sings Smells Like Teen Spirit?", "music"),
+    ("Show me my last invoice", "invoice"),
+    ("How much did I spend last month?", "invoice"),
+    ("Why was I charged twice?", "invoice"),
+    ("What do I owe?", "invoice"),
+]
+
+
+def test_keyword_rules_route_unambiguous_queries_only():
+    # Arrange
+    rules = KeywordRules()
+
+    # Act / Assert
+    assert rules.classify("Top tracks by Metallica") == "music"
+    assert rules.classify("Refund my order") == "invoice"
+    assert rules.classify("Which invoice has the Metallica album?") is None
+    assert rules.classify("Hello there") is None
+    assert rules.classify("How much did I pay for it?") == "invoice"
+    assert rules.classify("Who sings Thunderstruck and how much did I pay for it") is None
+    assert rules.classify("Top tracks by Metallica? Any jazz?") is None
+
+
+def test_model_learns_labels_and_round_trips(tmp_path):
+    # Arrange
+    model = TfidfLogisticModel.fit(*zip(*TRAINING))
+    path = str(tmp_path / "router.json")
+
+    # Act
+    model.save(path)
+    loaded = TfidfLogisticModel.load(path)
+
+    # Assert
+    assert model.predict("How much did I spend?")[0] == "invoice"
+    assert model.predict("Who sings Back in Black?")[0] == "music"
+    assert loaded.predict_proba("What do I owe?") == model.predict_proba("What do I owe?")
+    assert sum(model.predict_proba("unseen words only").values()) == pytest.approx(1.0)
+
+
+def test_router_defers_to_llm_below_threshold():
+    # Arrange
+    router = QueryRouter(TfidfLogisticModel.fit(*zip(*TRAINING)), threshold=0.99)
+
+    # Act
+    by_rules = router.route("Show me my billing history")
+    deferred = router.route("Anything new?")
+
+    # Assert
+    assert (by_rules.label, by_rules.source) == ("invoice", "rules")
+    assert deferred.label is None
+    assert 0.5 <= deferred.confidence < 0.99
+    assert router.stats()["llm_fallbacks"] == 1
+
+
+def test_shipped_queries_route_accurately_and_fast():
+    # Arrange
+    examples = load_labeled_queries("data/router_queries.jsonl")
+    train, held_out = split_holdout(examples, 0.2)
+    router = QueryRouter(TfidfLogisticModel.fit(*zip(*train)), threshold=0.8)
+
+    # Act
+    report = evaluate(router, held_out)
+    seconds = timeit.timeit(lambda: router.route("Anything by the Beatles?"), number=1000) / 1000
+
+    # Assert
+    assert len(held_out) == 28
+    assert report["coverage"] >= 0.7
+    assert report["local_accuracy"] >= 0.9
+    assert seconds < 0.001
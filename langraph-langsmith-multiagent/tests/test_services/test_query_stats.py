@@ -0,0 +1,56 @@
+import pytest
+from src.config.settings import settings
+from src.core.services.database_service import DatabaseService
+from src.core.services.query_stats import QueryStats
+
+
+def test_record_builds_histogram():
+    # Arrange
+    stats = QueryStats(slow_query_ms=None)
+    
+    # Act
+    for elapsed in (0.001, 0.002, 0.003, 0.2):
+        stats.record("get_customer_info", elapsed, rows=1)
+    
+    # Assert
+    result = stats.stats()["get_customer_info"]
+    assert result["count"] == 4
+    assert result["rows"] == 4
+    assert result["max_ms"] == pytest.approx(200)
+    assert result["p50_ms"] == 2
+    assert result["p99_ms"] == 250
+    assert stats.slow_queries() == []
+
+def test_slow_query_captures_plan():
+    # Arrange
+    stats = QueryStats(slow_query_ms=50)
+    
+    # Act
+    stats.record("get_top_tracks", 0.01, rows=10, explain=lambda: ["never called"])
+    stats.record("get_top_tracks", 0.5, rows=10, explain=lambda: ["SCAN Track"])
+    
+    # Assert
+    slow = stats.slow_queries()
+    assert len(slow) == 1
+    assert slow[0]["method"] == "get_top_tracks"
+    assert slow[0]["plan"] == ["SCAN Track"]
+
+def test_database_service_records_queries(chinook_db, monkeypatch):
+    # Arrange
+    monkeypatch.setattr(settings, "DB_URL", f"sqlite:///{chinook_db}")
+    stats = QueryStats(slow_query_ms=0)
+    db_service = DatabaseService(stats=stats)
+    
+    # Act
+    db_service.get_albums_by_artist("ac/dc")
+    db_service.get_albums_by_artist("ac/dc")
+    db_service.get_customer_info_many(["1", "2"])
+    
+    # Assert
+    result = db_service.get_query_stats()
+    assert result["methods"]["get_albums_by_artist"]["count"] == 1
+    assert result["methods"]["get_albums_by_artist"]["rows"] == 2
+    assert result["methods"]["get_customer_info_many"]["rows"] == 2
+    plans = {entry["method"]: entry["plan"] for entry in result["slow_queries"]}
+    assert any("Album" in line for line in plans["get_albums_by_artist"])
+    assert any("Customer" in line for line in plans["get_customer_info_many"])
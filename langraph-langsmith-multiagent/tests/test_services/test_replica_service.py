@@ -0,0 +1,94 @@
+import gc
+import os
+import sqlite3
+import pytest
+import weakref
+from sqlalchemy import text
+from src.config.settings import settings
+from src.core.services.database_service import DatabaseService
+from src.core.services.replica_service import MemoryReplica
+
+
+def _rename_artist(db_path, name):
+    connection = sqlite3.connect(db_path)
+    connection.execute("UPDATE Artist SET Name = ? WHERE ArtistId = 1", (name,))
+    connection.commit()
+    connection.close()
+
+
+def test_replica_serves_copy_until_refresh(chinook_db):
+    # Arrange
+    replica = MemoryReplica(str(chinook_db), refresh_interval=0).start()
+    _rename_artist(chinook_db, "AC-DC")
+    
+    # Act
+    with replica.session() as session:
+        before = session.execute(text("SELECT Name FROM Artist WHERE ArtistId = 1")).scalar()
+    replica.refresh()
+    with replica.session() as session:
+        after = session.execute(text("SELECT Name FROM Artist WHERE ArtistId = 1")).scalar()
+    replica.close()
+    
+    # Assert
+    assert before == "AC/DC"
+    assert after == "AC-DC"
+
+def test_refresh_if_changed(chinook_db):
+    # Arrange
+    replica = MemoryReplica(str(chinook_db), refresh_interval=0).start()
+    
+    # Act
+    unchanged = replica.refresh_if_changed()
+    _rename_artist(chinook_db, "AC-DC")
+    os.utime(chinook_db, (0, os.path.getmtime(chinook_db) + 1))
+    changed = replica.refresh_if_changed()
+    replica.close()
+    
+    # Assert
+    assert unchanged is False
+    assert changed is True
+    assert replica.refresh_count == 2
+
+def test_database_service_reads_catalog_from_replica(chinook_db, monkeypatch):
+    # Arrange
+    replica = MemoryReplica(str(chinook_db), refresh_interval=0).start()
+    monkeypatch.setattr(settings, "DB_URL", f"sqlite:///{chinook_db}")
+    monkeypatch.setattr(settings, "DB_MODE", "memory_replica")
+    monkeypatch.setattr("src.core.services.database_service.get_memory_replica", lambda: replica)
+    db_service = DatabaseService()
+    _rename_artist(chinook_db, "AC-DC")
+    
+    # Act
+    before = db_service.get_albums_by_artist("ac/dc")
+    replica.refresh()
+    after = db_service.get_albums_by_artist("ac/dc")
+    replica.close()
+    
+    # Assert
+    assert len(before["albums"]) == 2
+    assert after["albums"] == []
+    assert db_service.get_customer_info("1")["name"] == "Luis Goncalves"
+
+def test_replica_listeners_do_not_keep_services_alive(chinook_db, monkeypatch):
+    # Arrange
+    replica = MemoryReplica(str(chinook_db), refresh_interval=0).start()
+    monkeypatch.setattr(settings, "DB_URL", f"sqlite:///{chinook_db}")
+    monkeypatch.setattr(settings, "DB_MODE", "memory_replica")
+    monkeypatch.setattr("src.core.services.database_service.get_memory_replica", lambda: replica)
+    collected = DatabaseService()
+    closed = DatabaseService()
+    kept = DatabaseService()
+    collected_reference = weakref.ref(collected)
+    kept._rollups_available = True
+    
+    # Act
+    del collected
+    gc.collect()
+    closed.close()
+    replica.refresh()
+    replica.close()
+    
+    # Assert
+    assert collected_reference() is None
+    assert len(replica._listeners) == 1
+    assert kept._rollups_available is None
@@ -0,0 +1,229 @@
+import asyncio
+import threading
+import time
+import pytest
+from unittest.mock import MagicMock
+from src.core.services.llm_client import LLMClientRegistry
+from src.core.services.llm_service import LLMService
+from src.core.services.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    LLMTimeoutError,
+    ResiliencePolicy,
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _warm(policy, seconds, samples=20):
+    for _ in range(samples):
+        policy.latency.add(seconds)
+
+
+def test_breaker_opens_on_failure_rate_and_recovers():
+    # Arrange
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_rate=0.5, min_calls=4, window=10, open_seconds=5, clock=clock)
+    for success in (True, False, False, False):
+        breaker.record(success)
+
+    # Act
+    rejected = breaker.allow()
+    clock.now = 6
+    trial = breaker.allow()
+    second_trial = breaker.allow()
+    breaker.record(True)
+
+    # Assert
+    assert rejected is False
+    assert trial is True
+    assert second_trial is False
+    assert breaker.state == CLOSED
+
+
+def test_breaker_reopens_when_trial_fails():
+    # Arrange
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_rate=0.5, min_calls=2, window=10, open_seconds=5, clock=clock)
+    breaker.record(False)
+    breaker.record(False)
+    clock.now = 6
+
+    # Act
+    assert breaker.state == HALF_OPEN
+    breaker.allow()
+    breaker.record(False)
+
+    # Assert
+    assert breaker.state == OPEN
+
+
+def test_sync_call_times_out():
+    # Arrange
+    policy = ResiliencePolicy(timeout=0.05, hedge=False)
+
+    # Act / Assert
+    with pytest.raises(LLMTimeoutError):
+        policy.call(lambda: time.sleep(0.5))
+    assert policy.stats()["timeouts"] == 1
+
+
+def test_abandoned_attempts_do_not_delay_later_calls():
+    # Arrange
+    policy = ResiliencePolicy(timeout=0.05, hedge=False, breaker=CircuitBreaker(min_calls=100))
+    stuck = threading.Event()
+    for _ in range(20):
+        with pytest.raises(LLMTimeoutError):
+            policy.call(stuck.wait)
+
+    # Act
+    result = policy.call(lambda: "fast")
+
+    # Assert
+    assert result == "fast"
+    assert policy.stats()["running_attempts"] == 20
+    stuck.set()
+
+def test_sync_hedge_wins_when_first_attempt_is_slow():
+    # Arrange
+    policy = ResiliencePolicy(timeout=2, hedge_min_delay=0.01, hedge_min_samples=20)
+    _warm(policy, 0.01)
+    calls = []
+
+    def call():
+        calls.append(1)
+        if len(calls) == 1:
+            time.sleep(0.5)
+            return "slow"
+        return "fast"
+
+    # Act
+    result = policy.call(call)
+
+    # Assert
+    assert result == "fast"
+    assert policy.stats()["hedge_wins"] == 1
+
+
+def test_async_hedge_cancels_losing_attempt():
+    # Arrange
+    policy = ResiliencePolicy(timeout=2, hedge_min_delay=0.01, hedge_min_samples=20)
+    _warm(policy, 0.01)
+    state = {"calls": 0, "cancelled": False}
+
+    async def call():
+        state["calls"] += 1
+        if state["calls"] == 1:
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                state["cancelled"] = True
+                raise
+            return "slow"
+        return "fast"
+
+    async def run():
+        result = await policy.acall(call)
+        await asyncio.sleep(0)
+        return result
+
+    # Act
+    result = asyncio.run(run())
+
+    # Assert
+    assert result == "fast"
+    assert state["cancelled"]
+
+
+def test_open_breaker_rejects_without_calling():
+    # Arrange
+    breaker = CircuitBreaker(min_calls=1)
+    breaker.record(False)
+    policy = ResiliencePolicy(breaker=breaker)
+    call = MagicMock()
+
+    # Act / Assert
+    with pytest.raises(CircuitOpenError):
+        policy.call(call)
+    call.assert_not_called()
+
+
+def test_llm_service_falls_back_when_backend_unavailable(monkeypatch):
+    # Arrange
+    breaker = CircuitBreaker(min_calls=1)
+    breaker.record(False)
+    registry = LLMClientRegistry(factories={"default": MagicMock}, policy=ResiliencePolicy(breaker=breaker))
+    mock_llm = MagicMock()
+    llm_service = LLMService(llm=mock_llm)
+    llm_service.registry = registry
+
+    # Act
+    result = llm_service.process_music_query("AC/DC albums", {}, [])
+
+    # Assert
+    mock_llm.invoke.assert_not_called()
+    assert result["degraded"] is True
+    assert result["reason"] == "CircuitOpenError"
+
+
+def test_cancelled_trial_releases_half_open_breaker():
+    # Arrange
+    clock = FakeClock()
+    breaker = CircuitBreaker(min_calls=1, open_seconds=5, clock=clock)
+    breaker.record(False)
+    clock.now = 6
+    policy = ResiliencePolicy(timeout=None, hedge=False, breaker=breaker)
+
+    async def run():
+        trial = asyncio.ensure_future(policy.acall(lambda: asyncio.sleep(1)))
+        await asyncio.sleep(0.01)
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+    # Act
+    asyncio.run(run())
+
+    # Assert
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow() is True
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def test_only_backend_failures_count_against_breaker():
+    # Arrange
+    breaker = CircuitBreaker(min_calls=2)
+    policy = ResiliencePolicy(timeout=None, hedge=False, breaker=breaker)
+
+    def fail(status_code):
+        def call():
+            raise StatusError(status_code)
+        return call
+
+    # Act
+    for _ in range(5):
+        with pytest.raises(StatusError):
+            policy.call(fail(400))
+    after_bad_prompts = breaker.stats()
+    for status_code in (503, 429):
+        with pytest.raises(StatusError):
+            policy.call(fail(status_code))
+
+    # Assert
+    assert after_bad_prompts["state"] == CLOSED
+    assert after_bad_prompts["window_calls"] == 0
+    assert breaker.state == OPEN
@@ -0,0 +1,98 @@
+import pytest
+from sqlalchemy import create_engine, text
+from src.config.settings import settings
+from src.core.services.database_service import DatabaseService
+from src.core.services.rollup_service import build_rollups, drop_rollups, has_rollups, refresh_rollups
+
+
+@pytest.fixture
+def engine(chinook_db, monkeypatch):
+    url = f"sqlite:///{chinook_db}"
+    monkeypatch.setattr(settings, "DB_URL", url)
+    monkeypatch.setattr(settings, "RESULT_CACHE_ENABLED", False)
+    return create_engine(url)
+
+
+def test_build_rollups(engine):
+    # Act
+    with engine.begin() as connection:
+        counts = build_rollups(connection)
+    
+    # Assert
+    assert counts == {"artist_genre": 4, "top_tracks": 6}
+    with engine.begin() as connection:
+        assert has_rollups(connection)
+        drop_rollups(connection)
+        assert not has_rollups(connection)
+
+def test_rollup_queries_match_join_queries(engine):
+    # Arrange
+    expected = DatabaseService()
+    with engine.begin() as connection:
+        build_rollups(connection)
+    
+    # Act
+    db_service = DatabaseService()
+    artists = db_service.get_artist_by_genre("rock")
+    tracks = db_service.get_top_tracks("ac/dc")
+    
+    # Assert
+    assert db_service._rollups_available is True
+    assert sorted(artists["artists"], key=lambda a: a["id"]) == sorted(
+        expected.get_artist_by_genre("rock")["artists"], key=lambda a: a["id"]
+    )
+    assert tracks == expected.get_top_tracks("ac/dc")
+
+def test_incremental_refresh_after_track_changes(engine):
+    # Arrange
+    with engine.begin() as connection:
+        build_rollups(connection)
+        connection.execute(text("UPDATE Track SET PlayCount = 500 WHERE TrackId = 2"))
+        connection.execute(text("INSERT INTO Track VALUES (7, 'Jazz Rock', 2, 2, 1)"))
+    
+    # Act
+    with engine.begin() as connection:
+        refreshed = refresh_rollups(connection)
+    db_service = DatabaseService()
+    
+    # Assert
+    assert refreshed == 1
+    assert db_service.get_top_tracks("ac/dc")["tracks"][0]["id"] == 2
+    assert {"id": 1, "name": "AC/DC"} in db_service.get_artist_by_genre("jazz")["artists"]
+
+def test_changed_artists_read_live_rows_before_refresh(engine):
+    # Arrange
+    with engine.begin() as connection:
+        build_rollups(connection)
+        connection.execute(text("INSERT INTO Track VALUES (7, 'Jazz Rock', 2, 2, 900)"))
+    
+    # Act
+    db_service = DatabaseService()
+    tracks = db_service.get_top_tracks("ac/dc")["tracks"]
+    jazz_artists = db_service.get_artist_by_genre("jazz")["artists"]
+    rock_artists = db_service.get_artist_by_genre("rock")["artists"]
+    
+    # Assert
+    assert db_service._rollups_available is True
+    assert tracks[0] == {"id": 7, "name": "Jazz Rock", "album": "Let There Be Rock"}
+    assert len(tracks) == 4
+    assert [artist["id"] for artist in jazz_artists] == [1, 4]
+    assert [artist["id"] for artist in rock_artists] == [1, 3]
+
+def test_dropped_rollups_fall_back_to_join_queries(engine):
+    # Arrange
+    with engine.begin() as connection:
+        build_rollups(connection)
+    db_service = DatabaseService()
+    expected = (db_service.get_artist_by_genre("rock"), db_service.get_top_tracks("ac/dc"))
+    with engine.begin() as connection:
+        drop_rollups(connection)
+    
+    # Act
+    result = (db_service.get_artist_by_genre("rock"), db_service.get_top_tracks("ac/dc"))
+    streamed = list(db_service.iter_artist_by_genre("rock"))
+    
+    # Assert
+    assert result == expected
+    assert len(streamed) == len(expected[0]["artists"])
+    assert db_service._rollups_available is False
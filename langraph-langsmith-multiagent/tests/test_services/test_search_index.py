@@ -0,0 +1,119 @@
+import pytest
+from sqlalchemy import create_engine, text
+from src.config.settings import settings
+from src.core.services.database_service import DatabaseService
+from src.core.services.search_index import build_search_index, drop_search_index, has_search_index
+
+
+@pytest.fixture
+def db_url(chinook_db, monkeypatch):
+    url = f"sqlite:///{chinook_db}"
+    monkeypatch.setattr(settings, "DB_URL", url)
+    # Compare the query variants themselves, not the shared result cache
+    monkeypatch.setattr(settings, "RESULT_CACHE_ENABLED", False)
+    return url
+
+
+def test_build_search_index(db_url):
+    # Arrange
+    engine = create_engine(db_url)
+    
+    # Act
+    with engine.begin() as connection:
+        counts = build_search_index(connection)
+    
+    # Assert
+    assert counts == {"artist_search": 4, "genre_search": 3}
+    with engine.connect() as connection:
+        assert has_search_index(connection)
+        drop_search_index(connection)
+        assert not has_search_index(connection)
+
+def test_indexed_queries_match_like_queries(db_url):
+    # Arrange
+    unindexed = DatabaseService()
+    expected = (
+        unindexed.get_albums_by_artist("ac"),
+        unindexed.get_artist_by_genre("rock"),
+        unindexed.get_top_tracks("ac/dc"),
+    )
+    with create_engine(db_url).begin() as connection:
+        build_search_index(connection)
+    
+    # Act
+    db_service = DatabaseService()
+    result = (
+        db_service.get_albums_by_artist("ac"),
+        db_service.get_artist_by_genre("rock"),
+        db_service.get_top_tracks("ac/dc"),
+    )
+    
+    # Assert
+    assert unindexed._search_index_available is False
+    assert db_service._search_index_available is True
+    assert result == expected
+    assert [track["id"] for track in result[2]["tracks"]] == [3, 1, 2]
+
+def test_short_terms_still_match(db_url):
+    # Arrange
+    with create_engine(db_url).begin() as connection:
+        build_search_index(connection)
+    db_service = DatabaseService()
+    
+    # Act
+    result = db_service.get_albums_by_artist("a")
+    
+    # Assert
+    assert len(result["albums"]) == 5
+
+def test_dropped_index_falls_back_to_like_queries(db_url):
+    # Arrange
+    engine = create_engine(db_url)
+    with engine.begin() as connection:
+        build_search_index(connection)
+    db_service = DatabaseService()
+    expected = (
+        db_service.get_albums_by_artist("ac"),
+        db_service.get_artist_by_genre("rock"),
+        db_service.get_top_tracks("ac/dc"),
+    )
+    with engine.begin() as connection:
+        drop_search_index(connection)
+    
+    # Act
+    result = (
+        db_service.get_albums_by_artist("ac"),
+        db_service.get_artist_by_genre("rock"),
+        db_service.get_top_tracks("ac/dc"),
+    )
+    albums = list(db_service.iter_albums_by_artist("ac"))
+    
+    # Assert
+    assert result == expected
+    assert len(albums) == len(expected[0]["albums"])
+    assert db_service._search_index_available is False
+
+def test_index_follows_artist_writes(db_url):
+    # Arrange
+    engine = create_engine(db_url)
+    with engine.begin() as connection:
+        build_search_index(connection)
+    db_service = DatabaseService()
+    
+    # Act
+    with engine.begin() as connection:
+        connection.execute(text("INSERT INTO Artist VALUES (5, 'Frank Zappa')"))
+        connection.execute(text("INSERT INTO Album VALUES (6, 'Hot Rats', 5)"))
+        connection.execute(text("UPDATE Artist SET Name = 'Acca Dacca' WHERE ArtistId = 1"))
+        connection.execute(text("DELETE FROM Artist WHERE ArtistId = 4"))
+    
+    # Assert
+    assert [album["title"] for album in db_service.get_albums_by_artist("zappa")["albums"]] == ["Hot Rats"]
+    assert len(db_service.get_albums_by_artist("dacca")["albums"]) == 2
+    assert db_service.get_albums_by_artist("ac/dc")["albums"] == []
+    assert db_service.get_albums_by_artist("davis")["albums"] == []
+    assert db_service._search_index_available is True
+    with engine.connect() as connection:
+        drop_search_index(connection)
+        connection.execute(text("INSERT INTO Artist VALUES (6, 'Nina Simone')"))
+        assert not has_search_index(connection)
@@ -0,0 +1,54 @@
+from src.core.services.session_store import SessionStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_session_lookup_until_ttl():
+    # Arrange
+    clock = FakeClock()
+    store = SessionStore(ttl=60, clock=clock)
+    session = store.create(1, {"id": 1}, identifier=" John@Example.com ")
+
+    # Act
+    clock.now = 59
+    live = store.get(session.token)
+    clock.now = 60
+    expired = store.get(session.token)
+
+    # Assert
+    assert live is session
+    assert live.customer_id == "1"
+    assert live.matches("john@example.com") and live.matches(1)
+    assert not live.matches("2")
+    assert expired is None
+    assert store.stats()["expired"] == 1
+    assert store.stats()["active"] == 0
+
+
+def test_revocation_and_eviction():
+    # Arrange
+    store = SessionStore(max_size=2)
+    first = store.create("1", {"id": 1})
+    second = store.create("1", {"id": 1})
+
+    # Act
+    revoked = store.revoke(first.token)
+    revoked_again = store.revoke(first.token)
+    third = store.create("2", {"id": 2})
+    fourth = store.create("3", {"id": 3})
+    removed = store.revoke_customer("2")
+
+    # Assert
+    assert (revoked, revoked_again) == (True, False)
+    assert store.get(second.token) is None
+    assert store.get(third.token) is None
+    assert store.get(fourth.token) is fourth
+    assert removed == 1
+    assert store.stats()["evicted"] == 1
+    assert store.get(None) is None
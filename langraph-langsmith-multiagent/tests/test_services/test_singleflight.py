@@ -0,0 +1,135 @@
+import asyncio
+import threading
+import time
+import pytest
+from unittest.mock import MagicMock
+from src.core.services.llm_service import LLMService
+from src.core.services.singleflight import SingleFlight
+
+
+def test_concurrent_async_calls_share_one_execution():
+    # Arrange
+    flight = SingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"answer": 42}
+
+    async def run():
+        return await asyncio.gather(*(flight.ado("music", "same", compute) for _ in range(5)))
+
+    # Act
+    results = asyncio.run(run())
+
+    # Assert
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert flight.stats()["groups"]["music"] == {"requests": 5, "executions": 1, "saved": 4}
+
+
+def test_sequential_calls_are_not_coalesced():
+    # Arrange
+    flight = SingleFlight()
+
+    async def compute():
+        return "value"
+
+    async def run():
+        await flight.ado("music", "same", compute)
+        await flight.ado("music", "same", compute)
+
+    # Act
+    asyncio.run(run())
+
+    # Assert
+    assert flight.stats()["saved"] == 0
+
+
+def test_cancelled_waiter_does_not_cancel_shared_call():
+    # Arrange
+    flight = SingleFlight()
+
+    async def compute():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def run():
+        first = asyncio.ensure_future(flight.ado("music", "k", compute))
+        second = asyncio.ensure_future(flight.ado("music", "k", compute))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    # Act
+    result = asyncio.run(run())
+
+    # Assert
+    assert result == "done"
+
+
+def test_threads_share_result_and_exceptions():
+    # Arrange
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    results = []
+
+    def compute():
+        started.set()
+        release.wait(1)
+        raise ValueError("boom")
+
+    def worker():
+        try:
+            flight.do("classifier", "q", compute)
+        except ValueError as e:
+            results.append(str(e))
+
+    leader = threading.Thread(target=worker)
+    leader.start()
+    started.wait(1)
+    followers = [threading.Thread(target=worker) for _ in range(3)]
+    for thread in followers:
+        thread.start()
+
+    # Act
+    while flight.stats()["requests"] < 4:
+        time.sleep(0.001)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join(1)
+
+    # Assert
+    assert results == ["boom"] * 4
+    assert flight.stats()["groups"]["classifier"]["executions"] == 1
+    with pytest.raises(ValueError):
+        flight.do("classifier", "q", compute)
+
+
+def test_llm_service_coalesces_identical_queries():
+    # Arrange
+    flight = SingleFlight()
+    llm = MagicMock()
+
+    async def slow_answer(messages, **kwargs):
+        await asyncio.sleep(0.01)
+        return MagicMock(content='{"response": "AC/DC albums"}')
+
+    llm.ainvoke = MagicMock(side_effect=slow_answer)
+    llm_service = LLMService(llm=llm, singleflight=flight)
+
+    async def run():
+        return await asyncio.gather(
+            llm_service.aprocess_music_query("What albums does AC/DC have?", {}, []),
+            llm_service.aprocess_music_query("what albums does ac/dc have", {}, []),
+        )
+
+    # Act
+    results = asyncio.run(run())
+
+    # Assert
+    assert results == [{"response": "AC/DC albums"}, {"response": "AC/DC albums"}]
+    llm.ainvoke.assert_called_once()
+    assert flight.stats()["saved"] == 1
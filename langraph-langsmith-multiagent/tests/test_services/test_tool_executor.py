@@ -0,0 +1,142 @@
+import asyncio
+import json
+import time
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.tools import tool
+from src.core.services.llm_service import LLMService
+from src.core.services.tool_executor import ToolExecutor
+
+
+@tool
+def slow_albums(artist: str) -> dict:
+    """Get albums by artist."""
+    time.sleep(0.2)
+    return {"artist": artist, "albums": ["Back in Black", "Highway to Hell"]}
+
+
+@tool
+def slow_tracks(artist: str) -> dict:
+    """Get top tracks for an artist."""
+    time.sleep(0.2)
+    return {"artist": artist, "tracks": list(range(50))}
+
+
+@tool
+def broken(artist: str) -> dict:
+    """Always fails."""
+    raise RuntimeError("database is locked")
+
+
+def _call(name, call_id, **args):
+    return {"name": name, "args": args, "id": call_id, "type": "tool_call"}
+
+
+class ToolCallingLLM:
+    def __init__(self, turns):
+        self.turns = list(turns)
+        self.calls = []
+
+    def invoke(self, messages, **kwargs):
+        self.calls.append((list(messages), kwargs))
+        return self.turns.pop(0) if len(self.turns) > 1 else self.turns[0]
+
+    async def ainvoke(self, messages, **kwargs):
+        return self.invoke(messages, **kwargs)
+
+
+def test_run_executes_calls_in_parallel():
+    # Arrange
+    executor = ToolExecutor(max_workers=4)
+    calls = [_call("slow_albums", "a", artist="AC/DC"), _call("slow_tracks", "b", artist="AC/DC")]
+
+    # Act
+    started = time.perf_counter()
+    results = executor.run(calls, [slow_albums, slow_tracks])
+    elapsed = time.perf_counter() - started
+
+    # Assert
+    assert elapsed < 0.35
+    assert [result.call_id for result in results] == ["a", "b"]
+    assert all(isinstance(result.message, ToolMessage) for result in results)
+    assert "Back in Black" in results[0].message.content
+    assert executor.stats()["tools"]["slow_albums"]["count"] == 1
+
+
+def test_arun_executes_calls_concurrently():
+    # Arrange
+    executor = ToolExecutor()
+    calls = [_call("slow_albums", "a", artist="AC/DC"), _call("slow_tracks", "b", artist="AC/DC")]
+
+    # Act
+    started = time.perf_counter()
+    results = asyncio.run(executor.arun(calls, [slow_albums, slow_tracks]))
+    elapsed = time.perf_counter() - started
+
+    # Assert
+    assert elapsed < 0.35
+    assert [result.name for result in results] == ["slow_albums", "slow_tracks"]
+
+
+def test_errors_and_unknown_tools_become_error_messages():
+    # Arrange
+    executor = ToolExecutor()
+    calls = [_call("broken", "a", artist="AC/DC"), _call("missing", "b")]
+
+    # Act
+    results = executor.run(calls, [broken])
+
+    # Assert
+    assert results[0].message.status == "error"
+    assert "database is locked" in results[0].message.content
+    assert "Unknown tool" in results[1].message.content
+    assert executor.stats()["tools"]["broken"]["errors"] == 1
+
+
+def test_result_filter_caps_tool_output():
+    # Arrange
+    executor = ToolExecutor(result_filter=lambda value: {**value, "tracks": value["tracks"][:2]})
+
+    # Act
+    results = executor.run([_call("slow_tracks", "a", artist="AC/DC")], [slow_tracks])
+
+    # Assert
+    assert "49" not in results[0].message.content
+
+
+def test_llm_service_runs_tool_loop_until_final_answer():
+    # Arrange
+    llm = ToolCallingLLM([
+        AIMessage(content="", tool_calls=[_call("slow_albums", "a", artist="AC/DC"), _call("slow_tracks", "b", artist="AC/DC")]),
+        AIMessage(content=json.dumps({"response": "AC/DC recorded Back in Black"})),
+    ])
+    executor = ToolExecutor()
+    llm_service = LLMService(llm=llm, tool_executor=executor)
+
+    # Act
+    result = llm_service.process_music_query("AC/DC albums?", {}, [slow_albums, slow_tracks])
+
+    # Assert
+    assert result == {"response": "AC/DC recorded Back in Black"}
+    assert len(llm.calls) == 2
+    second_messages, second_kwargs = llm.calls[1]
+    assert [message.tool_call_id for message in second_messages if isinstance(message, ToolMessage)] == ["a", "b"]
+    assert [schema["function"]["name"] for schema in second_kwargs["tools"]] == ["slow_albums", "slow_tracks"]
+    assert executor.stats()["steps"]["music"]["count"] == 2
+
+
+def test_llm_service_forces_answer_at_step_limit():
+    # Arrange
+    looping = AIMessage(content="", tool_calls=[_call("broken", "a", artist="AC/DC")])
+    llm = ToolCallingLLM([looping])
+    executor = ToolExecutor()
+    llm_service = LLMService(llm=llm, tool_executor=executor)
+    llm_service.max_steps = 2
+
+    # Act
+    result = asyncio.run(llm_service.aprocess_music_query("AC/DC albums?", {}, [broken]))
+
+    # Assert
+    assert len(llm.calls) == 3
+    assert llm.calls[-1][1]["tool_choice"] == "none"
+    assert "error" in result
+    assert executor.stats()["steps"]["music"]["step_limit_hits"] == 1
@@ -0,0 +1,129 @@
+import asyncio
+import concurrent.futures
+import json
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.tools import tool
+from src.core.services.llm_service import LLMService
+from src.core.services.tool_executor import ToolExecutor
+from src.core.services.tracing import (
+    NOOP_SPAN,
+    InMemoryExporter,
+    JsonLinesExporter,
+    Tracer,
+    load_spans,
+    summarize,
+    wrap,
+)
+
+
+@tool
+def top_tracks(artist: str) -> dict:
+    """Get top tracks for an artist."""
+    return {"tracks": ["Thunderstruck"]}
+
+
+class ToolThenAnswerLLM:
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, messages, **kwargs):
+        self.calls += 1
+        if self.calls == 1:
+            return AIMessage(content="", tool_calls=[{"name": "top_tracks", "args": {"artist": "AC/DC"}, "id": "a"}])
+        return AIMessage(
+            content=json.dumps({"response": "Thunderstruck"}),
+            usage_metadata={"input_tokens": 120, "output_tokens": 8, "total_tokens": 128},
+        )
+
+
+def test_spans_nest_and_carry_request_id_across_tasks_and_threads():
+    # Arrange
+    exporter = InMemoryExporter()
+    tracer = Tracer(exporter)
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+    def db_lookup():
+        with tracer.span("db.query", rows=1):
+            return tracer.current_request_id()
+
+    async def handle():
+        with tracer.span("request", request_id="req-1"):
+            await asyncio.gather(asyncio.to_thread(db_lookup), asyncio.to_thread(db_lookup))
+            return pool.submit(wrap(db_lookup)).result()
+
+    # Act
+    request_id = asyncio.run(handle())
+
+    # Assert
+    root = next(span for span in exporter.spans if span.name == "request")
+    children = [span for span in exporter.spans if span.name == "db.query"]
+    assert request_id == "req-1"
+    assert len(children) == 3
+    assert all(span.trace_id == "req-1" and span.parent_id == root.span_id for span in children)
+    assert children[0].attributes == {"rows": 1}
+
+
+def test_span_records_errors_and_disabled_tracer_is_noop():
+    # Arrange
+    exporter = InMemoryExporter()
+    tracer = Tracer(exporter)
+
+    # Act
+    with pytest.raises(RuntimeError):
+        with tracer.span("llm.generate"):
+            raise RuntimeError("deadline")
+
+    # Assert
+    assert exporter.spans[0].status == "error"
+    assert "deadline" in exporter.spans[0].error
+    assert Tracer().span("anything") is NOOP_SPAN
+    assert Tracer.current_span() is NOOP_SPAN
+
+
+def test_json_exporter_and_summary(tmp_path):
+    # Arrange
+    path = str(tmp_path / "traces" / "spans.jsonl")
+    tracer = Tracer(JsonLinesExporter(path, buffer_size=100))
+    for _ in range(10):
+        with tracer.span("request"):
+            with tracer.span("supervisor.route"):
+                pass
+
+    # Act
+    tracer.flush()
+    spans = load_spans(path)
+    rows = {row["name"]: row for row in summarize(spans)}
+
+    # Assert
+    assert len(spans) == 20
+    assert len({span["request_id"] for span in spans}) == 10
+    assert rows["request"]["count"] == 10
+    assert rows["request"]["share"] == pytest.approx(1.0)
+    assert 0 < rows["supervisor.route"]["share"] < 1
+    assert rows["supervisor.route"]["p50_ms"] <= rows["supervisor.route"]["p99_ms"]
+
+
+def test_llm_service_emits_stage_spans():
+    # Arrange
+    exporter = InMemoryExporter()
+    tracer = Tracer(exporter)
+    executor = ToolExecutor()
+    executor.tracer = tracer
+    llm_service = LLMService(llm=ToolThenAnswerLLM(), tool_executor=executor)
+    llm_service.tracer = tracer
+
+    # Act
+    with tracer.span("request", request_id="req-2"):
+        result = llm_service.process_music_query("AC/DC hits?", {}, [top_tracks])
+
+    # Assert
+    names = [span.name for span in exporter.spans]
+    assert result == {"response": "Thunderstruck"}
+    assert names.count("llm.generate") == 2
+    assert {"llm.prompt", "tools.execute", "tool.call", "request"} <= set(names)
+    assert all(span.trace_id == "req-2" for span in exporter.spans)
+    prompt_span = next(span for span in exporter.spans if span.name == "llm.prompt")
+    assert prompt_span.attributes["prompt_tokens"] > 0
+    last_step = [span for span in exporter.spans if span.name == "llm.generate"][-1]
+    assert last_step.attributes["output_tokens"] == 8